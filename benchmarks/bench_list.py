@@ -0,0 +1,197 @@
+"""
+Scaling benchmarks for the list and render paths.
+
+Every case is run against synthetic protobuf replies from tests.fake_controller at each requested object
+count. Wall time (best of --repeat runs) and peak memory (tracemalloc, python >= 3.4) are measured and
+written as JSON, so results of different client versions can be compared with --compare.
+
+    python -m benchmarks.bench_list --output bench-0.2.2.json
+    python -m benchmarks.bench_list --sizes 1000 10000 --compare bench-0.2.2.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import linstor_client
+from linstor_client.commands import (Commands, NodeCommands, ResourceCommands, SnapshotCommands,
+                                     StoragePoolCommands)
+from linstor_client.consts import GITHASH, VERSION
+from tests.fake_controller import FakeDataset, FakeLinstor
+
+try:
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+class NullWriter(object):
+    """Discards everything, so rendering cost is measured without terminal or buffer cost."""
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+
+def list_args(**kwargs):
+    args = argparse.Namespace(
+        no_utf8=True,
+        no_color=True,
+        pastable=False,
+        machine_readable=False,
+        warn_as_error=False,
+        groupby=None,
+        nodes=None,
+        resources=None,
+        storpools=None,
+        name=None
+    )
+    for key, value in kwargs.items():
+        setattr(args, key, value)
+    return args
+
+
+def cmd_obj(cls, linstorapi):
+    obj = cls()
+    obj._linstor = linstorapi
+    return obj
+
+
+def make_table(rows, groupby):
+    tbl = linstor_client.Table(utf8=False, colors=False)
+    for hdr in NodeCommands._node_headers:
+        tbl.add_header(hdr)
+    for i in range(rows):
+        tbl.add_row(["node{i:06d}".format(i=i), "SATELLITE", "10.0.{a}.{b}".format(a=i >> 8 & 0xff, b=i & 0xff),
+                     "Online"])
+    if groupby:
+        tbl.set_groupby(groupby)
+    return tbl
+
+
+# every case gets the fake controller and returns a callable that runs the measured code once
+CASES = {
+    'show_nodes': lambda api: lambda: NodeCommands.show_nodes(list_args(), api.node_list()[0].proto_msg),
+    'resource_show': lambda api: lambda: cmd_obj(ResourceCommands, api).show(
+        list_args(), api.resource_list()[0].proto_msg),
+    'show_volumes': lambda api: lambda: ResourceCommands.show_volumes(list_args(), api.volume_list()[0].proto_msg),
+    'storage_pool_show': lambda api: lambda: cmd_obj(StoragePoolCommands, api).show(
+        list_args(), api.storage_pool_list()[0].proto_msg),
+    'snapshot_show': lambda api: lambda: SnapshotCommands.show(list_args(), api.snapshot_dfn_list()[0].proto_msg),
+    'node_describe': lambda api: lambda: cmd_obj(NodeCommands, api).describe(list_args()),
+    'machine_readable': lambda api: lambda: Commands._print_machine_readable(api.resource_list()),
+}
+
+
+def table_case(groupby):
+    def setup(api):
+        rows = len(api.node_list()[0].proto_msg.nodes)
+        return lambda: make_table(rows, groupby).show()
+    return setup
+
+
+CASES['table_show'] = table_case(None)
+CASES['table_show_groupby'] = table_case(['Node'])
+
+
+def measure(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = timer()
+        func()
+        elapsed = timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes, cases, repeat, max_seconds):
+    results = []
+    skipped = set()
+    for size in sizes:
+        dataset = FakeDataset(nodes=size, resource_definitions=size, replicas=1, snapshots=size)
+        sys.stderr.write("generating data set with {n} objects ...\n".format(n=size))
+        api = FakeLinstor(dataset=dataset)
+
+        for case in cases:
+            if case in skipped:
+                results.append({'case': case, 'objects': size, 'skipped': True})
+                continue
+
+            func = CASES[case](api)
+            stdout = sys.stdout
+            sys.stdout = NullWriter()
+            try:
+                seconds, peak = measure(func, repeat)
+            finally:
+                sys.stdout = stdout
+
+            sys.stderr.write("{c:<20} {n:>8} objects: {s:10.4f}s {m}\n".format(
+                c=case, n=size, s=seconds, m='' if peak is None else '{p} bytes peak'.format(p=peak)))
+            results.append({'case': case, 'objects': size, 'seconds': seconds, 'peak_bytes': peak})
+            if max_seconds and seconds > max_seconds:
+                skipped.add(case)
+    return results
+
+
+def compare(results, baseline):
+    base = {(r['case'], r['objects']): r for r in baseline['results'] if not r.get('skipped')}
+    print("{c:<20} {n:>8} {o:>10} {t:>10} {r:>7}".format(c='case', n='objects', o='baseline', t='current', r='ratio'))
+    for res in results:
+        old = base.get((res['case'], res['objects']))
+        if res.get('skipped') or old is None:
+            continue
+        print("{c:<20} {n:>8} {o:10.4f} {t:10.4f} {r:7.2f}".format(
+            c=res['case'], n=res['objects'], o=old['seconds'], t=res['seconds'],
+            r=res['seconds'] / old['seconds'] if old['seconds'] else 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling benchmarks for list and render paths')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='object counts')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES.keys()), default=sorted(CASES.keys()))
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best one counts')
+    parser.add_argument('--max-seconds', type=float, default=60,
+                        help='skip larger sizes of a case once it took longer than this (0: never skip)')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='JSON result file of a previous run to compare against')
+    args = parser.parse_args()
+
+    results = run(sorted(args.sizes), args.cases, args.repeat, args.max_seconds)
+    report = {
+        'version': VERSION,
+        'githash': GITHASH,
+        'python': platform.python_version(),
+        'date': datetime.now().isoformat(),
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as outfile:
+            json.dump(report, outfile, indent=2)
+    if args.compare:
+        with open(args.compare) as infile:
+            compare(results, json.load(infile))
+    elif not args.output:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Startup-time benchmarks per command.
+
+Every case runs linstor_client_main.main in a fresh interpreter, so nothing is cached between runs. Reported
+are the total wall time of the process, the time spent importing linstor_client_main, the time spent building
+the argument parser and, on python >= 3.7, the heaviest imports as reported by -X importtime.
+"node list" runs against the fake controller from tests.fake_controller.
+
+The exit code is 1 if any case exits nonzero or the median of any measurement exceeds its budget, so this can run
+before a release:
+
+    python -m benchmarks.bench_startup --max-wall 1.0 --max-parser 0.3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# runs inside the fresh interpreter: argv[1] is the case as JSON, argv[2] the file timings get written to
+BOOTSTRAP = r"""
+import json, os, sys, time
+timer = getattr(time, 'perf_counter', time.time)
+case = json.loads(sys.argv[1])
+timings = {}
+
+def dump():
+    with open(sys.argv[2], 'w') as f:
+        json.dump(timings, f)
+
+start = timer()
+import linstor_client_main
+timings['import'] = timer() - start
+
+if case.get('fake_nodes'):
+    import linstor
+    from tests.fake_controller import FakeDataset, FakeLinstor
+    linstor.Linstor = FakeLinstor.factory(FakeDataset(nodes=case['fake_nodes']))
+
+setup_parser = linstor_client_main.LinStorCLI.setup_parser
+def timed_setup_parser(self):
+    start = timer()
+    try:
+        return setup_parser(self)
+    finally:
+        timings['parser'] = timer() - start
+        if case.get('completion'):
+            dump()  # argcomplete leaves with os._exit()
+linstor_client_main.LinStorCLI.setup_parser = timed_setup_parser
+
+sys.argv = ['linstor'] + case['argv']
+exit_code = 0
+try:
+    linstor_client_main.main()
+except SystemExit as e:
+    exit_code = e.code if e.code is None or isinstance(e.code, int) else 1
+timings['exit_code'] = exit_code or 0
+dump()
+"""
+
+CASES = {
+    'list-commands': {'argv': ['list-commands']},
+    'help-resource': {'argv': ['help', 'resource']},
+    'node-list': {'argv': ['--no-color', 'node', 'list'], 'fake_nodes': 100},
+    'completion': {'argv': [], 'completion': 'linstor resource cr'},
+}
+
+
+def parse_importtime(stderr, top):
+    """
+    Parses the output of -X importtime.
+
+    :return: total import time in seconds (top-level imports) and the `top` slowest modules (cumulative)
+    """
+    total = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split(':', 1)[1].split('|')
+        cumulative = int(cumulative_us) / 1000000.0
+        if len(name) - len(name.lstrip()) == 1:  # nested imports are indented further
+            total += cumulative
+        modules.append((name.strip(), cumulative))
+    modules.sort(key=lambda x: x[1], reverse=True)
+    return total, [{'module': m, 'seconds': s} for m, s in modules[:top]]
+
+
+def run_case(case, top):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([ROOT] + [x for x in [env.get('PYTHONPATH')] if x])
+    env.pop('_ARGCOMPLETE', None)
+    if case.get('completion'):
+        comp_line = case['completion']
+        env.update({
+            '_ARGCOMPLETE': '1',
+            'COMP_LINE': comp_line,
+            'COMP_POINT': str(len(comp_line))
+        })
+
+    cmd = [sys.executable]
+    if sys.version_info >= (3, 7):
+        cmd += ['-X', 'importtime']
+
+    fd, timings_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    devnull = open(os.devnull, 'w')
+    try:
+        start = timer()
+        # argcomplete writes its completions to fd 8
+        proc = subprocess.Popen(
+            cmd + ['-c', BOOTSTRAP, json.dumps(case), timings_path],
+            cwd=ROOT, env=env, stdout=devnull, stderr=subprocess.PIPE, universal_newlines=True,
+            preexec_fn=lambda: os.dup2(os.open(os.devnull, os.O_WRONLY), 8)
+        )
+        _, stderr = proc.communicate()
+        wall = timer() - start
+
+        with open(timings_path) as timings_file:
+            content = timings_file.read()
+        result = json.loads(content) if content else {}
+    finally:
+        devnull.close()
+        os.remove(timings_path)
+
+    result['wall'] = wall
+    result.setdefault('exit_code', proc.returncode)
+    if not content:
+        # the interpreter died before the bootstrap finished
+        lines = [x for x in stderr.splitlines() if not x.startswith('import time:')]
+        result['error'] = lines[-1] if lines else 'exit code {rc}'.format(rc=proc.returncode)
+    if sys.version_info >= (3, 7):
+        result['importtime_total'], result['importtime_top'] = parse_importtime(stderr, top)
+    return result
+
+
+def median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup-time benchmarks per command')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES.keys()), default=sorted(CASES.keys()))
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per case, the median counts')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest imports reported')
+    parser.add_argument('--max-wall', type=float, help='budget in seconds for the whole process')
+    parser.add_argument('--max-import', type=float, help='budget in seconds for importing linstor_client_main')
+    parser.add_argument('--max-parser', type=float, help='budget in seconds for building the argument parser')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    budgets = {'wall': args.max_wall, 'import': args.max_import, 'parser': args.max_parser}
+    report = {}
+    exceeded = []
+    for case in args.cases:
+        runs = [run_case(CASES[case], args.top) for _ in range(args.repeat)]
+        result = {'runs': runs}
+        for key in ['wall', 'import', 'parser', 'importtime_total']:
+            values = [x[key] for x in runs if key in x]
+            if values:
+                result[key] = median(values)
+        report[case] = result
+        errors = [x['error'] for x in runs if 'error' in x]
+        if errors:
+            exceeded.append("{c}: failed: {e}".format(c=case, e=errors[0]))
+        exit_codes = sorted(set([x['exit_code'] for x in runs if x['exit_code']]))
+        if exit_codes:
+            exceeded.append("{c}: exited with {rc}".format(c=case, rc=', '.join([str(x) for x in exit_codes])))
+
+        sys.stderr.write("{c:<15} wall {w:.3f}s  import {i}  parser {p}\n".format(
+            c=case, w=result['wall'],
+            i='{v:.3f}s'.format(v=result['import']) if 'import' in result else '-',
+            p='{v:.3f}s'.format(v=result['parser']) if 'parser' in result else '-'))
+        for key, budget in budgets.items():
+            if budget is not None and result.get(key, 0) > budget:
+                exceeded.append("{c}: {k} {v:.3f}s exceeds budget of {b:.3f}s".format(
+                    c=case, k=key, v=result[key], b=budget))
+
+    if args.output:
+        with open(args.output, 'w') as outfile:
+            json.dump(report, outfile, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    for msg in exceeded:
+        sys.stderr.write(msg + '\n')
+    return 1 if exceeded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+    LINSTOR - management of distributed storage/DRBD9 resources
+    Copyright (C) 2018  LINBIT HA-Solutions GmbH
+
+    You can use this file under the terms of the GNU Lesser General
+    Public License as as published by the Free Software Foundation,
+    either version 3 of the License, or (at your option) any later
+    version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    See <http://www.gnu.org/licenses/>.
+"""
+
+import inspect
+import json
+import threading
+import time
+
+from linstor_client.consts import ExitCode
+from linstor_client.utils import LinstorClientError
+
+
+class TracingLinstor(object):
+    """
+    Proxy around a linstor.Linstor object that writes one NDJSON record per controller call.
+
+    Each record contains the method name, its arguments (secrets redacted), start and end timestamps,
+    the number of replies and an approximate reply size in bytes.
+    """
+    REDACTED = '<redacted>'
+    SECRET_ARGS = ['passphrase', 'old_passphrase', 'new_passphrase', 'secret', 'password']
+
+    # methods of linstor.Linstor that do not talk to the controller
+    LOCAL_METHODS = [
+        'all_api_responses_success',
+        'return_if_failure',
+        'storage_props_to_driver_pool'
+    ]
+
+    def __init__(self, linstorapi, trace_path):
+        """
+        :param linstor.Linstor linstorapi: api object to trace
+        :param str trace_path: file the NDJSON records get appended to
+        """
+        self._linstorapi = linstorapi
+        try:
+            self._trace_file = open(trace_path, 'a')
+        except IOError as err:
+            raise LinstorClientError(
+                "Unable to open api trace '{p}': {e}".format(p=trace_path, e=err), ExitCode.ARGPARSE_ERROR
+            )
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._linstorapi, name)
+        if name.startswith('_') or name in self.LOCAL_METHODS or not callable(attr):
+            return attr
+
+        def traced(*args, **kwargs):
+            return self._call(name, attr, args, kwargs)
+        return traced
+
+    @classmethod
+    def _json_value(cls, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, (list, tuple, set)):
+            return [cls._json_value(x) for x in value]
+        if isinstance(value, dict):
+            return {str(k): cls._json_value(v) for k, v in value.items()}
+        if callable(value):
+            return getattr(value, '__name__', repr(value))
+        return repr(value)
+
+    @classmethod
+    def _trace_args(cls, method, args, kwargs):
+        try:
+            call_args = inspect.getcallargs(method, *args, **kwargs)
+            call_args.pop('self', None)
+        except TypeError:
+            call_args = dict(kwargs)
+            call_args['*args'] = list(args)
+
+        return {
+            k: cls.REDACTED if k in cls.SECRET_ARGS and v is not None else cls._json_value(v)
+            for k, v in call_args.items()
+        }
+
+    @classmethod
+    def _reply_size(cls, reply):
+        proto_msg = getattr(reply, 'proto_msg', None)
+        if proto_msg is not None and hasattr(proto_msg, 'ByteSize'):
+            return proto_msg.ByteSize()
+        return len(str(reply))
+
+    def _call(self, name, method, args, kwargs):
+        record = {
+            'method': name,
+            'args': self._trace_args(method, args, kwargs),
+            'start': time.time()
+        }
+        try:
+            result = method(*args, **kwargs)
+        except Exception as e:
+            record['error'] = repr(e)
+            raise
+        else:
+            if isinstance(result, list):
+                record['replies'] = len(result)
+                record['reply_bytes'] = sum([self._reply_size(x) for x in result])
+            return result
+        finally:
+            record['end'] = time.time()
+            record['duration_ms'] = round((record['end'] - record['start']) * 1000, 3)
+            self._write(record)
+
+    def _write(self, record):
+        line = json.dumps(record, sort_keys=True)
+        with self._lock:
+            self._trace_file.write(line + '\n')
+            self._trace_file.flush()
+
+    def close(self):
+        with self._lock:
+            self._trace_file.close()
@@ -1,4 +1,4 @@
-from .commands import Commands, MiscCommands, ArgumentError
+from .commands import Commands, MiscCommands, ArgumentError, BulkResult
 from .drbd_setup_cmds import DrbdOptions
 from .controller_cmds import ControllerCommands
 from .node_cmds import NodeCommands
@@ -9,4 +9,7 @@ from .rsc_cmds import ResourceCommands
 from .vlm_dfn_cmds import VolumeDefinitionCommands
 from .snapshot_cmds import SnapshotCommands
 from .migrate_cmds import MigrateCommands
+from .apply_cmds import ApplyCommands
+from .property_cmds import PropertyCommands
+from .exporter_cmds import ExporterCommands
 from .zsh_completer import ZshGenerator
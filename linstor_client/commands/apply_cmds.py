@@ -0,0 +1,435 @@
+import linstor_client.argparse.argparse as argparse
+import hashlib
+import json
+from functools import partial
+
+import linstor_client
+from linstor.sharedconsts import VAL_NETCOM_TYPE_PLAIN, VAL_NODE_TYPE_STLT
+from linstor_client.commands import Commands, BulkResult, StoragePoolCommands, VolumeDefinitionCommands
+from linstor_client.consts import BOOL_FALSE, BOOL_TRUE, NODE_NAME, RES_NAME, STORPOOL_NAME, Color, ExitCode
+from linstor_client.journal import Journal
+from linstor_client.utils import LinstorClientError, parallel_map
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+class PlanStep(object):
+    """
+    A single change of an apply plan.
+    """
+    CREATE = 'create'
+    MODIFY = 'modify'
+    CONFLICT = 'conflict'
+
+    def __init__(self, action, obj_type, name, changes, func=None, requires=None):
+        """
+        :param str action: CREATE, MODIFY or CONFLICT (a difference that cannot be applied)
+        :param str obj_type: object type, one of ApplyCommands.OBJECT_ORDER
+        :param str name: name of the object, e.g. "node/pool" for a storage pool
+        :param str changes: printable description of the changes
+        :param func: callable applying the step, returns a list of ApiCallResponse
+        :param list[str] requires: identities of objects that have to exist before this step
+        """
+        self.action = action
+        self.obj_type = obj_type
+        self.identity = obj_type + ' ' + name if name else obj_type
+        self.changes = changes
+        self.func = func
+        self.requires = requires or []
+
+
+class ApplyCommands(Commands):
+    # object types in the order they have to be created
+    OBJECT_ORDER = [
+        'controller',
+        'node',
+        'net-interface',
+        'storage-pool-definition',
+        'storage-pool',
+        'resource-definition',
+        'volume-definition',
+        'resource'
+    ]
+
+    def __init__(self):
+        super(ApplyCommands, self).__init__()
+
+    def setup_commands(self, parser):
+        p_apply = parser.add_parser(
+            Commands.APPLY,
+            formatter_class=argparse.RawTextHelpFormatter,
+            description='Brings the cluster to the layout described in a JSON or YAML file.\n'
+                        'Objects that are missing get created, properties that differ get modified; objects\n'
+                        'that are not part of the layout are left alone. Top level keys of the layout:\n'
+                        '  controller: {properties: {KEY: VALUE}}\n'
+                        '  nodes: [{name, ip, type, communication-type, port, properties,\n'
+                        '           net-interfaces: [{name, ip, port, communication-type}]}]\n'
+                        '  storage-pool-definitions: [{name, properties}]\n'
+                        '  storage-pools: [{node, name, driver, driver-pool, properties}]\n'
+                        '  resource-definitions: [{name, port, properties,\n'
+                        '                          volume-definitions: [{number, size, minor, properties}]}]\n'
+                        '  resources: [{node, resource-definition, storage-pool, diskless, properties}]\n'
+                        'A property with a null value gets deleted.'
+        )
+        p_apply.add_argument('-f', '--file', required=True, help='Layout file (JSON, or YAML if PyYAML is installed)')
+        p_apply.add_argument('--dry-run', action='store_true', help='Only print the plan, do not change anything')
+        self.add_parser_bulk(p_apply)
+        p_apply.set_defaults(func=self.apply)
+
+    @classmethod
+    def _load_layout(cls, path):
+        try:
+            with open(path) as layout_file:
+                content = layout_file.read()
+        except IOError as err:
+            raise LinstorClientError("Unable to read layout '{p}': {e}".format(p=path, e=err), ExitCode.UNKNOWN_ERROR)
+
+        try:
+            layout = json.loads(content)
+        except ValueError as json_err:
+            if yaml is None:
+                raise LinstorClientError(
+                    "Layout is not valid JSON ({e}) and YAML needs the python yaml module".format(e=json_err),
+                    ExitCode.OPTION_NOT_SUPPORTED
+                )
+            try:
+                layout = yaml.safe_load(content)
+            except yaml.YAMLError as err:
+                raise LinstorClientError("Layout is neither valid JSON nor YAML: " + str(err), ExitCode.ARGPARSE_ERROR)
+
+        if not isinstance(layout, dict):
+            raise LinstorClientError("Layout has to be a mapping of object types", ExitCode.ARGPARSE_ERROR)
+        unknown = [x for x in layout if x not in ['controller', 'nodes', 'storage-pool-definitions',
+                                                  'storage-pools', 'resource-definitions', 'resources']]
+        if unknown:
+            raise LinstorClientError("Unknown layout keys: " + ", ".join(unknown), ExitCode.ARGPARSE_ERROR)
+        return layout
+
+    @staticmethod
+    def _digest(data):
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _props(obj):
+        """Returns the properties of a layout object with all values as strings, None marks a deletion."""
+        props = {}
+        for key, value in (obj.get('properties') or {}).items():
+            if isinstance(value, bool):
+                props[key] = BOOL_TRUE if value else BOOL_FALSE
+            elif isinstance(value, (int, float)):
+                props[key] = str(value)
+            else:
+                props[key] = value
+        return props
+
+    @staticmethod
+    def _required(obj, key, obj_type):
+        if obj.get(key) is None:
+            raise LinstorClientError(
+                "Layout {t} entry {o} is missing '{k}'".format(t=obj_type, o=json.dumps(obj, sort_keys=True), k=key),
+                ExitCode.ARGPARSE_ERROR
+            )
+        return obj[key]
+
+    def _fetch_state(self, args):
+        """
+        Fetches all lists concurrently and returns the current state as dict identity -> attributes.
+        """
+        lists = parallel_map(lambda list_func: list_func(), [
+            self._linstor.controller_props,
+            self._linstor.node_list,
+            self._linstor.storage_pool_dfn_list,
+            self._linstor.storage_pool_list,
+            self._linstor.resource_dfn_list,
+            self._linstor.resource_list
+        ], args.parallel)
+        for lstmsg in lists:
+            self.check_list_sanity(args, lstmsg)
+        ctrl, nodes, stor_pool_dfns, stor_pools, rsc_dfns, rscs = [x[0].proto_msg if x else None for x in lists]
+
+        def props(prop_list):
+            return {x.key: x.value for x in prop_list}
+
+        state = {'controller': {'props': props(ctrl.props) if ctrl else {}}}
+        for node in nodes.nodes if nodes else []:
+            state['node ' + node.name] = {'props': props(node.props), 'type': node.type}
+            for netif in node.net_interfaces:
+                state['net-interface {n}/{i}'.format(n=node.name, i=netif.name)] = {'ip': netif.address}
+        for stor_pool_dfn in stor_pool_dfns.stor_pool_dfns if stor_pool_dfns else []:
+            state['storage-pool-definition ' + stor_pool_dfn.stor_pool_name] = {'props': props(stor_pool_dfn.props)}
+        for stor_pool in stor_pools.stor_pools if stor_pools else []:
+            state['storage-pool {n}/{p}'.format(n=stor_pool.node_name, p=stor_pool.stor_pool_name)] = {
+                'props': props(stor_pool.props),
+                'driver': stor_pool.driver
+            }
+        for rsc_dfn in rsc_dfns.rsc_dfns if rsc_dfns else []:
+            state['resource-definition ' + rsc_dfn.rsc_name] = {'props': props(rsc_dfn.rsc_dfn_props)}
+            for vlm_dfn in rsc_dfn.vlm_dfns:
+                state['volume-definition {r}/{v}'.format(r=rsc_dfn.rsc_name, v=vlm_dfn.vlm_nr)] = {
+                    'props': props(vlm_dfn.vlm_props),
+                    'size': vlm_dfn.vlm_size
+                }
+        for rsc in rscs.resources if rscs else []:
+            state['resource {n}/{r}'.format(n=rsc.node_name, r=rsc.name)] = {'props': props(rsc.props)}
+        return state
+
+    def _chain(self, *calls):
+        """Returns a callable that runs the given api calls in order until one fails."""
+        def run():
+            replies = []
+            for call in calls:
+                replies += call()
+                if not self._linstor.all_api_responses_success(replies):
+                    break
+            return replies
+        return run
+
+    @staticmethod
+    def _describe(values):
+        return ", ".join(["{k}={v}".format(k=k, v='' if v is None else v) for k, v in sorted(values.items())])
+
+    def _plan_object(self, plan, state, obj_type, name, desired, create_calls, modify_call, requires=None):
+        """
+        Adds the step that brings a single object to its desired state to the plan.
+
+        :param dict desired: desired attributes, 'props' holds the managed properties
+        :param list create_calls: api calls creating the object, None if it cannot be created
+        :param modify_call: callable(set_props, delete_props, attributes) modifying the object
+        """
+        step = PlanStep(None, obj_type, name, None, requires=requires)
+        props = desired.get('props', {})
+        current = state.get(step.identity)
+        if current is None:
+            set_props = {k: v for k, v in props.items() if v is not None}
+            calls = list(create_calls)
+            if set_props:
+                calls.append(partial(modify_call, set_props, [], {}))
+            changes = {k: v for k, v in desired.items() if k != 'props'}
+            changes.update(set_props)
+            step.action = PlanStep.CREATE
+            step.changes = self._describe(changes)
+            step.func = self._chain(*calls)
+            state[step.identity] = dict(desired, props=set_props)
+            plan.append(step)
+            return
+
+        # compare only what the layout manages, by digest of both views
+        current_view = dict([(k, current.get(k)) for k in desired if k != 'props'])
+        current_view['props'] = {k: current['props'].get(k) for k in props}
+        desired_view = dict(desired, props=props)
+        if self._digest(current_view) == self._digest(desired_view):
+            return
+
+        attributes = {k: v for k, v in desired.items() if k != 'props' and current.get(k) != v}
+        set_props = {k: v for k, v in props.items() if v is not None and current['props'].get(k) != v}
+        delete_props = [k for k, v in props.items() if v is None and k in current['props']]
+        changes = dict(attributes)
+        changes.update(set_props)
+        changes.update({k: None for k in delete_props})
+        step.action = PlanStep.MODIFY
+        step.changes = self._describe(changes)
+        step.func = partial(modify_call, set_props, delete_props, attributes)
+        plan.append(step)
+
+    @staticmethod
+    def _conflict(plan, obj_type, name, message):
+        plan.append(PlanStep(PlanStep.CONFLICT, obj_type, name, message))
+
+    def _plan(self, layout, state):
+        """
+        Computes the steps needed to bring the cluster from state to layout.
+
+        :return: list of PlanStep in dependency order
+        """
+        plan = []
+        api = self._linstor
+
+        ctrl_props = self._props(layout.get('controller') or {})
+        if ctrl_props:
+            def modify_ctrl(set_props, delete_props, attributes):
+                return self._chain(
+                    *([partial(api.controller_set_prop, k, v) for k, v in sorted(set_props.items())] +
+                      [partial(api.controller_del_prop, k) for k in delete_props])
+                )()
+            self._plan_object(plan, state, 'controller', None, {'props': ctrl_props}, [], modify_ctrl)
+
+        for node in layout.get('nodes') or []:
+            name = self.check_name(self._required(node, 'name', 'node'), NODE_NAME)
+            node_type = node.get('type', VAL_NODE_TYPE_STLT)
+            current = state.get('node ' + name)
+            if current is not None and current['type'].lower() != node_type.lower():
+                self._conflict(plan, 'node', name, "type is {c}, cannot change to {t}".format(
+                    c=current['type'], t=node_type))
+                continue
+            if current is None:
+                ip = self._required(node, 'ip', 'node')
+                # the default interface is created together with the node
+                state['net-interface {n}/default'.format(n=name)] = {'ip': ip}
+            self._plan_object(
+                plan, state, 'node', name, {'props': self._props(node)},
+                [partial(api.node_create, name, node_type, node.get('ip'),
+                         node.get('communication-type', VAL_NETCOM_TYPE_PLAIN), node.get('port'), 'default')],
+                lambda set_props, delete_props, attributes, name=name: api.node_modify(name, set_props, delete_props)
+            )
+
+            for netif in node.get('net-interfaces') or []:
+                netif_name = self._required(netif, 'name', 'net-interface')
+                netif_args = [name, netif_name, self._required(netif, 'ip', 'net-interface'), netif.get('port'),
+                              netif.get('communication-type')]
+                self._plan_object(
+                    plan, state, 'net-interface', name + '/' + netif_name, {'ip': netif['ip']},
+                    [partial(api.netinterface_create, *netif_args)],
+                    lambda set_props, delete_props, attributes, netif_args=netif_args:
+                        api.netinterface_modify(*netif_args),
+                    requires=['node ' + name]
+                )
+
+        for stor_pool_dfn in layout.get('storage-pool-definitions') or []:
+            name = self.check_name(self._required(stor_pool_dfn, 'name', 'storage-pool-definition'), STORPOOL_NAME)
+            self._plan_object(
+                plan, state, 'storage-pool-definition', name, {'props': self._props(stor_pool_dfn)},
+                [partial(api.storage_pool_dfn_create, name)],
+                lambda set_props, delete_props, attributes, name=name:
+                    api.storage_pool_dfn_modify(name, set_props, delete_props)
+            )
+
+        for stor_pool in layout.get('storage-pools') or []:
+            node_name = self.check_name(self._required(stor_pool, 'node', 'storage-pool'), NODE_NAME)
+            name = self.check_name(self._required(stor_pool, 'name', 'storage-pool'), STORPOOL_NAME)
+            driver = StoragePoolCommands.driver_name(self._required(stor_pool, 'driver', 'storage-pool'))
+            sp_name = node_name + '/' + name
+            current = state.get('storage-pool ' + sp_name)
+            if current is not None and current['driver'] not in [driver, driver + 'Driver']:
+                self._conflict(plan, 'storage-pool', sp_name, "driver is {c}, cannot change to {d}".format(
+                    c=current['driver'], d=driver))
+                continue
+            self._plan_object(
+                plan, state, 'storage-pool', sp_name, {'props': self._props(stor_pool)},
+                [partial(api.storage_pool_create, node_name, name, driver, stor_pool.get('driver-pool'))],
+                lambda set_props, delete_props, attributes, node_name=node_name, name=name:
+                    api.storage_pool_modify(node_name, name, set_props, delete_props),
+                requires=['node ' + node_name, 'storage-pool-definition ' + name]
+            )
+
+        vlm_dfns = {}
+        for rsc_dfn in layout.get('resource-definitions') or []:
+            name = self.check_name(self._required(rsc_dfn, 'name', 'resource-definition'), RES_NAME)
+            self._plan_object(
+                plan, state, 'resource-definition', name, {'props': self._props(rsc_dfn)},
+                [partial(api.resource_dfn_create, name, rsc_dfn.get('port'))],
+                lambda set_props, delete_props, attributes, name=name:
+                    api.resource_dfn_modify(name, set_props, delete_props)
+            )
+
+            vlm_dfns[name] = []
+            for idx, vlm_dfn in enumerate(rsc_dfn.get('volume-definitions') or []):
+                vlm_nr = vlm_dfn.get('number', idx)
+                size = VolumeDefinitionCommands._get_volume_size(
+                    str(self._required(vlm_dfn, 'size', 'volume-definition')))
+                vd_name = '{r}/{v}'.format(r=name, v=vlm_nr)
+                vlm_dfns[name].append('volume-definition ' + vd_name)
+                current = state.get('volume-definition ' + vd_name)
+                if current is not None and current['size'] > size:
+                    self._conflict(plan, 'volume-definition', vd_name,
+                                   "size is {c} KiB, cannot shrink to {s} KiB".format(c=current['size'], s=size))
+                    continue
+
+                def modify_vlm_dfn(set_props, delete_props, attributes, name=name, vlm_nr=vlm_nr):
+                    return api.volume_dfn_modify(
+                        name, vlm_nr, set_properties=set_props, delete_properties=delete_props, **attributes)
+                self._plan_object(
+                    plan, state, 'volume-definition', vd_name, {'props': self._props(vlm_dfn), 'size': size},
+                    [partial(api.volume_dfn_create, name, size, vlm_nr, vlm_dfn.get('minor'), False, None)],
+                    modify_vlm_dfn,
+                    requires=['resource-definition ' + name]
+                )
+
+        for rsc in layout.get('resources') or []:
+            node_name = self.check_name(self._required(rsc, 'node', 'resource'), NODE_NAME)
+            rsc_name = self.check_name(self._required(rsc, 'resource-definition', 'resource'), RES_NAME)
+            stor_pool = rsc.get('storage-pool')
+            requires = ['node ' + node_name, 'resource-definition ' + rsc_name] + vlm_dfns.get(rsc_name, [])
+            if stor_pool:
+                requires.append('storage-pool {n}/{p}'.format(n=node_name, p=stor_pool))
+            self._plan_object(
+                plan, state, 'resource', node_name + '/' + rsc_name, {'props': self._props(rsc)},
+                [partial(api.resource_create, node_name, rsc_name, bool(rsc.get('diskless')), stor_pool)],
+                lambda set_props, delete_props, attributes, node_name=node_name, rsc_name=rsc_name:
+                    api.resource_modify(node_name, rsc_name, set_props, delete_props),
+                requires=requires
+            )
+
+        return sorted(plan, key=lambda x: self.OBJECT_ORDER.index(x.obj_type))
+
+    def _show_plan(self, args, plan):
+        if args.machine_readable:
+            print(self._to_json([
+                {'action': x.action, 'object': x.identity, 'changes': x.changes} for x in plan
+            ]))
+            return
+
+        tbl = linstor_client.Table(utf8=not args.no_utf8, colors=not args.no_color)
+        tbl.add_column("Action", color=Color.DARKGREEN)
+        tbl.add_column("Object")
+        tbl.add_column("Changes")
+        colors = {PlanStep.CREATE: Color.DARKGREEN, PlanStep.MODIFY: Color.YELLOW, PlanStep.CONFLICT: Color.RED}
+        for step in plan:
+            tbl.add_row([tbl.color_cell(step.action, colors[step.action]), step.identity, step.changes])
+        tbl.show()
+
+    def _execute(self, args, plan):
+        """
+        Executes the plan one object type after the other, the steps of a type args.parallel at a time.
+        Steps that depend on a failed or conflicting step are skipped.
+        """
+        def journal_step(step):
+            return step.identity + ' ' + self._digest(step.changes)
+
+        results = []
+        failed = set([x.identity for x in plan if x.action == PlanStep.CONFLICT])
+        with Journal.from_args(args) as journal:
+            journal.plan([journal_step(x) for x in plan if x.action != PlanStep.CONFLICT])
+
+            def run(step):
+                blocked = [x for x in step.requires if x in failed]
+                if blocked:
+                    return BulkResult(step.identity, exit_code=ExitCode.API_ERROR,
+                                      message="Skipped, {b} failed".format(b=blocked[0]))
+                if journal.is_done(journal_step(step)):
+                    return BulkResult(step.identity, message="Completed by an earlier run")
+                return BulkResult(
+                    step.identity,
+                    journal.run(journal_step(step), step.func, self._linstor.all_api_responses_success)
+                )
+
+            for obj_type in self.OBJECT_ORDER:
+                steps = [x for x in plan if x.obj_type == obj_type and x.action != PlanStep.CONFLICT]
+                type_results = parallel_map(run, steps, args.parallel)
+                failed.update([x.identity for x in type_results if x.exit_code(args.warn_as_error) != ExitCode.OK])
+                results += type_results
+
+        results += [
+            BulkResult(x.identity, exit_code=ExitCode.API_ERROR, message=x.changes)
+            for x in plan if x.action == PlanStep.CONFLICT
+        ]
+        return self.handle_bulk_replies(args, results)
+
+    def apply(self, args):
+        layout = self._load_layout(args.file)
+        plan = self._plan(layout, self._fetch_state(args))
+
+        if not plan:
+            if args.machine_readable:
+                print(self._to_json([]))
+            else:
+                print("Nothing to do, the cluster matches the layout.")
+            return ExitCode.OK
+
+        if args.dry_run:
+            self._show_plan(args, plan)
+            return ExitCode.OK
+
+        return self._execute(args, plan)
@@ -1,18 +1,29 @@
 import linstor_client.argparse.argparse as argparse
+import collections
 import getpass
 import json
 import os
 import re
+import sys
+import time
 from datetime import datetime, timedelta
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
 
 import linstor
-from linstor.sharedconsts import NAMESPC_AUXILIARY, EVENT_VOLUME_DISK_STATE, EVENT_RESOURCE_STATE, \
-    EVENT_RESOURCE_DEPLOYMENT_STATE, EVENT_RESOURCE_DEFINITION_READY, EVENT_SNAPSHOT_DEPLOYMENT
+from linstor.sharedconsts import NAMESPC_AUXILIARY
 from linstor.properties import properties
 from linstor.protobuf_to_dict import protobuf_to_dict
 import linstor_client
-from linstor_client.utils import LinstorClientError, Output
-from linstor_client.consts import ExitCode, KEY_LS_CONTROLLERS
+from linstor_client.error_report_cache import ErrorReportCache, ErrorReportIndex
+from linstor_client.event_stream import EVENT_NAMES, FORMATTERS, GAP_EVENT, EventPrinter, EventRecorder, EventStats
+from linstor_client.journal import Journal
+from linstor_client.utils import LinstorClientError, Output, namecheck, parallel_map, rangecheck, reserve_args
+from linstor_client.consts import Color, ExitCode, KEY_LS_CONTROLLERS, DFLT_PARALLEL_REQUESTS, \
+    DFLT_WATCH_FLUSH_INTERVAL, DFLT_WATCH_STATS_TOP, DFLT_WATCH_STATS_WINDOW, WATCH_RECONNECT_DELAY, \
+    WATCH_RECONNECT_MAX_DELAY
 
 
 class ArgumentError(Exception):
@@ -24,17 +35,53 @@ class ArgumentError(Exception):
         return self._msg
 
 
+class BulkResult(object):
+    """
+    Outcome of a bulk operation for a single object.
+    """
+    def __init__(self, identity, replies=None, exit_code=None, message=None):
+        """
+        :param str identity: printable identity of the object, e.g. the resource name
+        :param list[linstor.ApiCallResponse] replies: replies of the controller for this object
+        :param exit_code: exit code for this object, derived from the replies if None
+        :param str message: message to show if there are no replies that explain the exit code
+        """
+        self.identity = identity
+        self.replies = replies if replies is not None else []
+        self._exit_code = exit_code
+        self._message = message
+
+    def exit_code(self, warn_as_error=False):
+        if self._exit_code is not None:
+            return self._exit_code
+        for reply in self.replies:
+            ret_class = Output.ret_class(reply.ret_code)
+            if ret_class == 'ERROR' or (ret_class == 'WARNING' and warn_as_error):
+                return ExitCode.API_ERROR
+        return ExitCode.OK
+
+    def message(self):
+        if self._message:
+            return self._message
+        failed = [x for x in self.replies if Output.ret_class(x.ret_code) in ['ERROR', 'WARNING']]
+        reply = failed[0] if failed else (self.replies[-1] if self.replies else None)
+        return reply.proto_msg.message if reply is not None else ''
+
+
 class Commands(object):
+    APPLY = 'apply'
     CONTROLLER = 'controller'
     CRYPT = 'encryption'
     DMMIGRATE = 'dm-migrate'
     EXIT = 'exit'
+    EXPORTER = 'exporter'
     GEN_ZSH_COMPLETER = 'gen-zsh-completer'
     CREATE_WATCH = 'create-watch'
     HELP = 'help'
     INTERACTIVE = 'interactive'
     LIST_COMMANDS = 'list-commands'
     NODE = 'node'
+    PROPERTY = 'property'
     RESOURCE = 'resource'
     RESOURCE_DEF = 'resource-definition'
     ERROR_REPORTS = 'error-reports'
@@ -44,12 +91,15 @@ class Commands(object):
     SNAPSHOT = 'snapshot'
 
     MainList = [
+        APPLY,
         CONTROLLER,
         CRYPT,
+        EXPORTER,
         HELP,
         INTERACTIVE,
         LIST_COMMANDS,
         NODE,
+        PROPERTY,
         RESOURCE,
         RESOURCE_DEF,
         ERROR_REPORTS,
@@ -112,6 +162,14 @@ class Commands(object):
             LONG = "lost"
             SHORT = "lo"
 
+        class Find(object):
+            LONG = "find"
+            SHORT = "f"
+
+        class Search(object):
+            LONG = "search"
+            SHORT = "se"
+
         class SetProperty(object):
             LONG = "set-property"
             SHORT = "sp"
@@ -185,27 +243,93 @@ class Commands(object):
         subp.metavar = "{%s}" % ", ".join(sorted([x.LONG for x in subcmds]))
 
     @classmethod
-    def handle_replies(cls, args, replies):
+    def handle_replies(cls, args, replies, outstream=None):
+        """:param outstream: stream the replies are written to, default stdout"""
         rc = ExitCode.OK
         if args and args.machine_readable:
             Commands._print_machine_readable(replies)
             return rc
 
-        for call_resp in replies:
-            current_rc = Output.handle_ret(
-                call_resp.proto_msg,
+        # collect the output and write it at once, bulk operations can return thousands of replies
+        collected = StringIO()
+        if args.summary:
+            rc = Output.handle_ret_summary(
+                [x.proto_msg for x in replies],
                 warn_as_error=args.warn_as_error,
-                no_color=args.no_color
+                no_color=args.no_color,
+                outstream=collected
             )
-            if current_rc != ExitCode.OK:
-                rc = current_rc
+        else:
+            for call_resp in replies:
+                current_rc = Output.handle_ret(
+                    call_resp.proto_msg,
+                    warn_as_error=args.warn_as_error,
+                    no_color=args.no_color,
+                    outstream=collected
+                )
+                if current_rc != ExitCode.OK:
+                    rc = current_rc
 
+        (outstream or sys.stdout).write(collected.getvalue())
+        return rc
+
+    @classmethod
+    def handle_bulk_replies(cls, args, results):
+        """
+        Prints the outcome of a bulk operation, one row per object.
+        With --summary only failed objects and the totals are printed.
+
+        :param args: parsed arguments
+        :param list[BulkResult] results: outcome per object
+        :return: ExitCode.OK if all objects succeeded, otherwise the exit code of the last failed object
+        """
+        rc = ExitCode.OK
+        for result in results:
+            obj_rc = result.exit_code(args.warn_as_error)
+            if obj_rc != ExitCode.OK:
+                rc = obj_rc
+
+        if args.machine_readable:
+            print(cls._to_json([{
+                'object': x.identity,
+                'exit_code': x.exit_code(args.warn_as_error),
+                'message': x.message(),
+                'replies': [protobuf_to_dict(y.proto_msg) for y in x.replies]
+            } for x in results]))
+            return rc
+
+        tbl = linstor_client.Table(utf8=not args.no_utf8, colors=not args.no_color)
+        tbl.add_column("Object")
+        tbl.add_column("Result", color=Color.DARKGREEN)
+        tbl.add_column("Message")
+        failed = 0
+        for result in results:
+            if result.exit_code(args.warn_as_error) == ExitCode.OK:
+                if args.summary:
+                    continue
+                state = tbl.color_cell("OK", Color.DARKGREEN)
+            else:
+                failed += 1
+                state = tbl.color_cell("FAILED", Color.RED)
+            tbl.add_row([result.identity, state, result.message()])
+        if tbl.table:
+            tbl.show()
+
+        print("{total} objects, {ok} succeeded, {failed} failed".format(
+            total=len(results), ok=len(results) - failed, failed=failed))
         return rc
 
     @classmethod
     def check_for_api_replies(cls, replies):
         return isinstance(replies[0], linstor.ApiCallResponse)
 
+    def check_list_sanity(self, args, replies):
+        if replies:
+            if self.check_for_api_replies(replies):
+                rc = self.handle_replies(args, replies)
+                raise LinstorClientError("List reply error", rc)
+        return True
+
     @classmethod
     def output_list(cls, args, replies, output_func, single_item=True):
         if replies:
@@ -234,6 +358,75 @@ class Commands(object):
         Commands._print_props(result, args)
         return ExitCode.OK
 
+    @classmethod
+    def add_parser_props_multi(cls, parser, object_name):
+        """Adds the options of list-properties for several objects."""
+        parser.add_argument(
+            '--all',
+            action="store_true",
+            help='Print the properties of every {o}'.format(o=object_name)
+        )
+        parser.add_argument(
+            '--ndjson',
+            action="store_true",
+            help='Print every property as a JSON object with the object identity on its own line'
+        )
+
+    @classmethod
+    def select_props(cls, objects, names, object_name):
+        """
+        Selects the property lists of named objects.
+
+        :param list[tuple[str, list]] objects: identity and property list of every object
+        :param list[str] names: identities to select, None selects all objects
+        :raises LinstorClientError: if a named object does not exist
+        """
+        if names is None:
+            return objects
+        props = dict(objects)
+        missing = [x for x in names if x not in props]
+        if missing:
+            raise LinstorClientError(
+                "{o} not found on controller: {n}".format(o=object_name, n=", ".join(missing)),
+                ExitCode.OBJECT_NOT_FOUND
+            )
+        return [(x, props[x]) for x in names]
+
+    @classmethod
+    def output_props_multi(cls, args, lstmsg, prop_objects_func):
+        """
+        Prints the properties of several objects from a single list reply in one table.
+
+        :param prop_objects_func: callable(args, proto_msg) returning a list of (identity, property list)
+        """
+        if cls.check_for_api_replies(lstmsg):
+            return cls.handle_replies(args, lstmsg)
+        prop_objects = prop_objects_func(args, lstmsg[0].proto_msg) if lstmsg else []
+
+        if args.ndjson:
+            for identity, props in prop_objects:
+                sys.stdout.write(''.join([
+                    json.dumps({'object': identity, 'key': x.key, 'value': x.value}, sort_keys=True) + '\n'
+                    for x in props
+                ]))
+            return ExitCode.OK
+
+        if args.machine_readable:
+            print(cls._to_json([
+                {'object': identity, 'key': x.key, 'value': x.value} for identity, props in prop_objects for x in props
+            ]))
+            return ExitCode.OK
+
+        tbl = linstor_client.Table(utf8=not args.no_utf8, colors=not args.no_color, pastable=args.pastable)
+        tbl.add_column("Object")
+        tbl.add_column("Key")
+        tbl.add_column("Value")
+        for identity, props in prop_objects:
+            for prop in props:
+                tbl.add_row([identity, prop.key, prop.value])
+        tbl.show()
+        return ExitCode.OK
+
     @classmethod
     def _to_json(cls, data):
         return json.dumps(data, indent=2)
@@ -288,24 +481,176 @@ class Commands(object):
 
     @classmethod
     def add_parser_keyvalue(cls, parser, property_object=None):
-        parser.add_argument('--aux', action="store_true", help="Property is an auxiliary user property.")
+        parser.add_argument('--aux', action="store_true", help="Properties are auxiliary user properties.")
+        parser.add_argument(
+            '--from-file',
+            metavar='FILE',
+            help='Read additional key=value lines from FILE, "-" reads stdin. Empty lines and lines starting'
+                 ' with # are ignored.'
+        )
         if property_object:
             props = Commands.get_allowed_props(property_object)
-            parser.add_argument(
-                'key',
-                help='; '.join([x['key'] + ': ' + x['info'] for x in props if 'info' in x])
-            ).completer = Commands.get_allowed_prop_keys(property_object)
+            key_help = '; '.join([x['key'] + ': ' + x['info'] for x in props if 'info' in x])
         else:
-            parser.add_argument(
-                'key',
-                help='a property key that will reside in the auxiliary namespace.'
-            )
+            key_help = 'Keys will reside in the auxiliary namespace.'
+        kv_arg = parser.add_argument(
+            'key_value',
+            metavar='KEY=VALUE',
+            nargs='*',
+            help='Properties to set, an empty value removes the property. '
+                 'A single "KEY [VALUE]" is accepted as well. ' + key_help
+        )
+        if property_object:
+            kv_arg.completer = Commands.get_allowed_prop_keys(property_object)
+
+    @classmethod
+    def add_parser_bulk(cls, parser):
+        """Adds the options shared by all bulk operations."""
         parser.add_argument(
-            'value',
-            nargs='?',
-            default='',
-            help='Value for the chosen property. If empty property will be removed.'
+            '--parallel',
+            type=rangecheck(1, 256),
+            default=DFLT_PARALLEL_REQUESTS,
+            metavar='N',
+            help='Maximum number of concurrent requests to the controller (default: %d).' % DFLT_PARALLEL_REQUESTS
         )
+        journal_group = parser.add_mutually_exclusive_group()
+        journal_group.add_argument(
+            '--journal',
+            metavar='FILE',
+            help='Record planned and completed steps in FILE, so an interrupted run can be resumed.'
+        )
+        journal_group.add_argument(
+            '--resume',
+            metavar='FILE',
+            help='Continue the run recorded in FILE: completed steps are skipped, failed steps are retried.'
+        )
+        reserve_args(['parallel', 'journal', 'resume'])
+
+    @classmethod
+    def check_name(cls, name, checktype):
+        """
+        Validates a name that could not be checked by argparse, e.g. because it is part of a list.
+
+        :raises ArgumentError: if the name is invalid
+        """
+        try:
+            return namecheck(checktype)(name)
+        except argparse.ArgumentTypeError:
+            raise ArgumentError("Name '{n}' is not valid".format(n=name))
+
+    @classmethod
+    def compile_name_regex(cls, pattern):
+        """
+        Compiles a regular expression that has to match object names as a whole, like the regular
+        expressions evaluated by the controller.
+
+        :raises ArgumentError: if the pattern is invalid
+        """
+        try:
+            return re.compile('(?:' + pattern + r')\Z')
+        except re.error as err:
+            raise ArgumentError("Invalid regular expression '{p}': {e}".format(p=pattern, e=err))
+
+    @classmethod
+    def add_parser_selector(cls, parser, object_name):
+        """Adds the options selecting several objects in place of the named one."""
+        parser.add_argument(
+            '--regex',
+            action='store_true',
+            help='The names are regular expressions, every {o} matching them is selected.'.format(o=object_name)
+        )
+        parser.add_argument(
+            '--aux-match',
+            action='append',
+            metavar='KEY=VALUE',
+            help='Select every {o} with the auxiliary property KEY set to VALUE, an empty VALUE selects {o}s '
+                 'without the property. Can be given multiple times, all have to match.'.format(o=object_name)
+        )
+        parser.add_argument('--all', action='store_true', help='Select every {o}.'.format(o=object_name))
+        reserve_args(['regex', 'aux_match', 'all'])
+        cls.add_parser_bulk(parser)
+
+    @classmethod
+    def is_selector(cls, args):
+        return args.regex or args.all or bool(args.aux_match)
+
+    @classmethod
+    def selector_names(cls, args, name_attrs):
+        """
+        Returns the names given as positional arguments for a command with add_parser_selector options,
+        None if the selector does not use names.
+        A name positional that takes several names (nargs='*') is combined into one alternative per position.
+        Without names argparse assigns the first key=value arguments to the name positionals, they are
+        moved back to args.key_value. Arguments without a '=' are names, which --all and --aux-match do not take.
+
+        :param list[str] name_attrs: dests of the name positionals
+        :raises ArgumentError: if names are missing or the selector options contradict each other
+        """
+        if args.all and (args.regex or args.aux_match):
+            raise ArgumentError("--all cannot be combined with --regex or --aux-match")
+        names = [getattr(args, x) for x in name_attrs]
+        given = [x for x in names if x is not None and x != []]
+        if (args.all or args.aux_match) and not args.regex:
+            movable = hasattr(args, 'key_value')
+            stray = [
+                name for x in given for name in (x if isinstance(x, list) else [x]) if not movable or '=' not in name
+            ]
+            if stray:
+                raise ArgumentError("--all and --aux-match cannot be combined with names ({n}), "
+                                    "use --regex to select by name".format(n=", ".join(stray)))
+            if given:
+                args.key_value = given + args.key_value
+            return None
+        if len(given) != len(names):
+            raise ArgumentError("Missing " + " and ".join(name_attrs[len(given):]))
+        return ['|'.join(['(?:' + n + ')' for n in x]) if isinstance(x, list) else x for x in names]
+
+    @classmethod
+    def select_objects(cls, args, objects, names_of, props_of, names):
+        """
+        Filters objects by the selector options.
+
+        :param objects: protobuf objects of a single list fetch
+        :param names_of: callable returning the list of names of an object, matched against names
+        :param props_of: callable returning the property list of an object
+        :param list[str] names: regular expressions as returned by selector_names, None matches every name
+        :return: the selected objects
+        """
+        patterns = [cls.compile_name_regex(x) for x in names] if names is not None else None
+        aux_match = cls.parse_key_value_pairs(args.aux_match or [])
+        wanted = dict(aux_match['pairs'])
+        wanted.update({k: '' for k in aux_match['delete']})
+
+        selected = []
+        for obj in objects:
+            if patterns is not None and not all(p.match(n) for p, n in zip(patterns, names_of(obj))):
+                continue
+            props = {x.key: x.value for x in props_of(obj)}
+            if all(props.get(NAMESPC_AUXILIARY + '/' + k, '') == v for k, v in wanted.items()):
+                selected.append(obj)
+        return selected
+
+    def modify_selected(self, args, modifications):
+        """
+        Runs the modifications of selected objects, args.parallel at a time, and prints a result per object.
+
+        :param list[tuple[str, callable]] modifications: object identity and the api call modifying it
+        """
+        if not modifications:
+            raise LinstorClientError("No object matches the selection", ExitCode.OBJECT_NOT_FOUND)
+
+        with Journal.from_args(args) as journal:
+            journal.plan(['modify ' + identity for identity, _ in modifications])
+
+            def modify(modification):
+                identity, func = modification
+                step = 'modify ' + identity
+                if journal.is_done(step):
+                    return BulkResult(identity, message="Completed by an earlier run")
+                return BulkResult(identity, journal.run(step, func, self._linstor.all_api_responses_success))
+
+            results = parallel_map(modify, modifications, args.parallel)
+        return self.handle_bulk_replies(args, results)
 
     @classmethod
     def _print_props(cls, prop_list_map, args):
@@ -337,10 +682,49 @@ class Commands(object):
         raise NotImplementedError('abstract')
 
     @classmethod
-    def _attach_aux_prop(cls, args):
+    def _read_key_value_file(cls, path):
+        try:
+            if path == '-':
+                lines = sys.stdin.readlines()
+            else:
+                with open(path) as kv_file:
+                    lines = kv_file.readlines()
+        except (IOError, OSError) as err:
+            raise LinstorClientError("Unable to read '{p}': {e}".format(p=path, e=err), ExitCode.ARGPARSE_ERROR)
+
+        kv_pairs = []
+        for lineno, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if '=' not in line:
+                raise LinstorClientError(
+                    "{p}:{n}: line does not contain a '='".format(p=path, n=lineno), ExitCode.ARGPARSE_ERROR)
+            kv_pairs.append(line)
+        return kv_pairs
+
+    @classmethod
+    def parse_set_props(cls, args):
+        """
+        Collects the properties of a set-property command from its key=value arguments and --from-file.
+        Later assignments of a key override earlier ones.
+
+        :return dict[str, str]: see parse_key_value_pairs
+        """
+        kv_pairs = list(args.key_value)
+        if len(kv_pairs) in [1, 2] and '=' not in kv_pairs[0]:
+            kv_pairs = ['='.join(kv_pairs) if len(kv_pairs) == 2 else kv_pairs[0] + '=']  # KEY [VALUE]
+        if args.from_file:
+            kv_pairs += cls._read_key_value_file(args.from_file)
+        if not kv_pairs:
+            raise ArgumentError("No properties given, use KEY=VALUE or --from-file")
+
         if args.aux:
-            args.key = NAMESPC_AUXILIARY + '/' + args.key
-        return args
+            kv_pairs = [NAMESPC_AUXILIARY + '/' + x for x in kv_pairs]
+        last = {}
+        for kv in kv_pairs:
+            last[kv.split('=', 1)[0]] = kv
+        return cls.parse_key_value_pairs([last[k] for k in sorted(last)])
 
     @staticmethod
     def show_group_completer(lst, where):
@@ -508,6 +892,56 @@ class MiscCommands(Commands):
         c_create_watch.add_argument('--node-name', help='Name of the node').completer = self.node_completer
         c_create_watch.add_argument('--resource-name', help='Name of the resource').completer = self.resource_completer
         c_create_watch.add_argument('--volume-number', type=int, help='Volume number')
+        c_create_watch.add_argument(
+            '--events',
+            nargs='+',
+            choices=EVENT_NAMES,
+            help='Only print these events'
+        )
+        c_create_watch.add_argument(
+            '--format',
+            choices=sorted(FORMATTERS.keys()),
+            default='text',
+            help='Output format, ndjson prints every event as a JSON object on its own line'
+        )
+        c_create_watch.add_argument(
+            '--flush-interval',
+            type=float,
+            default=DFLT_WATCH_FLUSH_INTERVAL,
+            help='Seconds an event may wait in the output buffer, 0 writes every event immediately.'
+                 ' Default: %(default)s'
+        )
+        c_create_watch.add_argument(
+            '--record',
+            metavar='FILE',
+            help='Also write all received events to FILE, for replay with --replay-events'
+        )
+        c_create_watch.add_argument(
+            '--stats',
+            metavar='INTERVAL',
+            type=float,
+            help='Instead of the events print every INTERVAL seconds the nodes, resources, event types and actions '
+                 'with the most events, in the last interval and the last {w} intervals'.format(
+                     w=DFLT_WATCH_STATS_WINDOW)
+        )
+        c_create_watch.add_argument(
+            '--top',
+            type=int,
+            default=DFLT_WATCH_STATS_TOP,
+            help='Number of keys per dimension reported by --stats. Default: %(default)s'
+        )
+        c_create_watch.add_argument(
+            '--follow',
+            action="store_true",
+            help='Keep watching if the event stream is lost: reconnect with exponential backoff, renew the '
+                 'subscription and print a "{g}" event in place of the missed events'.format(g=GAP_EVENT)
+        )
+        c_create_watch.add_argument(
+            '--max-retries',
+            type=int,
+            help='With --follow, give up after this many consecutive subscriptions without an event. '
+                 'Default: retry forever'
+        )
         c_create_watch.set_defaults(func=self.cmd_create_watch)
 
         # Enryption subcommands
@@ -569,7 +1003,8 @@ class MiscCommands(Commands):
         # Error subcommands
         error_subcmds = [
             Commands.Subcommands.List,
-            Commands.Subcommands.Show
+            Commands.Subcommands.Show,
+            Commands.Subcommands.Search
         ]
         error_parser = parser.add_parser(
             Commands.ERROR_REPORTS,
@@ -602,6 +1037,11 @@ class MiscCommands(Commands):
             nargs='+',
             help="Restrict to id's that begin with the given ones."
         )
+        c_list_error_reports.add_argument(
+            '--no-cache',
+            action="store_true",
+            help='Fetch the whole list from the controller instead of only the reports newer than the cached ones'
+        )
         c_list_error_reports.set_defaults(func=self.cmd_list_error_reports)
 
         c_error_report = error_subp.add_parser(
@@ -610,61 +1050,120 @@ class MiscCommands(Commands):
             description='Output content of an error report.'
         )
         c_error_report.add_argument("report_id", nargs='+')
+        c_error_report.add_argument(
+            '--no-cache',
+            action="store_true",
+            help='Fetch the reports from the controller even if they are cached'
+        )
         c_error_report.set_defaults(func=self.cmd_error_report)
 
+        c_search_error_reports = error_subp.add_parser(
+            Commands.Subcommands.Search.LONG,
+            aliases=[Commands.Subcommands.Search.SHORT],
+            formatter_class=argparse.RawTextHelpFormatter,
+            description='Search the contents of error reports, matches are grouped by exception and node.\n'
+                        'PATTERN is an SQLite full-text query, e.g. a word, "a phrase", a prefix* or a AND b.\n'
+                        'The reports are indexed locally, only new reports are downloaded.')
+        c_search_error_reports.add_argument('pattern', metavar='PATTERN', help='Full-text query')
+        c_search_error_reports.add_argument('-s', '--since', help='Only search errors since n days. e.g. "3days"')
+        c_search_error_reports.add_argument(
+            '-n',
+            '--nodes',
+            help='Only search error reports from these nodes.',
+            nargs='+'
+        )
+        c_search_error_reports.add_argument(
+            '-p', '--pastable', action="store_true", help='Generate pastable output')
+        c_search_error_reports.set_defaults(func=self.cmd_search_error_reports)
+
         self.check_subcommands(error_subp, error_subcmds)
 
-    @staticmethod
-    def _summarize_api_call_responses(responses):
-        return "; ".join([response.message for response in responses])
+    def _follow_events(self, args, reply_handler, event_handler, printer, object_identifier):
+        """
+        Watches events until a handler ends the watch. Whenever the event stream is lost, a gap marker is
+        written and the same subscription is renewed after reconnecting with exponential backoff.
+
+        :return: the result of the handler that ended the watch, or CONNECTION_ERROR after args.max_retries
+                 consecutive subscriptions without an event
+        """
+        received = [0]
+
+        def counting_handler(event_header, event_data):
+            received[0] += 1
+            return event_handler(event_header, event_data)
+
+        delay = WATCH_RECONNECT_DELAY
+        failures = 0
+        gap_open = False
+        reconnect = False
+        while True:
+            received[0] = 0
+            try:
+                if reconnect:
+                    self._linstor.disconnect()
+                    self._linstor.connect()
+                result = self._linstor.watch_events(reply_handler, counting_handler, object_identifier)
+                if result is not None:
+                    return result
+                reason = "Event stream closed"
+            except linstor.LinstorNetworkError as err:
+                reason = err.message
+
+            if received[0] > 0:
+                delay = WATCH_RECONNECT_DELAY
+                failures = 0
+                gap_open = False
+            else:
+                failures += 1
+            if args.max_retries is not None and failures >= args.max_retries:
+                sys.stderr.write("{r}, giving up after {n} attempts without events\n".format(r=reason, n=failures))
+                return ExitCode.CONNECTION_ERROR
+
+            if not gap_open:
+                printer.gap(reason)
+                gap_open = True
+            sys.stderr.write("{r}, reconnecting in {d:g}s\n".format(r=reason, d=delay))
+            time.sleep(delay)
+            delay = min(delay * 2, WATCH_RECONNECT_MAX_DELAY)
+            reconnect = True
 
     def cmd_create_watch(self, args):
         def reply_handler(replies):
-            create_watch_rc = self.handle_replies(args, replies)
+            # keep the ndjson output on stdout parseable
+            create_watch_rc = self.handle_replies(args, replies, sys.stderr if args.format == 'ndjson' else None)
             if create_watch_rc != ExitCode.OK:
                 return create_watch_rc
             return None
 
-        event_formatter_table = {
-            EVENT_VOLUME_DISK_STATE: lambda event_data: "Disk state: " + event_data.disk_state,
-            EVENT_RESOURCE_STATE: lambda event_data: "Resource ready: " + str(event_data.ready),
-            EVENT_RESOURCE_DEPLOYMENT_STATE: lambda event_data:
-                "Deployment state: " + self._summarize_api_call_responses(event_data.responses),
-            EVENT_RESOURCE_DEFINITION_READY: lambda event_data:
-                "Resource definition; ready: " + str(event_data.ready_count) +
-                ", error: " + str(event_data.error_count),
-            EVENT_SNAPSHOT_DEPLOYMENT: lambda event_data:
-                "Snapshot deployment state: " + self._summarize_api_call_responses(event_data.responses)
-        }
+        if args.stats is not None:
+            if args.stats <= 0:
+                raise ArgumentError("--stats: the interval has to be positive")
+            printer = EventStats(sys.stdout, args.stats, top=args.top, event_names=args.events)
+        else:
+            printer = EventPrinter(sys.stdout, args.format, args.events, args.flush_interval)
+        recorder = EventRecorder(args.record) if args.record else None
 
         def event_handler(event_header, event_data):
-            event_header_display = \
-                event_header.event_name + \
-                " [" + event_header.event_action + "]" + \
-                " (" + event_header.node_name + \
-                "/" + event_header.resource_name + \
-                ("/" + str(event_header.volume_number) if event_header.HasField("volume_number") else "") + \
-                ("@" + str(event_header.snapshot_name) if event_header.HasField("snapshot_name") else "") + \
-                ")"
-
-            if event_data:
-                event_formatter = event_formatter_table.get(event_header.event_name)
-                if event_formatter is None:
-                    print(event_header_display)
-                else:
-                    event_data_display = event_formatter(event_data)
-                    print(event_header_display + " " + event_data_display)
-            else:
-                print(event_header_display)
-
-        self._linstor.watch_events(
-            reply_handler, event_handler,
-            linstor.ObjectIdentifier(
-                node_name=args.node_name,
-                resource_name=args.resource_name,
-                volume_number=args.volume_number
-            )
+            if recorder is not None:
+                recorder.record(event_header, event_data)
+            return printer.handle(event_header, event_data)
+
+        object_identifier = linstor.ObjectIdentifier(
+            node_name=args.node_name,
+            resource_name=args.resource_name,
+            volume_number=args.volume_number
         )
+        try:
+            if args.follow:
+                return self._follow_events(args, reply_handler, event_handler, printer, object_identifier)
+            return self._linstor.watch_events(reply_handler, event_handler, object_identifier)
+        finally:
+            printer.close()
+            summary = printer.summary()
+            if recorder is not None:
+                recorder.close()
+                summary += "; {c} events recorded".format(c=recorder.recorded)
+            sys.stderr.write(summary + '\n')
 
     def cmd_crypt_enter_passphrase(self, args):
         if args.passphrase:
@@ -718,33 +1217,152 @@ class MiscCommands(Commands):
             i += 1
         tbl.show()
 
+    @staticmethod
+    def _parse_since(since):
+        """:return: datetime of a 'NUMdays' string, None if since is empty"""
+        if not since:
+            return None
+        m = re.match(r'(\d+)\W*d', since)
+        if not m:
+            raise LinstorClientError(
+                "Unable to parse since string: '{s_str}'. Use 'NUMdays'".format(s_str=since),
+                ExitCode.ARGPARSE_ERROR
+            )
+        return datetime.now() - timedelta(days=int(m.group(1)))
+
     def cmd_list_error_reports(self, args):
-        since = args.since
-        since_dt = None
-        if since:
-            m = re.match(r'(\d+)\W*d', since)
-            if m:
-                since_dt = datetime.now()
-                since_dt -= timedelta(days=int(m.group(1)))
-            else:
-                raise LinstorClientError(
-                    "Unable to parse since string: '{s_str}'. Use 'NUMdays'".format(s_str=since),
-                    ExitCode.ARGPARSE_ERROR
-                )
+        since_dt = self._parse_since(args.since)
 
         to_dt = None
         if args.to:
             to_dt = datetime.strptime(args.to, '%Y-%m-%d')
             to_dt = to_dt.replace(hour=23, minute=59, second=59)
 
-        lstmsg = self._linstor.error_report_list(nodes=args.nodes, since=since_dt, to=to_dt, ids=args.report_id)
+        cache = None if args.no_cache else self._error_report_cache(args)
+        if cache is None or not cache.covers(since_dt):
+            lstmsg = self._linstor.error_report_list(nodes=args.nodes, since=since_dt, to=to_dt, ids=args.report_id)
+            return self.output_list(args, lstmsg, self.show_error_report_list, single_item=False)
+
+        replies = self._refresh_error_report_cache(cache)
+        if replies:
+            return self.handle_replies(args, replies)
+        lstmsg = cache.entries(nodes=args.nodes, since=since_dt, to=to_dt, ids=args.report_id)
         return self.output_list(args, lstmsg, self.show_error_report_list, single_item=False)
 
+    def _error_report_cache(self, args):
+        """:return: the error report cache of the controller, None if it cannot be used"""
+        try:
+            return ErrorReportCache.for_controller(self.controller_list(args.controllers)[0])
+        except LinstorClientError as err:
+            sys.stderr.write(Output.color_str('WARNING:', Color.YELLOW, args.no_color) + ' ' + err.message +
+                             ', error reports are not cached\n')
+            return None
+
+    def _refresh_error_report_cache(self, cache):
+        """
+        Adds the entries of the reports created since the newest cached one, reports never change.
+
+        :return: the api replies if listing failed, None otherwise
+        """
+        new_reports = self._linstor.error_report_list(since=cache.newest())
+        if new_reports and self.check_for_api_replies(new_reports):
+            return new_reports
+        cache.add_entries(new_reports)
+        return None
+
+    def _update_error_report_index(self, args, cache, index, since):
+        """Indexes the reports created since the given datetime that are not yet indexed."""
+        replies = self._refresh_error_report_cache(cache)
+        if replies:
+            return self.handle_replies(args, replies)
+
+        indexed = index.indexed_ids()
+        missing = [x.id for x in cache.entries(since=since) if x.id not in indexed]
+        cached = [cache.content(x) for x in missing]
+        reports = [x for x in cached if x is not None]
+        missing = [report_id for report_id, report in zip(missing, cached) if report is None]
+        if missing:
+            fetched = self._linstor.error_report_list(with_content=True, ids=missing)
+            if fetched and self.check_for_api_replies(fetched):
+                return self.handle_replies(args, fetched)
+            cache.add_content(fetched)
+            reports += fetched
+        index.add(reports)
+        return ExitCode.OK
+
+    def cmd_search_error_reports(self, args):
+        since_dt = self._parse_since(args.since)
+        cache = ErrorReportCache.for_controller(self.controller_list(args.controllers)[0])
+        if not cache.covers(since_dt):
+            sys.stderr.write(Output.color_str('WARNING:', Color.YELLOW, args.no_color) +
+                             ' reports older than the cached ones are not searched\n')
+        index = ErrorReportIndex(cache.directory)
+        try:
+            rc = self._update_error_report_index(args, cache, index, since_dt)
+            if rc != ExitCode.OK:
+                return rc
+            try:
+                hits = index.search(args.pattern, nodes=args.nodes, since=since_dt)
+            except ValueError as err:
+                raise ArgumentError("Invalid search pattern '{p}': {e}".format(p=args.pattern, e=err))
+            # the index only holds what the cache holds, so it stays within the cache size
+            index.remove(index.indexed_ids() - cache.content_ids())
+        finally:
+            index.close()
+
+        groups = collections.OrderedDict()
+        for report_id, node, error_time, exception in hits:  # newest first
+            groups.setdefault((exception, node), []).append((report_id, error_time))
+        result = [
+            {
+                'exception': exception,
+                'node': node,
+                'hits': len(reports),
+                'latest': str(datetime.fromtimestamp(reports[0][1] / 1000.0))[:19],
+                'ids': [x[0] for x in reports]
+            }
+            for (exception, node), reports in sorted(groups.items(), key=lambda x: (-len(x[1]), x[0]))
+        ]
+
+        if args.machine_readable:
+            print(self._to_json(result))
+            return ExitCode.OK
+
+        tbl = linstor_client.Table(utf8=not args.no_utf8, colors=not args.no_color, pastable=args.pastable)
+        tbl.add_column("Exception", color=Color.DARKGREEN)
+        tbl.add_column("Node")
+        tbl.add_column("Hits", just_txt='>')
+        tbl.add_column("Latest")
+        tbl.add_column("Latest Id")
+        for group in result:
+            tbl.add_row([group['exception'], group['node'], str(group['hits']), group['latest'], group['ids'][0]])
+        tbl.show()
+        return ExitCode.OK
+
     def show_error_report(self, args, lstmsg):
 
         for error in lstmsg:
             print(error.text)
 
     def cmd_error_report(self, args):
-        lstmsg = self._linstor.error_report_list(with_content=True, ids=args.report_id)
+        cache = None if args.no_cache else self._error_report_cache(args)
+        if cache is None:
+            lstmsg = self._linstor.error_report_list(with_content=True, ids=args.report_id)
+            return self.output_list(args, lstmsg, self.show_error_report, single_item=False)
+
+        # ids may be prefixes, only the ones unambiguous among all reports are looked up in the cache
+        if [x for x in args.report_id if cache.resolve(x) != x]:
+            replies = self._refresh_error_report_cache(cache)
+            if replies:
+                return self.handle_replies(args, replies)
+        resolved = [cache.resolve(x) for x in args.report_id]
+        cached = [cache.content(x) if x is not None else None for x in resolved]
+        missing = [report_id for report_id, report in zip(args.report_id, cached) if report is None]
+        lstmsg = [x for x in cached if x is not None]
+        if missing:
+            fetched = self._linstor.error_report_list(with_content=True, ids=missing)
+            if fetched and self.check_for_api_replies(fetched):
+                return self.handle_replies(args, fetched)
+            cache.add_content(fetched)
+            lstmsg += fetched
         return self.output_list(args, lstmsg, self.show_error_report, single_item=False)
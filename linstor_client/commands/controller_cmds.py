@@ -1,4 +1,6 @@
 import linstor_client.argparse.argparse as argparse
+from functools import partial
+
 from linstor_client.commands import Commands, DrbdOptions
 
 
@@ -41,6 +43,7 @@ class ControllerCommands(Commands):
             aliases=[Commands.Subcommands.SetProperty.SHORT],
             description='Set a controller config property.')
         Commands.add_parser_keyvalue(c_set_ctrl_props, "controller")
+        Commands.add_parser_bulk(c_set_ctrl_props)
         c_set_ctrl_props.set_defaults(func=self.set_props)
 
         c_drbd_opts = con_subp.add_parser(
@@ -48,7 +51,8 @@ class ControllerCommands(Commands):
             aliases=[Commands.Subcommands.DrbdOptions.SHORT],
             description="Set common drbd options."
         )
-        DrbdOptions.add_arguments(c_drbd_opts, DrbdOptions.drbd_options()['options'].keys())
+        DrbdOptions.add_arguments_lazy(c_drbd_opts, DrbdOptions.all_option_names())
+        Commands.add_parser_bulk(c_drbd_opts)
         c_drbd_opts.set_defaults(func=self.cmd_controller_drbd_opts)
 
         # Controller - shutdown
@@ -73,30 +77,27 @@ class ControllerCommands(Commands):
 
         return self.output_props_list(args, lstmsg, self._props_list)
 
-    def set_props(self, args):
-        props = Commands.parse_key_value_pairs([args.key + '=' + args.value])
-
-        replies = []
-        for prop_key, prop_value in props['pairs'].items():
-            replies.extend(self._linstor.controller_set_prop(prop_key, prop_value))
-        for prop_key in props['delete']:
-            replies.extend(self._linstor.controller_del_prop(prop_key))
+    def _modify_props(self, args, set_props, delete_props):
+        """
+        The api changes one controller property per request, so several changes are sent concurrently,
+        args.parallel at a time, and reported per key.
+        """
+        modifications = [(k, partial(self._linstor.controller_set_prop, k, v)) for k, v in sorted(set_props.items())]
+        modifications += [(k, partial(self._linstor.controller_del_prop, k)) for k in sorted(delete_props)]
+        if len(modifications) <= 1:
+            return self.handle_replies(args, modifications[0][1]() if modifications else [])
+        return self.modify_selected(args, modifications)
 
-        return self.handle_replies(args, replies)
+    def set_props(self, args):
+        props = self.parse_set_props(args)
+        return self._modify_props(args, props['pairs'], props['delete'])
 
     def cmd_controller_drbd_opts(self, args):
         a = DrbdOptions.filter_new(args)
 
         mod_props, del_props = DrbdOptions.parse_opts(a)
 
-        replies = []
-        for prop, val in mod_props.items():
-            replies.extend(self._linstor.controller_set_prop(prop, val))
-
-        for delkey in del_props:
-            replies.extend(self._linstor.controller_del_prop(delkey))
-
-        return self.handle_replies(args, replies)
+        return self._modify_props(args, mod_props, del_props)
 
     def cmd_shutdown(self, args):
         replies = self._linstor.controller_shutdown()
@@ -1,4 +1,6 @@
 import linstor_client.argparse.argparse as argparse
+import os
+
 from linstor_client.utils import rangecheck, filter_new_args
 from linstor.drbdsetup_options import drbd_options
 import linstor.sharedconsts as apiconsts
@@ -15,10 +17,43 @@ class DrbdOptions(object):
         'peer-device-options': apiconsts.NAMESPC_DRBD_PEER_DEVICE_OPTIONS
     }
 
+    _index = None
+
     @classmethod
     def drbd_options(cls):
         return cls._options
 
+    @classmethod
+    def _option_index(cls):
+        """
+        Indexes the option names by category and by filter once per process.
+
+        :return: tuple of all option names, dict category -> option names, dict filter -> option names
+        """
+        if cls._index is None:
+            options = cls._options['options']
+            by_category = {}
+            for opt_key in options:
+                by_category.setdefault(options[opt_key]['category'], []).append(opt_key)
+            by_filter = {}
+            for filter_name, filter_keys in cls._options['filters'].items():
+                filter_keys = set(filter_keys)
+                by_filter[filter_name] = [x for x in options if x in filter_keys]
+            cls._index = (list(options), by_category, by_filter)
+        return cls._index
+
+    @classmethod
+    def all_option_names(cls):
+        return cls._option_index()[0]
+
+    @classmethod
+    def option_names_by_category(cls, category):
+        return cls._option_index()[1].get(category, [])
+
+    @classmethod
+    def option_names_by_filter(cls, filter_name):
+        return cls._option_index()[2].get(filter_name, [])
+
     @staticmethod
     def numeric_symbol(_min, _max, _symbols):
         def foo(x):
@@ -86,6 +121,34 @@ class DrbdOptions(object):
                 parser.add_argument('--%s-%s' % (cls.unsetprefix, opt_key),
                                     action='store_true')
 
+    @classmethod
+    def add_arguments_lazy(cls, parser, option_list):
+        """
+        Like add_arguments, but the arguments are only registered once the parser is about to parse, that is
+        when its subcommand got selected. Saves hundreds of add_argument calls on every other command.
+        """
+        if '_ARGCOMPLETE' in os.environ:
+            # argcomplete introspects the actions before the parser parses
+            cls.add_arguments(parser, option_list)
+            return
+
+        parse_known_args = parser.parse_known_args
+
+        def setup_and_parse_known_args(args=None, namespace=None):
+            cls.ensure_arguments(parser)
+            return parse_known_args(args, namespace)
+
+        parser.lazy_drbd_options = option_list
+        parser.parse_known_args = setup_and_parse_known_args
+
+    @classmethod
+    def ensure_arguments(cls, parser):
+        """Registers the arguments of a parser set up with add_arguments_lazy, if not done yet."""
+        option_list = getattr(parser, 'lazy_drbd_options', None)
+        if option_list:
+            parser.lazy_drbd_options = None
+            cls.add_arguments(parser, option_list)
+
     @classmethod
     def filter_new(cls, args):
         """return a dict containing all non-None args"""
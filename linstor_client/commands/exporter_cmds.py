@@ -0,0 +1,328 @@
+import linstor_client.argparse.argparse as argparse
+import sys
+import threading
+import time
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+import linstor
+import linstor.sharedconsts as apiconsts
+from linstor_client.commands import ArgumentError, Commands, NodeCommands, ResourceCommands, SnapshotCommands
+from linstor_client.consts import (DFLT_EXPORTER_LISTEN, DFLT_EXPORTER_REFRESH, WATCH_RECONNECT_DELAY,
+                                   WATCH_RECONNECT_MAX_DELAY, ExitCode)
+from linstor_client.event_stream import RecordedMessage
+from linstor_client.utils import LinstorClientError, parallel_map
+
+
+class MetricsCache(object):
+    """
+    Cluster state as exported by ExporterCommands.
+
+    The state is filled by full list calls and kept current between them by events, so a scrape only
+    renders the cached state and never talks to the controller.
+    """
+    LIST_CALLS = ['node_list', 'storage_pool_list', 'resource_list', 'snapshot_dfn_list']
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes = {}  # node -> connection status text
+        self._stor_pools = {}  # (node, storage pool) -> (driver, free bytes or None)
+        self._resources = {}  # (node, resource) -> {'in_use': bool, 'ready': bool or None}
+        self._volumes = {}  # (node, resource, volume nr) -> (rsc flags, vlm flags, disk state or None)
+        self._snapshots = {}  # (resource, snapshot) -> state text
+        self._error_reports = {}  # report id -> node
+        self._newest_report = None
+        self.up = False
+        self.subscribed = False
+        self.events = 0
+        self.refreshes = 0
+        self.last_refresh = 0.0
+
+    def update_lists(self, node_msg, stor_pool_msg, rsc_msg, snapshot_msg):
+        nodes = {}
+        for node in node_msg.nodes if node_msg else []:
+            nodes[node.name] = NodeCommands.conn_stat_dict[node.connection_status][0]
+
+        stor_pools = {}
+        for stor_pool in stor_pool_msg.stor_pools if stor_pool_msg else []:
+            free = None
+            if stor_pool.driver != 'DisklessDriver' and stor_pool.HasField('free_space'):
+                free = stor_pool.free_space.free_space * 1024
+            stor_pools[(stor_pool.node_name, stor_pool.stor_pool_name)] = (stor_pool.driver, free)
+
+        resources = {}
+        volumes = {}
+        for rsc in rsc_msg.resources if rsc_msg else []:
+            rsc_state = ResourceCommands.get_resource_state(rsc_msg.resource_states, rsc.node_name, rsc.name)
+            resources[(rsc.node_name, rsc.name)] = {
+                'in_use': rsc_state.in_use if rsc_state else False,
+                'ready': None
+            }
+            for vlm in rsc.vlms:
+                vlm_state = ResourceCommands.get_volume_state(rsc_state.vlm_states, vlm.vlm_nr) if rsc_state else None
+                disk_state = vlm_state.disk_state if vlm_state and vlm_state.HasField('disk_state') else None
+                volumes[(rsc.node_name, rsc.name, vlm.vlm_nr)] = (list(rsc.rsc_flags), list(vlm.vlm_flags), disk_state)
+
+        snapshots = {}
+        for snapshot_dfn in snapshot_msg.snapshot_dfns if snapshot_msg else []:
+            snapshots[(snapshot_dfn.rsc_name, snapshot_dfn.snapshot_name)] = \
+                SnapshotCommands.snapshot_state(snapshot_dfn)[0]
+
+        with self._lock:
+            for key, rsc in resources.items():
+                if key in self._resources:
+                    rsc['ready'] = self._resources[key]['ready']  # only known from events
+            self._nodes = nodes
+            self._stor_pools = stor_pools
+            self._resources = resources
+            self._volumes = volumes
+            self._snapshots = snapshots
+            self.up = True
+            self.refreshes += 1
+            self.last_refresh = time.time()
+
+    @property
+    def newest_report(self):
+        return self._newest_report
+
+    def update_error_reports(self, reports):
+        with self._lock:
+            for report in reports:
+                self._error_reports[report.id] = report.node_names
+                if self._newest_report is None or report.datetime > self._newest_report:
+                    self._newest_report = report.datetime
+
+    def update_event(self, event_header, event_data):
+        """Event handler for watch_events, always returns None so the watch goes on."""
+        rsc_key = (event_header.node_name, event_header.resource_name)
+        action = event_header.event_action
+        with self._lock:
+            self.events += 1
+            if event_header.event_name == apiconsts.EVENT_VOLUME_DISK_STATE:
+                vlm_key = rsc_key + (event_header.volume_number,)
+                if action == apiconsts.EVENT_STREAM_CLOSE_REMOVED:
+                    self._volumes.pop(vlm_key, None)
+                else:
+                    rsc_flags, vlm_flags, _ = self._volumes.get(vlm_key, ([], [], None))
+                    disk_state = event_data.disk_state if event_data and action == apiconsts.EVENT_STREAM_VALUE \
+                        else None
+                    self._volumes[vlm_key] = (rsc_flags, vlm_flags, disk_state)
+            elif event_header.event_name == apiconsts.EVENT_RESOURCE_STATE:
+                if action == apiconsts.EVENT_STREAM_CLOSE_REMOVED:
+                    self._resources.pop(rsc_key, None)
+                    for vlm_key in [x for x in self._volumes if x[:2] == rsc_key]:
+                        del self._volumes[vlm_key]
+                else:
+                    rsc = self._resources.setdefault(rsc_key, {'in_use': False, 'ready': None})
+                    rsc['ready'] = event_data.ready if event_data and action == apiconsts.EVENT_STREAM_VALUE \
+                        else False
+        return None
+
+    @staticmethod
+    def _labels(**labels):
+        escaped = [
+            '{k}="{v}"'.format(k=k, v=str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for k, v in sorted(labels.items())
+        ]
+        return '{' + ','.join(escaped) + '}'
+
+    def render(self):
+        """:return: the cached state in the Prometheus text exposition format"""
+        lines = []
+
+        def family(name, metric_type, description, samples):
+            lines.append('# HELP {n} {d}'.format(n=name, d=description))
+            lines.append('# TYPE {n} {t}'.format(n=name, t=metric_type))
+            for labels, value in samples:
+                lines.append('{n}{l} {v}'.format(n=name, l=self._labels(**labels) if labels else '', v=value))
+
+        with self._lock:
+            family('linstor_exporter_up', 'gauge', 'Whether the last refresh from the controller succeeded.',
+                   [({}, int(self.up))])
+            family('linstor_exporter_subscribed', 'gauge', 'Whether the event subscription is active.',
+                   [({}, int(self.subscribed))])
+            family('linstor_exporter_refreshes_total', 'counter', 'Number of full refreshes.',
+                   [({}, self.refreshes)])
+            family('linstor_exporter_last_refresh_timestamp_seconds', 'gauge', 'Time of the last full refresh.',
+                   [({}, self.last_refresh)])
+            family('linstor_exporter_events_total', 'counter', 'Number of events received.', [({}, self.events)])
+
+            family('linstor_node_connection_status', 'gauge', 'Connection status of the node, as in node list.', [
+                ({'node': node, 'status': status}, 1) for node, status in sorted(self._nodes.items())
+            ])
+            family('linstor_storage_pool_free_bytes', 'gauge', 'Free space of the storage pool.', [
+                ({'node': key[0], 'storage_pool': key[1], 'driver': value[0]}, value[1])
+                for key, value in sorted(self._stor_pools.items()) if value[1] is not None
+            ])
+            family('linstor_resource_in_use', 'gauge', 'Whether the resource is in use (primary).', [
+                ({'node': key[0], 'resource': key[1]}, int(value['in_use']))
+                for key, value in sorted(self._resources.items())
+            ])
+            family('linstor_resource_ready', 'gauge', 'Whether the resource is ready, as reported by events.', [
+                ({'node': key[0], 'resource': key[1]}, int(value['ready']))
+                for key, value in sorted(self._resources.items()) if value['ready'] is not None
+            ])
+
+            volume_states = []
+            volume_healthy = []
+            for key, (rsc_flags, vlm_flags, disk_state) in sorted(self._volumes.items()):
+                vlm_state = RecordedMessage(disk_state=disk_state) if disk_state else None
+                state, color = ResourceCommands.volume_state_cell(vlm_state, rsc_flags, vlm_flags)
+                labels = {'node': key[0], 'resource': key[1], 'volume': key[2]}
+                volume_states.append((dict(labels, state=state), 1))
+                volume_healthy.append((labels, int(color is None)))
+            family('linstor_volume_state', 'gauge', 'State of the volume, as in resource list-volumes.', volume_states)
+            family('linstor_volume_healthy', 'gauge', 'Whether the state of the volume is a good one.', volume_healthy)
+
+            family('linstor_snapshot_state', 'gauge', 'State of the snapshot, as in snapshot list.', [
+                ({'resource': key[0], 'snapshot': key[1], 'state': state}, 1)
+                for key, state in sorted(self._snapshots.items())
+            ])
+
+            report_counts = {}
+            for node in self._error_reports.values():
+                report_counts[node] = report_counts.get(node, 0) + 1
+            family('linstor_error_reports', 'gauge', 'Number of error reports.', [
+                ({'node': node}, count) for node, count in sorted(report_counts.items())
+            ])
+
+        return '\n'.join(lines) + '\n'
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class ExporterCommands(Commands):
+    def __init__(self):
+        super(ExporterCommands, self).__init__()
+        # the event subscription shares the connection, it must not reconnect while a refresh is running
+        self._connection_lock = threading.Lock()
+
+    def setup_commands(self, parser):
+        p_exporter = parser.add_parser(
+            Commands.EXPORTER,
+            formatter_class=argparse.RawTextHelpFormatter,
+            description='Serves metrics of the cluster in the Prometheus text format on http://HOST:PORT/metrics.\n'
+                        'Nodes, storage pools, resources, snapshots and error reports are listed every --refresh '
+                        'seconds,\nresource and volume states are kept current by events in between.')
+        p_exporter.add_argument(
+            '--listen',
+            metavar='HOST:PORT',
+            default=DFLT_EXPORTER_LISTEN,
+            help='Address to serve the metrics on. Default: %(default)s'
+        )
+        p_exporter.add_argument(
+            '--refresh',
+            metavar='SECONDS',
+            type=float,
+            default=DFLT_EXPORTER_REFRESH,
+            help='Seconds between two full refreshes. Default: %(default)s'
+        )
+        p_exporter.add_argument(
+            '--once',
+            action="store_true",
+            help='Print the metrics once to stdout instead of serving them, e.g. for a textfile collector'
+        )
+        p_exporter.set_defaults(func=self.exporter)
+
+    @staticmethod
+    def parse_listen(listen):
+        """
+        :param str listen: HOST:PORT, an IPv6 host in brackets
+        :return: tuple (host, port)
+        """
+        host, _, port = listen.rpartition(':')
+        if not host or not port.isdigit():
+            raise ArgumentError("Invalid listen address '{l}', expected HOST:PORT".format(l=listen))
+        return host.strip('[]'), int(port)
+
+    def refresh(self, args, cache):
+        """Updates the cache by full list calls and fetches the error reports created since the last refresh."""
+        calls = MetricsCache.LIST_CALLS
+        with self._connection_lock:
+            lists = parallel_map(lambda x: getattr(self._linstor, x)(), calls, len(calls))
+            error_reports = self._linstor.error_report_list(since=cache.newest_report)
+        for lstmsg in lists:
+            self.check_list_sanity(args, lstmsg)
+        cache.update_lists(*[x[0].proto_msg if x else None for x in lists])
+        cache.update_error_reports(error_reports)
+
+    def _watch(self, cache, stop):
+        """Keeps an event subscription for the cache, reconnecting with exponential backoff."""
+        delay = WATCH_RECONNECT_DELAY
+        reconnect = False
+        while not stop.is_set():
+            events_before = cache.events
+            try:
+                if reconnect:
+                    with self._connection_lock:
+                        self._linstor.disconnect()
+                        self._linstor.connect()
+                cache.subscribed = True
+                self._linstor.watch_events(self._linstor.return_if_failure, cache.update_event,
+                                           linstor.ObjectIdentifier())
+            except linstor.LinstorError as err:
+                sys.stderr.write("Event subscription lost: {e}\n".format(e=err.message))
+            cache.subscribed = False
+            if cache.events > events_before:
+                delay = WATCH_RECONNECT_DELAY
+            stop.wait(delay)
+            delay = min(delay * 2, WATCH_RECONNECT_MAX_DELAY)
+            reconnect = True
+
+    @staticmethod
+    def _handler(cache):
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ['/', '/metrics']:
+                    self.send_error(404)
+                    return
+                body = cache.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+        return MetricsHandler
+
+    def exporter(self, args):
+        cache = MetricsCache()
+        if args.once:
+            self.refresh(args, cache)
+            sys.stdout.write(cache.render())
+            return ExitCode.OK
+
+        if args.refresh <= 0:
+            raise ArgumentError("--refresh: the interval has to be positive")
+        server = _ThreadingHTTPServer(self.parse_listen(args.listen), self._handler(cache))
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=server.serve_forever),
+            threading.Thread(target=self._watch, args=(cache, stop))
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            while True:
+                try:
+                    self.refresh(args, cache)
+                except (linstor.LinstorError, LinstorClientError) as err:
+                    cache.up = False
+                    sys.stderr.write("Refresh failed: {e}\n".format(e=err.message))
+                time.sleep(args.refresh)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            server.shutdown()
+        return ExitCode.OK
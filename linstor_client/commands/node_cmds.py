@@ -1,9 +1,10 @@
 import linstor_client.argparse.argparse as argparse
 import collections
 import sys
+from functools import partial
 
 import linstor_client
-from linstor_client.commands import Commands
+from linstor_client.commands import ArgumentError, Commands
 from linstor_client.tree import TreeNode
 from linstor_client.consts import NODE_NAME, Color, ExitCode
 import linstor.sharedconsts as apiconsts
@@ -27,6 +28,16 @@ class NodeCommands(Commands):
         linstor_client.TableHeader("State", color=Color.DARKGREEN)
     ]
 
+    conn_stat_dict = {
+        apiconsts.CONN_STATUS_OFFLINE: ("OFFLINE", Color.RED),
+        apiconsts.CONN_STATUS_CONNECTED: ("Connected", Color.YELLOW),
+        apiconsts.CONN_STATUS_ONLINE: ("Online", Color.GREEN),
+        apiconsts.CONN_STATUS_VERSION_MISMATCH: ("OFFLINE(VERSION MISMATCH)", Color.RED),
+        apiconsts.CONN_STATUS_FULL_SYNC_FAILED: ("OFFLINE(FULL SYNC FAILED)", Color.RED),
+        apiconsts.CONN_STATUS_AUTHENTICATION_ERROR: ("OFFLINE(AUTHENTICATION ERROR)", Color.RED),
+        apiconsts.CONN_STATUS_UNKNOWN: ("Unknown", Color.YELLOW)
+    }
+
     def __init__(self):
         super(NodeCommands, self).__init__()
 
@@ -249,24 +260,28 @@ class NodeCommands(Commands):
         p_sp = node_subp.add_parser(
             Commands.Subcommands.ListProperties.LONG,
             aliases=[Commands.Subcommands.ListProperties.SHORT],
-            description="Prints all properties of the given node.")
+            description="Prints all properties of the given nodes.")
         p_sp.add_argument('-p', '--pastable', action="store_true", help='Generate pastable output')
         p_sp.add_argument(
             'node_name',
-            help="Node for which to print the properties").completer = self.node_completer
+            nargs='*',
+            help="Nodes for which to print the properties").completer = self.node_completer
+        Commands.add_parser_props_multi(p_sp, "node")
         p_sp.set_defaults(func=self.print_props)
 
         # set properties
         p_setp = node_subp.add_parser(
             Commands.Subcommands.SetProperty.LONG,
             aliases=[Commands.Subcommands.SetProperty.SHORT],
-            description="Set a property on the given node."
+            description="Set properties on the given node or on every node selected by --regex, --aux-match or --all."
         )
         p_setp.add_argument(
             'node_name',
+            nargs='?',
             help="Node for which to set the property"
         ).completer = self.node_completer
         Commands.add_parser_keyvalue(p_setp, "node")
+        Commands.add_parser_selector(p_setp, "node")
         p_setp.set_defaults(func=self.set_props)
 
         self.check_subcommands(interface_subp, netif_subcmds)
@@ -300,22 +315,12 @@ class NodeCommands(Commands):
         for hdr in cls._node_headers:
             tbl.add_header(hdr)
 
-        conn_stat_dict = {
-            apiconsts.CONN_STATUS_OFFLINE: ("OFFLINE", Color.RED),
-            apiconsts.CONN_STATUS_CONNECTED: ("Connected", Color.YELLOW),
-            apiconsts.CONN_STATUS_ONLINE: ("Online", Color.GREEN),
-            apiconsts.CONN_STATUS_VERSION_MISMATCH: ("OFFLINE(VERSION MISMATCH)", Color.RED),
-            apiconsts.CONN_STATUS_FULL_SYNC_FAILED: ("OFFLINE(FULL SYNC FAILED)", Color.RED),
-            apiconsts.CONN_STATUS_AUTHENTICATION_ERROR: ("OFFLINE(AUTHENTICATION ERROR)", Color.RED),
-            apiconsts.CONN_STATUS_UNKNOWN: ("Unknown", Color.YELLOW)
-        }
-
         tbl.set_groupby(args.groupby if args.groupby else [tbl.header_name(0)])
 
         node_list = [x for x in lstmsg.nodes if x.name in args.nodes] if args.nodes else lstmsg.nodes
         for n in node_list:
             ips = [if_.address for if_ in n.net_interfaces]
-            conn_stat = conn_stat_dict[n.connection_status]
+            conn_stat = cls.conn_stat_dict[n.connection_status]
             tbl.add_row([
                 n.name,
                 n.type,
@@ -379,13 +384,6 @@ class NodeCommands(Commands):
 
         return ExitCode.OK
 
-    def check_list_sanity(self, args, replies):
-        if replies:
-            if self.check_for_api_replies(replies):
-                rc = self.handle_replies(args, replies)
-                raise LinstorClientError("List reply error", rc)
-        return True
-
     @classmethod
     def get_volume_size(cls, rsc_dfn_list):
         """
@@ -482,25 +480,47 @@ class NodeCommands(Commands):
     @classmethod
     def _props_list(cls, args, lstmsg):
         result = []
-        node = NodeCommands.find_node(lstmsg, args.node_name)
+        node = NodeCommands.find_node(lstmsg, args.node_name[0])
         if node:
             result.append(node.props)
         else:
-            raise LinstorClientError("Node '{n}' not found on controller.".format(n=args.node_name),
+            raise LinstorClientError("Node '{n}' not found on controller.".format(n=args.node_name[0]),
                                      ExitCode.OBJECT_NOT_FOUND)
 
         return result
 
+    @classmethod
+    def _props_multi(cls, args, lstmsg):
+        return cls.select_props(
+            [(x.name, x.props) for x in lstmsg.nodes],
+            None if args.all else args.node_name,
+            "Node"
+        )
+
     def print_props(self, args):
+        if not args.node_name and not args.all:
+            raise ArgumentError("Node names or --all required")
         lstmsg = self._linstor.node_list()
 
+        if args.all or len(args.node_name) > 1 or args.ndjson:
+            return self.output_props_multi(args, lstmsg, self._props_multi)
         return self.output_props_list(args, lstmsg, self._props_list)
 
     def set_props(self, args):
-        args = self._attach_aux_prop(args)
-        mod_prop_dict = Commands.parse_key_value_pairs([args.key + '=' + args.value])
-        replies = self._linstor.node_modify(args.node_name, mod_prop_dict['pairs'], mod_prop_dict['delete'])
-        return self.handle_replies(args, replies)
+        names = self.selector_names(args, ['node_name'])
+        mod_prop_dict = self.parse_set_props(args)
+        if not self.is_selector(args):
+            replies = self._linstor.node_modify(args.node_name, mod_prop_dict['pairs'], mod_prop_dict['delete'])
+            return self.handle_replies(args, replies)
+
+        lstmsg = self._linstor.node_list()
+        self.check_list_sanity(args, lstmsg)
+        nodes = self.select_objects(
+            args, lstmsg[0].proto_msg.nodes if lstmsg else [], lambda n: [n.name], lambda n: n.props, names)
+        return self.modify_selected(args, [
+            (n.name, partial(self._linstor.node_modify, n.name, mod_prop_dict['pairs'], mod_prop_dict['delete']))
+            for n in nodes
+        ])
 
     def create_netif(self, args):
         replies = self._linstor.netinterface_create(
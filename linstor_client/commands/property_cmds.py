@@ -0,0 +1,165 @@
+import linstor_client.argparse.argparse as argparse
+import fnmatch
+import json
+import re
+import sys
+
+import linstor_client
+from linstor.sharedconsts import NAMESPC_AUXILIARY
+from linstor_client.commands import Commands, ArgumentError
+from linstor_client.consts import Color, ExitCode
+from linstor_client.utils import parallel_map
+
+
+class PropertyCommands(Commands):
+    # object type -> name of the list call that returns the objects of the type
+    OBJECT_LISTS = [
+        ('controller', 'controller_props'),
+        ('node', 'node_list'),
+        ('storage-pool', 'storage_pool_list'),
+        ('resource-definition', 'resource_dfn_list'),
+        ('volume-definition', 'resource_dfn_list'),
+        ('resource', 'resource_list')
+    ]
+
+    def __init__(self):
+        super(PropertyCommands, self).__init__()
+
+    def setup_commands(self, parser):
+        subcmds = [
+            Commands.Subcommands.Find
+        ]
+
+        prop_parser = parser.add_parser(
+            Commands.PROPERTY,
+            aliases=["p"],
+            formatter_class=argparse.RawTextHelpFormatter,
+            description="Property subcommands")
+
+        prop_subp = prop_parser.add_subparsers(
+            title="Property commands",
+            metavar="",
+            description=Commands.Subcommands.generate_desc(subcmds)
+        )
+
+        p_find = prop_subp.add_parser(
+            Commands.Subcommands.Find.LONG,
+            aliases=[Commands.Subcommands.Find.SHORT],
+            formatter_class=argparse.RawTextHelpFormatter,
+            description='Finds the objects that have a property set, optionally to a given value.\n'
+                        'KEY may contain shell wildcards, e.g. "DrbdOptions/*".\n'
+                        '  KEY         any value\n'
+                        '  KEY=VALUE   the value is VALUE\n'
+                        '  KEY~REGEX   the value contains a match of the regular expression REGEX')
+        p_find.add_argument('match', metavar='KEY[=VALUE|~REGEX]', help='Property to search for')
+        p_find.add_argument('--aux', action="store_true", help="KEY is an auxiliary user property.")
+        p_find.add_argument(
+            '-t', '--types',
+            nargs='+',
+            choices=[x[0] for x in self.OBJECT_LISTS],
+            help='Only search objects of these types'
+        )
+        p_find.add_argument('-p', '--pastable', action="store_true", help='Generate pastable output')
+        p_find.add_argument(
+            '--ndjson',
+            action="store_true",
+            help='Print every match as a JSON object on its own line, as soon as it is found'
+        )
+        p_find.set_defaults(func=self.find)
+
+        self.check_subcommands(prop_subp, subcmds)
+
+    @classmethod
+    def compile_matcher(cls, spec, aux=False):
+        """
+        Compiles a KEY[=VALUE|~REGEX] search into a callable(key, value) -> bool.
+
+        :raises ArgumentError: if the key is empty or the regular expression is invalid
+        """
+        ops = [x for x in [spec.find('='), spec.find('~')] if x >= 0]
+        pos = min(ops) if ops else len(spec)
+        key, operator, operand = spec[:pos], spec[pos:pos + 1], spec[pos + 1:]
+        if not key:
+            raise ArgumentError("No property key given in '{s}'".format(s=spec))
+        if aux:
+            key = NAMESPC_AUXILIARY + '/' + key
+        key_match = re.compile(fnmatch.translate(key)).match
+
+        if operator == '=':
+            return lambda k, v: v == operand and key_match(k) is not None
+        if operator == '~':
+            try:
+                value_search = re.compile(operand).search
+            except re.error as err:
+                raise ArgumentError("Invalid regular expression '{p}': {e}".format(p=operand, e=err))
+            return lambda k, v: key_match(k) is not None and value_search(v) is not None
+        return lambda k, v: key_match(k) is not None
+
+    @staticmethod
+    def _objects(obj_type, msg):
+        """Yields (identity, props) of every object of the given type in a list reply."""
+        if obj_type == 'controller':
+            yield '', msg.props
+        elif obj_type == 'node':
+            for node in msg.nodes:
+                yield node.name, node.props
+        elif obj_type == 'storage-pool':
+            for stor_pool in msg.stor_pools:
+                yield stor_pool.node_name + '/' + stor_pool.stor_pool_name, stor_pool.props
+        elif obj_type == 'resource-definition':
+            for rsc_dfn in msg.rsc_dfns:
+                yield rsc_dfn.rsc_name, rsc_dfn.rsc_dfn_props
+        elif obj_type == 'volume-definition':
+            for rsc_dfn in msg.rsc_dfns:
+                for vlm_dfn in rsc_dfn.vlm_dfns:
+                    yield '{r}/{v}'.format(r=rsc_dfn.rsc_name, v=vlm_dfn.vlm_nr), vlm_dfn.vlm_props
+        elif obj_type == 'resource':
+            for rsc in msg.resources:
+                yield rsc.node_name + '/' + rsc.name, rsc.props
+
+    def _fetch(self, args, list_calls):
+        """Runs the given list calls concurrently, every call only once."""
+        list_calls = sorted(set(list_calls))
+        lists = parallel_map(lambda x: getattr(self._linstor, x)(), list_calls, len(list_calls))
+        for lstmsg in lists:
+            self.check_list_sanity(args, lstmsg)
+        return {call: lstmsg[0].proto_msg if lstmsg else None for call, lstmsg in zip(list_calls, lists)}
+
+    def _find_props(self, args, matcher):
+        """Yields (object type, identity, key, value) of every matching property."""
+        obj_lists = [x for x in self.OBJECT_LISTS if not args.types or x[0] in args.types]
+        msgs = self._fetch(args, [x[1] for x in obj_lists])
+        for obj_type, list_call in obj_lists:
+            if msgs[list_call] is None:
+                continue
+            for identity, props in self._objects(obj_type, msgs[list_call]):
+                for prop in props:
+                    if matcher(prop.key, prop.value):
+                        yield obj_type, identity, prop.key, prop.value
+
+    def find(self, args):
+        matches = self._find_props(args, self.compile_matcher(args.match, args.aux))
+
+        if args.ndjson:
+            for obj_type, identity, key, value in matches:
+                sys.stdout.write(json.dumps(
+                    {'type': obj_type, 'object': identity, 'key': key, 'value': value}, sort_keys=True) + '\n')
+                sys.stdout.flush()
+            return ExitCode.OK
+
+        if args.machine_readable:
+            print(self._to_json([
+                {'type': obj_type, 'object': identity, 'key': key, 'value': value}
+                for obj_type, identity, key, value in matches
+            ]))
+            return ExitCode.OK
+
+        tbl = linstor_client.Table(utf8=not args.no_utf8, colors=not args.no_color, pastable=args.pastable)
+        tbl.add_column("Type", color=Color.DARKGREEN)
+        tbl.add_column("Object")
+        tbl.add_column("Key")
+        tbl.add_column("Value")
+        for match in matches:
+            tbl.add_row(list(match))
+        tbl.show()
+        return ExitCode.OK
@@ -1,11 +1,15 @@
 import linstor_client.argparse.argparse as argparse
+import itertools
+import json
+from functools import partial
 
 import linstor
 import linstor_client
 import linstor.sharedconsts as apiconsts
-from linstor_client.commands import Commands, DrbdOptions, ArgumentError
+from linstor_client.commands import Commands, DrbdOptions, ArgumentError, BulkResult
 from linstor_client.consts import NODE_NAME, RES_NAME, STORPOOL_NAME, Color, ExitCode
-from linstor_client.utils import Output, namecheck
+from linstor_client.journal import Journal
+from linstor_client.utils import LinstorClientError, Output, namecheck, parallel_map, reserve_args
 
 
 class ResourceCommands(Commands):
@@ -67,7 +71,8 @@ class ResourceCommands(Commands):
             '--auto-place',
             type=int,
             metavar="REPLICA_COUNT",
-            help = 'Auto place a resource to a specified number of nodes'
+            help = 'Auto place a resource to a specified number of nodes. '
+                   'If several resource definitions are given, they are placed concurrently.'
         )
         p_new_res.add_argument(
             '--do-not-place-with',
@@ -102,14 +107,25 @@ class ResourceCommands(Commands):
             action="store_true",
             help='Will add a diskless resource on all non replica nodes.'
         )
+        p_new_res.add_argument(
+            '--from-file',
+            metavar='MANIFEST',
+            help='Deploy all resources listed in MANIFEST. Every line contains a resource definition name, '
+                 'a comma separated list of nodes or a replica count for auto-placement and optionally a '
+                 'storage pool name: "RESOURCE_DEFINITION NODE[,NODE...]|REPLICA_COUNT [STORAGE_POOL]". '
+                 'Alternatively MANIFEST is a JSON list of objects with the keys "resource_definition", '
+                 '"nodes" or "auto_place", "storage_pool" and "diskless".'
+        )
+        # with --auto-place the selector picks the resource definitions to place
+        self.add_parser_selector(p_new_res, 'resource definition')
+        # the node names are checked in create(), argparse assigns all positional arguments to node_name
         p_new_res.add_argument(
             'node_name',
-            type=namecheck(NODE_NAME),
             nargs='*',
             help='Name of the node to deploy the resource').completer = self.node_completer
         p_new_res.add_argument(
             'resource_definition_name',
-            type=namecheck(RES_NAME),
+            nargs='?',
             help='Name of the resource definition').completer = self.resource_dfn_completer
         p_new_res.set_defaults(func=self.create)
 
@@ -187,14 +203,18 @@ class ResourceCommands(Commands):
         p_sp = res_subp.add_parser(
             Commands.Subcommands.ListProperties.LONG,
             aliases=[Commands.Subcommands.ListProperties.SHORT],
-            description="Prints all properties of the given resource.")
+            description="Prints all properties of the given resources of a node. With --all the properties of "
+                        "every resource are printed, limited to the node and resource names if given.")
         p_sp.add_argument('-p', '--pastable', action="store_true", help='Generate pastable output')
         p_sp.add_argument(
             'node_name',
+            nargs='?',
             help="Node name where the resource is deployed.").completer = self.node_completer
         p_sp.add_argument(
             'resource_name',
-            help="Resource name").completer = self.resource_completer
+            nargs='*',
+            help="Resource names").completer = self.resource_completer
+        Commands.add_parser_props_multi(p_sp, "resource")
         p_sp.set_defaults(func=self.print_props)
 
         # set properties
@@ -218,29 +238,35 @@ class ResourceCommands(Commands):
         p_drbd_peer_opts = res_subp.add_parser(
             Commands.Subcommands.DrbdPeerDeviceOptions.LONG,
             aliases=[Commands.Subcommands.DrbdPeerDeviceOptions.SHORT],
-            description="Set drbd peer-device options."
+            description="Set drbd peer-device options on the connection of two nodes, or with --all-pairs on "
+                        "every connection between the nodes the resource is deployed on."
         )
         p_drbd_peer_opts.add_argument(
             'node_a',
+            nargs='?',
             type=namecheck(NODE_NAME),
             help="1. Node in the node connection"
         ).completer = self.node_completer
         p_drbd_peer_opts.add_argument(
             'node_b',
+            nargs='?',
             type=namecheck(NODE_NAME),
             help="1. Node in the node connection"
         ).completer = self.node_completer
+        p_drbd_peer_opts.add_argument(
+            '--all-pairs',
+            action='store_true',
+            help="Set the options on all node pairs of the resource instead of node_a and node_b"
+        )
+        reserve_args(['all_pairs'])
+        Commands.add_parser_bulk(p_drbd_peer_opts)
         p_drbd_peer_opts.add_argument(
             'resource_name',
             type=namecheck(RES_NAME),
             help="Resource name"
         ).completer = self.resource_completer
 
-        DrbdOptions.add_arguments(
-            p_drbd_peer_opts,
-            [x for x in DrbdOptions.drbd_options()['options']
-                if DrbdOptions.drbd_options()['options'][x]['category'] == 'peer-device-options']
-        )
+        DrbdOptions.add_arguments_lazy(p_drbd_peer_opts, DrbdOptions.option_names_by_category('peer-device-options'))
         p_drbd_peer_opts.set_defaults(func=self.drbd_peer_opts)
 
         self.check_subcommands(res_subp, subcmds)
@@ -249,7 +275,279 @@ class ResourceCommands(Commands):
     def _satellite_not_connected(replies):
         return any(reply.ret_code & apiconsts.WARN_NOT_CONNECTED == apiconsts.WARN_NOT_CONNECTED for reply in replies)
 
+    @classmethod
+    def _check_create_names(cls, args):
+        """
+        Splits the positional arguments of resource create into node names and resource definition name.
+        """
+        if args.resource_definition_name is None:
+            if not args.node_name:
+                raise ArgumentError("resource create: too few arguments: Resource definition name missing.")
+            args.resource_definition_name = args.node_name.pop()
+        args.resource_definition_name = cls.check_name(args.resource_definition_name, RES_NAME)
+        args.node_name = [cls.check_name(x, NODE_NAME) for x in args.node_name]
+
+    @classmethod
+    def _read_manifest(cls, path):
+        """
+        Reads the deployment entries of a resource create manifest.
+
+        :param str path: path of the manifest
+        :return: list of dicts with the keys name, nodes, auto_place, storage_pool and diskless
+        """
+        try:
+            with open(path) as manifest:
+                content = manifest.read()
+        except IOError as err:
+            raise LinstorClientError("Unable to read manifest '{p}': {e}".format(p=path, e=err), ExitCode.UNKNOWN_ERROR)
+
+        entries = []
+        if content.lstrip().startswith('['):
+            try:
+                items = json.loads(content)
+            except ValueError as err:
+                raise LinstorClientError("Manifest is not valid JSON: " + str(err), ExitCode.ARGPARSE_ERROR)
+            for item in items:
+                entries.append({
+                    'name': item.get('resource_definition'),
+                    'nodes': item.get('nodes', []),
+                    'auto_place': item.get('auto_place'),
+                    'storage_pool': item.get('storage_pool'),
+                    'diskless': item.get('diskless', False)
+                })
+        else:
+            for line in content.splitlines():
+                fields = line.split('#', 1)[0].split()
+                if not fields:
+                    continue
+                if len(fields) not in [2, 3]:
+                    raise LinstorClientError("Invalid manifest line: '{l}'".format(l=line), ExitCode.ARGPARSE_ERROR)
+                entries.append({
+                    'name': fields[0],
+                    'nodes': [] if fields[1].isdigit() else fields[1].split(','),
+                    'auto_place': int(fields[1]) if fields[1].isdigit() else None,
+                    'storage_pool': fields[2] if len(fields) > 2 else None,
+                    'diskless': False
+                })
+
+        for entry in entries:
+            if not entry['name'] or (not entry['nodes'] and not entry['auto_place']):
+                raise LinstorClientError(
+                    "Manifest entry '{e}' needs a resource definition and nodes or a replica count".format(
+                        e=entry['name']),
+                    ExitCode.ARGPARSE_ERROR
+                )
+            entry['name'] = cls.check_name(entry['name'], RES_NAME)
+            entry['nodes'] = [cls.check_name(x, NODE_NAME) for x in entry['nodes']]
+            if entry['storage_pool']:
+                entry['storage_pool'] = cls.check_name(entry['storage_pool'], STORPOOL_NAME)
+        return entries
+
+    def _auto_place_entries(self, args, rsc_names):
+        """
+        Returns deployment entries to auto-place the given resource definitions, or the ones selected by --regex,
+        --aux-match or --all.
+        """
+        if not self.is_selector(args):
+            rsc_names = [self.check_name(x, RES_NAME) for x in rsc_names]
+        else:
+            args.node_name = rsc_names  # all positional arguments name resource definitions
+            names = self.selector_names(args, ['node_name'])
+            lstmsg = self._linstor.resource_dfn_list()
+            self.check_list_sanity(args, lstmsg)
+            rsc_names = [x.rsc_name for x in self.select_objects(
+                args,
+                lstmsg[0].proto_msg.rsc_dfns if lstmsg else [],
+                lambda r: [r.rsc_name],
+                lambda r: r.rsc_dfn_props,
+                names
+            )]
+            if not rsc_names:
+                raise LinstorClientError("No object matches the selection", ExitCode.OBJECT_NOT_FOUND)
+
+        return [{
+            'name': rsc_name,
+            'nodes': [],
+            'auto_place': args.auto_place,
+            'storage_pool': args.storage_pool,
+            'diskless': False
+        } for rsc_name in rsc_names]
+
+    @staticmethod
+    def _deploy_steps(entry):
+        """:return: journal steps of one deployment entry, one per node if the nodes are given"""
+        if entry['auto_place']:
+            return ['deploy ' + entry['name']]
+        return ['deploy {r} on {n}'.format(r=entry['name'], n=x) for x in entry['nodes']]
+
+    def _deploy(self, args, entry, journal):
+        """
+        Issues the create or auto-place calls for one deployment entry.
+        Steps the journal has as done are not issued again.
+
+        :return: list of ApiCallResponse
+        """
+        steps = self._deploy_steps(entry)
+        if entry['auto_place']:
+            if journal.is_done(steps[0]):
+                return []  # only waiting for the deployment is left
+            return journal.run(steps[0], lambda: self._linstor.resource_auto_place(
+                entry['name'],
+                entry['auto_place'],
+                entry['storage_pool'],
+                args.do_not_place_with,
+                args.do_not_place_with_regex,
+                [linstor.consts.NAMESPC_AUXILIARY + '/' + x for x in args.replicas_on_same],
+                [linstor.consts.NAMESPC_AUXILIARY + '/' + x for x in args.replicas_on_different],
+                diskless_on_remaining=args.diskless_on_remaining
+            ), self._linstor.all_api_responses_success)
+
+        replies = []
+        for node_name, step in zip(entry['nodes'], steps):
+            if journal.is_done(step):
+                continue
+            replies += journal.run(
+                step,
+                lambda: self._linstor.resource_create(node_name, entry['name'], entry['diskless'],
+                                                      entry['storage_pool']),
+                self._linstor.all_api_responses_success
+            )
+            if not self._linstor.all_api_responses_success(replies):
+                break
+        return replies
+
+    def _watch_deployments(self, entries):
+        """
+        Waits with a single event subscription until all given deployments are ready or failed.
+
+        :param list entries: deployment entries as returned by _read_manifest
+        :return: dict resource name -> (exit code, list of ApiCallResponse, message) for all failed deployments
+        """
+        pending_nodes = {x['name']: set(x['nodes']) for x in entries if not x['auto_place']}
+        pending_auto = {x['name']: x['auto_place'] for x in entries if x['auto_place']}
+        failed = {}
+
+        def fail(rsc_name, exit_code, replies=None, message=None):
+            pending_nodes.pop(rsc_name, None)
+            pending_auto.pop(rsc_name, None)
+            failed[rsc_name] = (exit_code, replies or [], message)
+
+        def event_handler(event_header, event_data):
+            rsc_name = event_header.resource_name
+            node_name = event_header.node_name
+            event_name = event_header.event_name
+            if rsc_name in pending_auto and event_name == apiconsts.EVENT_RESOURCE_DEFINITION_READY:
+                if event_header.event_action == apiconsts.EVENT_STREAM_CLOSE_REMOVED:
+                    fail(rsc_name, ExitCode.API_ERROR, message="Resource removed")
+                elif event_data is not None:
+                    if event_data.error_count > 0:
+                        fail(rsc_name, ExitCode.API_ERROR, message="{c} resources failed to deploy".format(
+                            c=event_data.error_count))
+                    elif event_data.ready_count >= pending_auto[rsc_name]:
+                        del pending_auto[rsc_name]
+            elif node_name in pending_nodes.get(rsc_name, []):
+                if event_name in [apiconsts.EVENT_RESOURCE_STATE, apiconsts.EVENT_RESOURCE_DEPLOYMENT_STATE]:
+                    if event_header.event_action == apiconsts.EVENT_STREAM_CLOSE_NO_CONNECTION:
+                        fail(rsc_name, ExitCode.NO_SATELLITE_CONNECTION,
+                             message="Satellite connection lost on " + node_name)
+                    elif event_header.event_action == apiconsts.EVENT_STREAM_CLOSE_REMOVED:
+                        fail(rsc_name, ExitCode.API_ERROR, message="Resource removed on " + node_name)
+
+                if rsc_name in pending_nodes:
+                    if event_name == apiconsts.EVENT_RESOURCE_STATE and event_data is not None and event_data.ready:
+                        pending_nodes[rsc_name].discard(node_name)
+                        if not pending_nodes[rsc_name]:
+                            del pending_nodes[rsc_name]
+                    else:
+                        failure_replies = self.check_failure_events(event_name, event_data)
+                        if failure_replies:
+                            fail(rsc_name, ExitCode.API_ERROR, failure_replies)
+
+            if not pending_nodes and not pending_auto:
+                return ExitCode.OK
+            return None
+
+        if pending_nodes or pending_auto:
+            watch_result = self._linstor.watch_events(
+                self._linstor.return_if_failure,
+                event_handler,
+                linstor.ObjectIdentifier()
+            )
+            for rsc_name in list(pending_nodes) + list(pending_auto):
+                if isinstance(watch_result, list):
+                    fail(rsc_name, None, watch_result)
+                else:
+                    fail(rsc_name, ExitCode.API_ERROR, message="No ready event received")
+        return failed
+
+    def _create_bulk(self, args, entries):
+        """
+        Deploys several resource definitions, args.parallel at a time, and waits for all of them at once.
+        Entries that were completed by an earlier run with the same journal are skipped, resources that an earlier
+        run already created on a given node are not created again.
+        """
+        def ready_step(entry):
+            return 'ready ' + entry['name']
+
+        with Journal.from_args(args) as journal:
+            def completed(entry):
+                if args.async:
+                    return all([journal.is_done(x) for x in self._deploy_steps(entry)])
+                return journal.is_done(ready_step(entry))
+
+            journal.plan([
+                step for entry in entries
+                for step in self._deploy_steps(entry) + ([] if args.async else [ready_step(entry)])
+            ])
+
+            skipped = [x for x in entries if completed(x)]
+            todo = [x for x in entries if not completed(x)]
+            deploy_replies = parallel_map(lambda x: self._deploy(args, x, journal), todo, args.parallel)
+
+            failed = {}
+            if not args.async:
+                watched = [
+                    entry for entry, replies in zip(todo, deploy_replies)
+                    if self._linstor.all_api_responses_success(replies) and
+                    not ResourceCommands._satellite_not_connected(replies)
+                ]
+                failed = self._watch_deployments(watched)
+                for entry in watched:
+                    journal.record(ready_step(entry), Journal.FAILED if entry['name'] in failed else Journal.DONE)
+
+        results = [BulkResult(x['name'], message="Completed by an earlier run") for x in skipped]
+        for entry, replies in zip(todo, deploy_replies):
+            exit_code, watch_replies, message = failed.get(entry['name'], (None, [], None))
+            results.append(BulkResult(entry['name'], replies + watch_replies, exit_code, message))
+        return self.handle_bulk_replies(args, results)
+
     def create(self, args):
+        if args.from_file:
+            if args.node_name or args.resource_definition_name or args.auto_place or self.is_selector(args):
+                raise ArgumentError(
+                    "resource create: --from-file cannot be combined with node names, a resource definition, "
+                    "--auto-place, --regex, --aux-match or --all")
+            return self._create_bulk(args, self._read_manifest(args.from_file))
+
+        if self.is_selector(args) and not args.auto_place:
+            raise ArgumentError("resource create: --regex, --aux-match and --all require --auto-place")
+        rsc_names = args.node_name + ([args.resource_definition_name] if args.resource_definition_name else [])
+        if args.auto_place and (len(rsc_names) > 1 or self.is_selector(args)):
+            return self._create_bulk(args, self._auto_place_entries(args, rsc_names))
+
+        self._check_create_names(args)
+        if args.journal or args.resume:
+            # only the bulk path records and resumes its steps
+            if not args.auto_place and not args.node_name:
+                raise ArgumentError("resource create: too few arguments: Node name missing.")
+            return self._create_bulk(args, [{
+                'name': args.resource_definition_name,
+                'nodes': [] if args.auto_place else args.node_name,
+                'auto_place': args.auto_place,
+                'storage_pool': args.storage_pool,
+                'diskless': args.diskless
+            }])
+
         all_replies = []
         if args.auto_place:
             # auto-place resource
@@ -550,19 +848,35 @@ class ResourceCommands(Commands):
         result = []
         if lstmsg:
             for rsc in lstmsg.resources:
-                if rsc.name == args.resource_name and rsc.node_name == args.node_name:
+                if rsc.name == args.resource_name[0] and rsc.node_name == args.node_name:
                     result.append(rsc.props)
                     break
         return result
 
+    @classmethod
+    def _props_multi(cls, args, lstmsg):
+        if args.all:
+            return [
+                (x.node_name + '/' + x.name, x.props) for x in lstmsg.resources
+                if args.node_name in [None, x.node_name] and (not args.resource_name or x.name in args.resource_name)
+            ]
+        return cls.select_props(
+            [(x.node_name + '/' + x.name, x.props) for x in lstmsg.resources],
+            [args.node_name + '/' + x for x in args.resource_name],
+            "Resource"
+        )
+
     def print_props(self, args):
+        if not args.all and (args.node_name is None or not args.resource_name):
+            raise ArgumentError("Node and resource names or --all required")
         lstmsg = self._linstor.resource_list()
 
+        if args.all or len(args.resource_name) > 1 or args.ndjson:
+            return self.output_props_multi(args, lstmsg, self._props_multi)
         return self.output_props_list(args, lstmsg, self._props_list)
 
     def set_props(self, args):
-        args = self._attach_aux_prop(args)
-        mod_prop_dict = Commands.parse_key_value_pairs([args.key + '=' + args.value])
+        mod_prop_dict = self.parse_set_props(args)
         replies = self._linstor.resource_modify(
             args.node_name,
             args.name,
@@ -574,19 +888,41 @@ class ResourceCommands(Commands):
     def drbd_peer_opts(self, args):
         a = DrbdOptions.filter_new(args)
         del a['resource-name']
-        del a['node-a']
-        del a['node-b']
+        a.pop('node-a', None)
+        a.pop('node-b', None)
 
         mod_props, del_props = DrbdOptions.parse_opts(a)
 
-        replies = self._linstor.resource_conn_modify(
-            args.resource_name,
-            args.node_a,
-            args.node_b,
-            mod_props,
-            del_props
-        )
-        return self.handle_replies(args, replies)
+        if not args.all_pairs:
+            if args.node_a is None or args.node_b is None:
+                raise ArgumentError("node_a and node_b, or --all-pairs required")
+            replies = self._linstor.resource_conn_modify(
+                args.resource_name,
+                args.node_a,
+                args.node_b,
+                mod_props,
+                del_props
+            )
+            return self.handle_replies(args, replies)
+
+        if args.node_a is not None:
+            raise ArgumentError("--all-pairs cannot be combined with node names")
+        lstmsg = self._linstor.resource_list(filter_by_resources=[args.resource_name])
+        self.check_list_sanity(args, lstmsg)
+        node_names = sorted(set(
+            x.node_name for x in (lstmsg[0].proto_msg.resources if lstmsg else []) if x.name == args.resource_name
+        ))
+        if len(node_names) < 2:
+            raise LinstorClientError(
+                "Resource '{r}' is not deployed on two or more nodes".format(r=args.resource_name),
+                ExitCode.OBJECT_NOT_FOUND
+            )
+
+        return self.modify_selected(args, [
+            (node_a + ' - ' + node_b,
+             partial(self._linstor.resource_conn_modify, args.resource_name, node_a, node_b, mod_props, del_props))
+            for node_a, node_b in itertools.combinations(node_names, 2)
+        ])
 
     @staticmethod
     def completer_volume(prefix, **kwargs):
@@ -1,7 +1,8 @@
 import linstor_client.argparse.argparse as argparse
+from functools import partial
 
 import linstor_client
-from linstor_client.commands import Commands, DrbdOptions
+from linstor_client.commands import ArgumentError, Commands, DrbdOptions
 from linstor_client.consts import RES_NAME, Color
 from linstor.sharedconsts import FLAG_DELETE
 from linstor_client.utils import Output, namecheck, rangecheck
@@ -91,34 +92,37 @@ class ResourceDefinitionCommands(Commands):
         p_sp.add_argument('-p', '--pastable', action="store_true", help='Generate pastable output')
         p_sp.add_argument(
             'resource_name',
-            help="Resource definition for which to print the properties"
+            nargs='*',
+            help="Resource definitions for which to print the properties"
         ).completer = self.resource_dfn_completer
+        Commands.add_parser_props_multi(p_sp, "resource definition")
         p_sp.set_defaults(func=self.print_props)
 
         # set properties
         p_setprop = res_def_subp.add_parser(
             Commands.Subcommands.SetProperty.LONG,
             aliases=[Commands.Subcommands.SetProperty.SHORT],
-            description='Sets properties for the given resource definition.')
-        p_setprop.add_argument('name', type=namecheck(RES_NAME), help='Name of the resource definition')
+            description='Sets properties for the given resource definition or for every resource definition '
+                        'selected by --regex, --aux-match or --all.')
+        p_setprop.add_argument('name', nargs='?', help='Name of the resource definition')
         Commands.add_parser_keyvalue(p_setprop, 'resource-definition')
+        Commands.add_parser_selector(p_setprop, 'resource definition')
         p_setprop.set_defaults(func=self.set_props)
 
         # drbd options
         p_drbd_opts = res_def_subp.add_parser(
             Commands.Subcommands.DrbdOptions.LONG,
             aliases=[Commands.Subcommands.DrbdOptions.SHORT],
-            description="Set drbd resource options."
+            description="Set drbd resource options on the given resource definitions or on every resource "
+                        "definition selected by --regex, --aux-match or --all."
         )
         p_drbd_opts.add_argument(
             'resource_name',
-            type=namecheck(RES_NAME),
-            help="Resource name"
+            nargs='*',
+            help="Resource names, regular expressions with --regex"
         ).completer = self.resource_dfn_completer
-        DrbdOptions.add_arguments(
-            p_drbd_opts,
-            [x for x in DrbdOptions.drbd_options()['options'] if x in DrbdOptions.drbd_options()['filters']['resource']]
-        )
+        Commands.add_parser_selector(p_drbd_opts, 'resource definition')
+        DrbdOptions.add_arguments_lazy(p_drbd_opts, DrbdOptions.option_names_by_filter('resource'))
         p_drbd_opts.set_defaults(func=self.set_drbd_opts)
 
         self.check_subcommands(res_def_subp, subcmds)
@@ -158,21 +162,50 @@ class ResourceDefinitionCommands(Commands):
         result = []
         if lstmsg:
             for rsc_dfn in lstmsg.rsc_dfns:
-                if rsc_dfn.rsc_name == args.resource_name:
+                if rsc_dfn.rsc_name == args.resource_name[0]:
                     result.append(rsc_dfn.rsc_dfn_props)
                     break
         return result
 
+    @classmethod
+    def _props_multi(cls, args, lstmsg):
+        return cls.select_props(
+            [(x.rsc_name, x.rsc_dfn_props) for x in lstmsg.rsc_dfns],
+            None if args.all else args.resource_name,
+            "Resource definition"
+        )
+
     def print_props(self, args):
+        if not args.resource_name and not args.all:
+            raise ArgumentError("Resource definition names or --all required")
         lstmsg = self._linstor.resource_dfn_list()
 
+        if args.all or len(args.resource_name) > 1 or args.ndjson:
+            return self.output_props_multi(args, lstmsg, self._props_multi)
         return self.output_props_list(args, lstmsg, self._props_list)
 
     def set_props(self, args):
-        args = self._attach_aux_prop(args)
-        mod_prop_dict = Commands.parse_key_value_pairs([args.key + '=' + args.value])
-        replies = self._linstor.resource_dfn_modify(args.name, mod_prop_dict['pairs'], mod_prop_dict['delete'])
-        return self.handle_replies(args, replies)
+        names = self.selector_names(args, ['name'])
+        mod_prop_dict = self.parse_set_props(args)
+        if not self.is_selector(args):
+            replies = self._linstor.resource_dfn_modify(
+                self.check_name(args.name, RES_NAME), mod_prop_dict['pairs'], mod_prop_dict['delete'])
+            return self.handle_replies(args, replies)
+
+        lstmsg = self._linstor.resource_dfn_list()
+        self.check_list_sanity(args, lstmsg)
+        rsc_dfns = self.select_objects(
+            args,
+            lstmsg[0].proto_msg.rsc_dfns if lstmsg else [],
+            lambda r: [r.rsc_name],
+            lambda r: r.rsc_dfn_props,
+            names
+        )
+        return self.modify_selected(args, [
+            (r.rsc_name, partial(self._linstor.resource_dfn_modify, r.rsc_name, mod_prop_dict['pairs'],
+                                 mod_prop_dict['delete']))
+            for r in rsc_dfns
+        ])
 
     def set_drbd_opts(self, args):
         a = DrbdOptions.filter_new(args)
@@ -180,9 +213,29 @@ class ResourceDefinitionCommands(Commands):
 
         mod_props, del_props = DrbdOptions.parse_opts(a)
 
-        replies = self._linstor.resource_dfn_modify(
-            args.resource_name,
-            mod_props,
-            del_props
-        )
-        return self.handle_replies(args, replies)
+        if not self.is_selector(args):
+            if not args.resource_name:
+                raise ArgumentError("Resource names, --regex, --aux-match or --all required")
+            rsc_names = [self.check_name(x, RES_NAME) for x in args.resource_name]
+            if len(rsc_names) == 1:
+                replies = self._linstor.resource_dfn_modify(
+                    rsc_names[0],
+                    mod_props,
+                    del_props
+                )
+                return self.handle_replies(args, replies)
+        else:
+            names = self.selector_names(args, ['resource_name'])
+            lstmsg = self._linstor.resource_dfn_list()
+            self.check_list_sanity(args, lstmsg)
+            rsc_names = [x.rsc_name for x in self.select_objects(
+                args,
+                lstmsg[0].proto_msg.rsc_dfns if lstmsg else [],
+                lambda r: [r.rsc_name],
+                lambda r: r.rsc_dfn_props,
+                names
+            )]
+
+        return self.modify_selected(args, [
+            (x, partial(self._linstor.resource_dfn_modify, x, mod_props, del_props)) for x in rsc_names
+        ])
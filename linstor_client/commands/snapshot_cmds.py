@@ -199,6 +199,22 @@ class SnapshotCommands(Commands):
         replies = self._linstor.snapshot_delete(args.resource_definition_name, args.snapshot_name)
         return self.handle_replies(args, replies)
 
+    @staticmethod
+    def snapshot_state(snapshot_dfn):
+        """
+        :param snapshot_dfn: snapshot definition proto
+        :return: A tuple (state_text, color)
+        """
+        if FLAG_DELETE in snapshot_dfn.snapshot_dfn_flags:
+            return "DELETING", Color.RED
+        if FLAG_FAILED_DEPLOYMENT in snapshot_dfn.snapshot_dfn_flags:
+            return "Failed", Color.RED
+        if FLAG_FAILED_DISCONNECT in snapshot_dfn.snapshot_dfn_flags:
+            return "Satellite disconnected", Color.RED
+        if FLAG_SUCCESSFUL in snapshot_dfn.snapshot_dfn_flags:
+            return "Successful", Color.DARKGREEN
+        return "Incomplete", Color.DARKBLUE
+
     @classmethod
     def show(cls, args, lstmsg):
         tbl = linstor_client.Table(utf8=not args.no_utf8, colors=not args.no_color, pastable=args.pastable)
@@ -208,16 +224,7 @@ class SnapshotCommands(Commands):
         tbl.add_column("Volumes")
         tbl.add_column("State", color=Output.color(Color.DARKGREEN, args.no_color))
         for snapshot_dfn in lstmsg.snapshot_dfns:
-            if FLAG_DELETE in snapshot_dfn.snapshot_dfn_flags:
-                state_cell = tbl.color_cell("DELETING", Color.RED)
-            elif FLAG_FAILED_DEPLOYMENT in snapshot_dfn.snapshot_dfn_flags:
-                state_cell = tbl.color_cell("Failed", Color.RED)
-            elif FLAG_FAILED_DISCONNECT in snapshot_dfn.snapshot_dfn_flags:
-                state_cell = tbl.color_cell("Satellite disconnected", Color.RED)
-            elif FLAG_SUCCESSFUL in snapshot_dfn.snapshot_dfn_flags:
-                state_cell = tbl.color_cell("Successful", Color.DARKGREEN)
-            else:
-                state_cell = tbl.color_cell("Incomplete", Color.DARKBLUE)
+            state_cell = tbl.color_cell(*cls.snapshot_state(snapshot_dfn))
 
             tbl.add_row([
                 snapshot_dfn.rsc_name,
@@ -1,4 +1,5 @@
 import linstor_client.argparse.argparse as argparse
+from functools import partial
 
 import linstor
 import linstor_client
@@ -108,39 +109,49 @@ class StoragePoolCommands(Commands):
         p_sp = sp_subp.add_parser(
             Commands.Subcommands.ListProperties.LONG,
             aliases=[Commands.Subcommands.ListProperties.SHORT],
-            description="Prints all properties of the given storage pool.")
+            description="Prints all properties of the given storage pools of a node. With --all the properties of "
+                        "every storage pool are printed, limited to the node and storage pool names if given.")
         p_sp.add_argument('-p', '--pastable', action="store_true", help='Generate pastable output')
         p_sp.add_argument(
             'node_name',
+            nargs='?',
             type=namecheck(NODE_NAME),
             help='Name of the node for the storage pool').completer = self.node_completer
         p_sp.add_argument(
             'storage_pool_name',
-            help="Storage pool for which to print the properties").completer = self.storage_pool_completer
+            nargs='*',
+            help="Storage pools for which to print the properties").completer = self.storage_pool_completer
+        Commands.add_parser_props_multi(p_sp, "storage pool")
         p_sp.set_defaults(func=self.print_props)
 
         # set properties
         p_setprop = sp_subp.add_parser(
             Commands.Subcommands.SetProperty.LONG,
             aliases=[Commands.Subcommands.SetProperty.SHORT],
-            description='Sets properties for the given storage pool on the given node.')
+            description='Sets properties for the given storage pool on the given node or for every storage pool '
+                        'selected by --regex, --aux-match or --all. With --regex both names are regular expressions.')
         p_setprop.add_argument(
             'node_name',
-            type=namecheck(NODE_NAME),
+            nargs='?',
             help='Name of the node for the storage pool').completer = self.node_completer
         p_setprop.add_argument(
             'name',
-            type=namecheck(STORPOOL_NAME),
+            nargs='?',
             help='Name of the storage pool'
         ).completer = self.storage_pool_completer
         Commands.add_parser_keyvalue(p_setprop, 'storagepool')
+        Commands.add_parser_selector(p_setprop, 'storage pool')
         p_setprop.set_defaults(func=self.set_props)
 
         self.check_subcommands(sp_subp, subcmds)
 
+    @staticmethod
+    def driver_name(driver):
+        """Returns the driver name expected by the controller for a driver given on the command line."""
+        return 'LvmThin' if driver == 'lvmthin' else driver.title()
+
     def create(self, args):
-        # construct correct driver name
-        driver = 'LvmThin' if args.driver == 'lvmthin' else args.driver.title()
+        driver = self.driver_name(args.driver)
         try:
             replies = self._linstor.storage_pool_create(args.node_name, args.name, driver, args.driver_pool_name)
         except linstor.LinstorError as e:
@@ -194,26 +205,61 @@ class StoragePoolCommands(Commands):
         result = []
         if lstmsg:
             for stp in lstmsg.stor_pools:
-                if stp.stor_pool_name == args.storage_pool_name and stp.node_name == args.node_name:
+                if stp.stor_pool_name == args.storage_pool_name[0] and stp.node_name == args.node_name:
                     result.append(stp.props)
                     break
         return result
 
+    @classmethod
+    def _props_multi(cls, args, lstmsg):
+        if args.all:
+            return [
+                (x.node_name + '/' + x.stor_pool_name, x.props) for x in lstmsg.stor_pools
+                if args.node_name in [None, x.node_name] and
+                (not args.storage_pool_name or x.stor_pool_name in args.storage_pool_name)
+            ]
+        return cls.select_props(
+            [(x.node_name + '/' + x.stor_pool_name, x.props) for x in lstmsg.stor_pools],
+            [args.node_name + '/' + x for x in args.storage_pool_name],
+            "Storage pool"
+        )
+
     def print_props(self, args):
+        if not args.all and (args.node_name is None or not args.storage_pool_name):
+            raise ArgumentError("Node and storage pool names or --all required")
         lstmsg = self._linstor.storage_pool_list()
 
+        if args.all or len(args.storage_pool_name) > 1 or args.ndjson:
+            return self.output_props_multi(args, lstmsg, self._props_multi)
         return self.output_props_list(args, lstmsg, self._props_list)
 
     def set_props(self, args):
-        args = self._attach_aux_prop(args)
-        mod_prop_dict = Commands.parse_key_value_pairs([args.key + '=' + args.value])
-        replies = self._linstor.storage_pool_modify(
-            args.node_name,
-            args.name,
-            mod_prop_dict['pairs'],
-            mod_prop_dict['delete']
+        names = self.selector_names(args, ['node_name', 'name'])
+        mod_prop_dict = self.parse_set_props(args)
+        if not self.is_selector(args):
+            replies = self._linstor.storage_pool_modify(
+                self.check_name(args.node_name, NODE_NAME),
+                self.check_name(args.name, STORPOOL_NAME),
+                mod_prop_dict['pairs'],
+                mod_prop_dict['delete']
+            )
+            return self.handle_replies(args, replies)
+
+        lstmsg = self._linstor.storage_pool_list()
+        self.check_list_sanity(args, lstmsg)
+        stor_pools = self.select_objects(
+            args,
+            lstmsg[0].proto_msg.stor_pools if lstmsg else [],
+            lambda sp: [sp.node_name, sp.stor_pool_name],
+            lambda sp: sp.props,
+            names
         )
-        return self.handle_replies(args, replies)
+        return self.modify_selected(args, [
+            (sp.node_name + '/' + sp.stor_pool_name,
+             partial(self._linstor.storage_pool_modify, sp.node_name, sp.stor_pool_name, mod_prop_dict['pairs'],
+                     mod_prop_dict['delete']))
+            for sp in stor_pools
+        ])
 
     @staticmethod
     def driver_completer(prefix, **kwargs):
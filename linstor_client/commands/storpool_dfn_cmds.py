@@ -2,7 +2,7 @@ import linstor_client.argparse.argparse as argparse
 
 import linstor
 import linstor_client
-from linstor_client.commands import Commands
+from linstor_client.commands import ArgumentError, Commands
 from linstor_client.consts import STORPOOL_NAME, RES_NAME
 from linstor_client.utils import namecheck, SizeCalc
 
@@ -75,8 +75,10 @@ class StoragePoolDefinitionCommands(Commands):
         p_sp.add_argument('-p', '--pastable', action="store_true", help='Generate pastable output')
         p_sp.add_argument(
             'storage_pool_name',
-            help="Storage pool definition for which to print the properties"
+            nargs='*',
+            help="Storage pool definitions for which to print the properties"
         ).completer = self.storage_pool_dfn_completer
+        Commands.add_parser_props_multi(p_sp, "storage pool definition")
         p_sp.set_defaults(func=self.print_props)
 
         # set properties
@@ -168,19 +170,30 @@ class StoragePoolDefinitionCommands(Commands):
         result = []
         if lstmsg:
             for storpool_dfn in lstmsg.stor_pool_dfns:
-                if storpool_dfn.stor_pool_name == args.storage_pool_name:
+                if storpool_dfn.stor_pool_name == args.storage_pool_name[0]:
                     result.append(storpool_dfn.props)
                     break
         return result
 
+    @classmethod
+    def _props_multi(cls, args, lstmsg):
+        return cls.select_props(
+            [(x.stor_pool_name, x.props) for x in lstmsg.stor_pool_dfns],
+            None if args.all else args.storage_pool_name,
+            "Storage pool definition"
+        )
+
     def print_props(self, args):
+        if not args.storage_pool_name and not args.all:
+            raise ArgumentError("Storage pool definition names or --all required")
         lstmsg = self._linstor.storage_pool_dfn_list()
 
+        if args.all or len(args.storage_pool_name) > 1 or args.ndjson:
+            return self.output_props_multi(args, lstmsg, self._props_multi)
         return self.output_props_list(args, lstmsg, self._props_list)
 
     def set_props(self, args):
-        args = self._attach_aux_prop(args)
-        mod_prop_dict = Commands.parse_key_value_pairs([args.key + '=' + args.value])
+        mod_prop_dict = self.parse_set_props(args)
         replies = self._linstor.storage_pool_dfn_modify(args.name, mod_prop_dict['pairs'], mod_prop_dict['delete'])
         return self.handle_replies(args, replies)
 
@@ -1,9 +1,10 @@
 import linstor_client.argparse.argparse as argparse
 import re
 import sys
+from functools import partial
 
 import linstor_client
-from linstor_client.commands import Commands, DrbdOptions
+from linstor_client.commands import ArgumentError, Commands, DrbdOptions
 from linstor_client.consts import RES_NAME, Color, ExitCode, STORPOOL_NAME
 from linstor.sharedconsts import FLAG_DELETE, FLAG_RESIZE
 from linstor_client.utils import Output, SizeCalc, namecheck
@@ -121,15 +122,20 @@ class VolumeDefinitionCommands(Commands):
         p_sp = vol_def_subp.add_parser(
             Commands.Subcommands.ListProperties.LONG,
             aliases=[Commands.Subcommands.ListProperties.SHORT],
-            description="Prints all properties of the given volume definition.")
+            description="Prints all properties of the given volume definitions of a resource. With --all the "
+                        "properties of every volume definition are printed, limited to the resource name and "
+                        "volume numbers if given.")
         p_sp.add_argument('-p', '--pastable', action="store_true", help='Generate pastable output')
         p_sp.add_argument(
             'resource_name',
+            nargs='?',
             help="Resource name").completer = self.resource_dfn_completer
         p_sp.add_argument(
             'volume_nr',
+            nargs='*',
             type=int,
-            help="Volume number")
+            help="Volume numbers")
+        Commands.add_parser_props_multi(p_sp, "volume definition")
         p_sp.set_defaults(func=self.print_props)
 
         # set properties
@@ -150,22 +156,23 @@ class VolumeDefinitionCommands(Commands):
         p_drbd_opts = vol_def_subp.add_parser(
             Commands.Subcommands.DrbdOptions.LONG,
             aliases=[Commands.Subcommands.DrbdOptions.SHORT],
-            description="Set drbd volume options."
+            description="Set drbd volume options on the given volume definition or on the volume definitions of "
+                        "every resource definition selected by --regex, --aux-match or --all. With a selector the "
+                        "volume number is optional and limits the volume definitions."
         )
         p_drbd_opts.add_argument(
             'resource_name',
-            type=namecheck(RES_NAME),
-            help="Resource name"
+            nargs='?',
+            help="Resource name, a regular expression with --regex"
         ).completer = self.resource_dfn_completer
         p_drbd_opts.add_argument(
             'volume_nr',
+            nargs='?',
             type=int,
             help="Volume number"
         )
-        DrbdOptions.add_arguments(
-            p_drbd_opts,
-            [x for x in DrbdOptions.drbd_options()['options'] if x in DrbdOptions.drbd_options()['filters']['volume']]
-        )
+        Commands.add_parser_selector(p_drbd_opts, 'resource definition')
+        DrbdOptions.add_arguments_lazy(p_drbd_opts, DrbdOptions.option_names_by_filter('volume'))
         p_drbd_opts.set_defaults(func=self.set_drbd_opts)
 
         # set size
@@ -286,19 +293,38 @@ class VolumeDefinitionCommands(Commands):
         if lstmsg:
             for rsc_dfn in [x for x in lstmsg.rsc_dfns if x.rsc_name == args.resource_name]:
                 for vlmdfn in rsc_dfn.vlm_dfns:
-                    if vlmdfn.vlm_nr == args.volume_nr:
+                    if vlmdfn.vlm_nr == args.volume_nr[0]:
                         result.append(vlmdfn.vlm_props)
                         break
         return result
 
+    @classmethod
+    def _props_multi(cls, args, lstmsg):
+        vlm_dfns = [
+            (rsc_dfn.rsc_name, vlm_dfn)
+            for rsc_dfn in lstmsg.rsc_dfns if args.resource_name in [None, rsc_dfn.rsc_name]
+            for vlm_dfn in rsc_dfn.vlm_dfns if not args.all or not args.volume_nr or vlm_dfn.vlm_nr in args.volume_nr
+        ]
+        objects = [('{r}/{v}'.format(r=rsc_name, v=x.vlm_nr), x.vlm_props) for rsc_name, x in vlm_dfns]
+        if args.all:
+            return objects
+        return cls.select_props(
+            objects,
+            ['{r}/{v}'.format(r=args.resource_name, v=x) for x in args.volume_nr],
+            "Volume definition"
+        )
+
     def print_props(self, args):
+        if not args.all and (args.resource_name is None or not args.volume_nr):
+            raise ArgumentError("Resource name and volume numbers or --all required")
         lstmsg = self._linstor.resource_dfn_list()
 
+        if args.all or len(args.volume_nr) > 1 or args.ndjson:
+            return self.output_props_multi(args, lstmsg, self._props_multi)
         return self.output_props_list(args, lstmsg, self._props_list)
 
     def set_props(self, args):
-        args = self._attach_aux_prop(args)
-        mod_prop_dict = Commands.parse_key_value_pairs([args.key + '=' + args.value])
+        mod_prop_dict = self.parse_set_props(args)
         replies = self._linstor.volume_dfn_modify(
             args.resource_name,
             args.volume_nr,
@@ -309,18 +335,39 @@ class VolumeDefinitionCommands(Commands):
 
     def set_drbd_opts(self, args):
         a = DrbdOptions.filter_new(args)
-        del a['resource-name']  # remove resource name key
-        del a['volume-nr']
+        a.pop('resource-name', None)  # remove resource name key
+        a.pop('volume-nr', None)
 
         mod_props, del_props = DrbdOptions.parse_opts(a)
 
-        replies = self._linstor.volume_dfn_modify(
-            args.resource_name,
-            args.volume_nr,
-            set_properties=mod_props,
-            delete_properties=del_props
+        if not self.is_selector(args):
+            if args.resource_name is None or args.volume_nr is None:
+                raise ArgumentError("Resource name and volume number, or --regex, --aux-match or --all required")
+            replies = self._linstor.volume_dfn_modify(
+                self.check_name(args.resource_name, RES_NAME),
+                args.volume_nr,
+                set_properties=mod_props,
+                delete_properties=del_props
+            )
+            return self.handle_replies(args, replies)
+
+        names = self.selector_names(args, ['resource_name'])
+        lstmsg = self._linstor.resource_dfn_list()
+        self.check_list_sanity(args, lstmsg)
+        rsc_dfns = self.select_objects(
+            args,
+            lstmsg[0].proto_msg.rsc_dfns if lstmsg else [],
+            lambda r: [r.rsc_name],
+            lambda r: r.rsc_dfn_props,
+            names
         )
-        return self.handle_replies(args, replies)
+        return self.modify_selected(args, [
+            ('{r}/{v}'.format(r=rsc_dfn.rsc_name, v=vlm_dfn.vlm_nr),
+             partial(self._linstor.volume_dfn_modify, rsc_dfn.rsc_name, vlm_dfn.vlm_nr,
+                     set_properties=mod_props, delete_properties=del_props))
+            for rsc_dfn in rsc_dfns
+            for vlm_dfn in rsc_dfn.vlm_dfns if args.volume_nr in [None, vlm_dfn.vlm_nr]
+        ])
 
     def set_volume_size(self, args):
         replies = self._linstor.volume_dfn_modify(
@@ -1,4 +1,5 @@
 from .commands import Commands
+from .drbd_setup_cmds import DrbdOptions
 
 _header = """#compdef linstor_client_main.py linstor
 #autoload
@@ -92,6 +93,7 @@ class ZshGenerator(object):
 
     @classmethod
     def arguments_str(cls, argparse_cmd):
+        DrbdOptions.ensure_arguments(argparse_cmd)
         c = ""
         opts = []
         for action in argparse_cmd._actions:
@@ -63,6 +63,43 @@ BOOL_TRUE = "true"
 BOOL_FALSE = "false"
 
 KEY_LS_CONTROLLERS = 'LS_CONTROLLERS'
+KEY_LS_PROFILE_OUTPUT = 'LS_PROFILE_OUTPUT'
+KEY_LS_API_TRACE = 'LS_API_TRACE'
+KEY_LS_CACHE_DIR = 'LS_CACHE_DIR'
+
+# bits of an api return code that hold the object type, an enumerated value and not flags
+RET_OBJECT_TYPE_MASK = 0x3C0000
+
+# number of allocation sites reported by --profile-mode mem
+PROFILE_MEM_TOP_N = 25
+
+# default number of concurrent controller requests of bulk operations
+DFLT_PARALLEL_REQUESTS = 8
+
+# attempts and initial delay in seconds for steps that failed in a journaled bulk operation
+JOURNAL_RETRY_ATTEMPTS = 3
+JOURNAL_RETRY_DELAY = 1.0
+
+# create-watch writes its output once this many lines are pending or the oldest one waits this many seconds
+WATCH_FLUSH_LINES = 256
+DFLT_WATCH_FLUSH_INTERVAL = 0.5
+
+# number of intervals in the sliding window of create-watch --stats and keys reported per dimension
+DFLT_WATCH_STATS_WINDOW = 12
+DFLT_WATCH_STATS_TOP = 5
+
+# initial and maximum delay in seconds between reconnects of create-watch --follow
+WATCH_RECONNECT_DELAY = 1.0
+WATCH_RECONNECT_MAX_DELAY = 60.0
+
+# default address of the metrics exporter and seconds between its full refreshes
+DFLT_EXPORTER_LISTEN = '127.0.0.1:9942'
+DFLT_EXPORTER_REFRESH = 60.0
+
+# bytes of cached error report contents before the least recently used ones are evicted
+ERROR_REPORT_CACHE_SIZE = 64 * 1024 * 1024
+# cached error report list entries before the oldest ones are pruned, together with their contents
+ERROR_REPORT_CACHE_ENTRIES = 10000
 
 
 class ExitCode(object):
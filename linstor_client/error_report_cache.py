@@ -0,0 +1,312 @@
+"""
+    LINSTOR - management of distributed storage/DRBD9 resources
+    Copyright (C) 2018  LINBIT HA-Solutions GmbH
+
+    You can use this file under the terms of the GNU Lesser General
+    Public License as as published by the Free Software Foundation,
+    either version 3 of the License, or (at your option) any later
+    version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    See <http://www.gnu.org/licenses/>.
+"""
+
+import errno
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from linstor.proto.MsgErrorReport_pb2 import MsgErrorReport
+
+from linstor_client.consts import ERROR_REPORT_CACHE_ENTRIES, ERROR_REPORT_CACHE_SIZE, KEY_LS_CACHE_DIR, ExitCode
+from linstor_client.utils import LinstorClientError
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+
+class CachedErrorReport(object):
+    """Error report read from the cache, with the properties of linstor.linstorapi.ErrorReport."""
+    def __init__(self, proto_msg):
+        self.proto_msg = proto_msg
+
+    @property
+    def id(self):
+        return self.proto_msg.filename[len('ErrorReport-'):-len('.log')]
+
+    @property
+    def datetime(self):
+        return datetime.fromtimestamp(self.proto_msg.error_time / 1000.0)
+
+    @property
+    def node_names(self):
+        return self.proto_msg.node_names
+
+    @property
+    def text(self):
+        return self.proto_msg.text
+
+
+class ErrorReportCache(object):
+    """
+    Local cache of the error reports of one controller.
+
+    Error reports never change once written, so list entries are kept and the content of a report is only
+    fetched once. Contents are evicted least recently used first when they exceed max_bytes, the oldest
+    entries are pruned together with their contents when there are more than max_entries. Once entries got
+    pruned the cache only answers for the reports created after the pruned ones, see covers().
+
+    The list entries are kept in index.json, every content in content/<report id>.
+    """
+    INDEX = 'index.json'
+    CONTENT = 'content'
+    ENTRY_FIELDS = ['filename', 'node_names', 'error_time']
+
+    def __init__(self, directory, max_bytes=ERROR_REPORT_CACHE_SIZE, max_entries=ERROR_REPORT_CACHE_ENTRIES):
+        self._dir = directory
+        self._content_dir = os.path.join(directory, self.CONTENT)
+        self._max_bytes = max_bytes
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(self._content_dir)
+        except OSError as err:
+            if err.errno != errno.EEXIST:
+                raise LinstorClientError("Unable to create error report cache '{d}': {e}".format(d=directory, e=err),
+                                         ExitCode.UNKNOWN_ERROR)
+        if not os.access(directory, os.W_OK) or not os.access(self._content_dir, os.W_OK):
+            raise LinstorClientError("Error report cache '{d}' is not writable".format(d=directory),
+                                     ExitCode.UNKNOWN_ERROR)
+
+        self._entries = {}
+        self._pruned_until = None  # error_time of the newest pruned entry
+        try:
+            with open(os.path.join(directory, self.INDEX)) as index_file:
+                index = json.load(index_file)
+            self._entries = index['entries']
+            self._pruned_until = index.get('pruned_until')
+        except (IOError, ValueError, KeyError, TypeError):
+            pass  # no or damaged index, the list is fetched again
+
+    @property
+    def directory(self):
+        return self._dir
+
+    @classmethod
+    def for_controller(cls, controller):
+        """
+        :param str controller: controller uri, every controller gets its own cache
+        :return: the cache in $LS_CACHE_DIR or ~/.cache/linstor
+        """
+        base = os.environ.get(KEY_LS_CACHE_DIR) or os.path.join(os.path.expanduser('~'), '.cache', 'linstor')
+        name = re.sub(r'[^\w.-]', '_', controller.split('://')[-1])
+        return cls(os.path.join(base, 'error-reports', name))
+
+    @staticmethod
+    def _write_atomic(path, data, mode='w'):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, mode) as tmp_file:
+            tmp_file.write(data)
+        os.rename(tmp_path, path)
+
+    def newest(self):
+        """:return: datetime of the newest cached report, None if the cache is empty"""
+        if not self._entries:
+            return None
+        return datetime.fromtimestamp(max([x['error_time'] for x in self._entries.values()]) / 1000.0)
+
+    def covers(self, since):
+        """
+        :param datetime since: None for all reports
+        :return: whether the entries hold every report created since the given datetime
+        """
+        if self._pruned_until is None:
+            return True
+        return since is not None and since > datetime.fromtimestamp(self._pruned_until / 1000.0)
+
+    def add_entries(self, reports):
+        """Adds the list entries of the given reports, e.g. as returned by error_report_list."""
+        if not reports:
+            return
+        with self._lock:
+            for report in reports:
+                self._entries[CachedErrorReport(report.proto_msg).id] = {
+                    x: getattr(report.proto_msg, x) for x in self.ENTRY_FIELDS
+                }
+            self._prune()
+            self._write_atomic(
+                os.path.join(self._dir, self.INDEX),
+                json.dumps({'entries': self._entries, 'pruned_until': self._pruned_until}, sort_keys=True)
+            )
+
+    def _prune(self):
+        excess = len(self._entries) - self._max_entries
+        if excess <= 0:
+            return
+        oldest = sorted(self._entries.items(), key=lambda x: (x[1]['error_time'], x[0]))[:excess]
+        for report_id, _ in oldest:
+            del self._entries[report_id]
+            try:
+                os.remove(self._content_path(report_id))
+            except OSError:
+                pass  # content not cached
+        self._pruned_until = max(self._pruned_until or 0, oldest[-1][1]['error_time'])
+
+    def resolve(self, report_id):
+        """
+        Resolves an id prefix against the entries, so the entries have to be refreshed first, a report
+        created since could match the prefix as well.
+
+        :return: the full id of the cached report starting with report_id, None if none or several do or
+            a pruned report could
+        """
+        if report_id in self._entries:
+            return report_id
+        if self._pruned_until is not None:
+            return None
+        matches = [x for x in self._entries if x.startswith(report_id)]
+        return matches[0] if len(matches) == 1 else None
+
+    def entries(self, nodes=None, since=None, to=None, ids=None):
+        """
+        :return: list of CachedErrorReport without content, filtered like error_report_list, oldest first
+        """
+        reports = [CachedErrorReport(MsgErrorReport(**x)) for x in self._entries.values()]
+        return sorted([
+            report for report in reports
+            if (not nodes or report.node_names in nodes) and
+            (since is None or report.datetime >= since) and
+            (to is None or report.datetime <= to) and
+            (not ids or [x for x in ids if report.id.startswith(x)])
+        ], key=lambda x: (x.proto_msg.error_time, x.id))
+
+    def _content_path(self, report_id):
+        return os.path.join(self._content_dir, re.sub(r'[^\w.-]', '_', report_id))
+
+    def content_ids(self):
+        """:return: set of the ids of the reports whose content is cached"""
+        return set([x for x in os.listdir(self._content_dir) if not x.endswith('.tmp')])
+
+    def content(self, report_id):
+        """:return: the CachedErrorReport with content of the given id, None if the content is not cached"""
+        path = self._content_path(report_id)
+        try:
+            with open(path, 'rb') as content_file:
+                proto_msg = MsgErrorReport.FromString(content_file.read())
+            os.utime(path, None)  # most recently used
+        except (IOError, OSError):
+            return None
+        return CachedErrorReport(proto_msg)
+
+    def add_content(self, reports):
+        """Stores the given reports with content, e.g. as returned by error_report_list(with_content=True)."""
+        self.add_entries(reports)
+        with self._lock:
+            for report in reports:
+                self._write_atomic(
+                    self._content_path(CachedErrorReport(report.proto_msg).id),
+                    report.proto_msg.SerializeToString(),
+                    'wb'
+                )
+            self._evict()
+
+    def _evict(self):
+        contents = []
+        for name in os.listdir(self._content_dir):
+            stat = os.stat(os.path.join(self._content_dir, name))
+            contents.append((stat.st_mtime, stat.st_size, name))
+        total = sum([x[1] for x in contents])
+        for _, size, name in sorted(contents):
+            if total <= self._max_bytes:
+                break
+            os.remove(os.path.join(self._content_dir, name))
+            total -= size
+
+
+class ErrorReportIndex(object):
+    """
+    SQLite full-text index over the contents of error reports, stored next to an ErrorReportCache.
+
+    Reports are only added once, so keeping the index current costs as much as the new reports. Reports
+    whose content got evicted from the cache are removed again, see remove().
+    """
+    FILENAME = 'search.sqlite'
+    EXCEPTION_RE = re.compile(r'^Class name:\s*(\S+)', re.MULTILINE)
+
+    def __init__(self, directory):
+        if sqlite3 is None:
+            raise LinstorClientError("Searching error reports needs the python sqlite3 module",
+                                     ExitCode.OPTION_NOT_SUPPORTED)
+        self._db = sqlite3.connect(os.path.join(directory, self.FILENAME))
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS reports (id TEXT PRIMARY KEY, node TEXT, error_time INTEGER, exception TEXT)'
+        )
+        try:
+            self._db.execute('CREATE VIRTUAL TABLE IF NOT EXISTS report_text USING fts5(id UNINDEXED, text)')
+        except sqlite3.OperationalError:
+            self._db.execute('CREATE VIRTUAL TABLE IF NOT EXISTS report_text USING fts4(id, text)')
+        self._db.commit()
+
+    def indexed_ids(self):
+        return set([row[0] for row in self._db.execute('SELECT id FROM reports')])
+
+    @classmethod
+    def exception(cls, text):
+        """:return: the exception class named in an error report, '-' if there is none"""
+        match = cls.EXCEPTION_RE.search(text)
+        return match.group(1) if match else '-'
+
+    def add(self, reports):
+        """Indexes the given reports with content, reports that are already indexed are skipped."""
+        indexed = self.indexed_ids()
+        new_reports = [x for x in reports if x.id not in indexed]
+        with self._db:
+            self._db.executemany(
+                'INSERT INTO reports (id, node, error_time, exception) VALUES (?, ?, ?, ?)',
+                [(x.id, x.node_names, x.proto_msg.error_time, self.exception(x.text)) for x in new_reports]
+            )
+            self._db.executemany(
+                'INSERT INTO report_text (id, text) VALUES (?, ?)',
+                [(x.id, x.text) for x in new_reports]
+            )
+
+    def remove(self, report_ids):
+        """Removes the given reports, e.g. the ones whose content is no longer cached."""
+        with self._db:
+            self._db.executemany('DELETE FROM reports WHERE id = ?', [(x,) for x in report_ids])
+            self._db.executemany('DELETE FROM report_text WHERE id = ?', [(x,) for x in report_ids])
+
+    def search(self, query, nodes=None, since=None):
+        """
+        :param str query: SQLite full-text query, e.g. a word, "a phrase" or a prefix*
+        :param list[str] nodes: only reports of these nodes
+        :param datetime since: only reports created since
+        :return: list of (id, node, error_time, exception) of the matching reports, newest first
+        :raises ValueError: if the query is not valid
+        """
+        sql = 'SELECT reports.id, reports.node, reports.error_time, reports.exception FROM report_text ' \
+              'JOIN reports ON reports.id = report_text.id WHERE report_text MATCH ?'
+        params = [query]
+        if nodes:
+            sql += ' AND reports.node IN ({p})'.format(p=', '.join(['?'] * len(nodes)))
+            params += nodes
+        if since is not None:
+            sql += ' AND reports.error_time >= ?'
+            params.append(int(time.mktime(since.timetuple()) * 1000))
+        sql += ' ORDER BY reports.error_time DESC'
+        try:
+            return self._db.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as err:
+            raise ValueError(str(err))
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,532 @@
+"""
+    LINSTOR - management of distributed storage/DRBD9 resources
+    Copyright (C) 2018  LINBIT HA-Solutions GmbH
+
+    You can use this file under the terms of the GNU Lesser General
+    Public License as as published by the Free Software Foundation,
+    either version 3 of the License, or (at your option) any later
+    version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    See <http://www.gnu.org/licenses/>.
+"""
+
+import errno
+import json
+import struct
+import threading
+import time
+from collections import Counter
+
+from linstor.sharedconsts import (EVENT_RESOURCE_DEFINITION_READY, EVENT_RESOURCE_DEPLOYMENT_STATE,
+                                  EVENT_RESOURCE_STATE, EVENT_SNAPSHOT_DEPLOYMENT, EVENT_VOLUME_DISK_STATE)
+
+from linstor_client.api_trace import TracingLinstor
+from linstor_client.consts import DFLT_WATCH_FLUSH_INTERVAL, DFLT_WATCH_STATS_TOP, DFLT_WATCH_STATS_WINDOW, \
+    WATCH_FLUSH_LINES, ExitCode
+from linstor_client.utils import LinstorClientError
+
+
+# fields of the data of every event type
+EVENT_FIELDS = {
+    EVENT_VOLUME_DISK_STATE: ['disk_state'],
+    EVENT_RESOURCE_STATE: ['ready'],
+    EVENT_RESOURCE_DEPLOYMENT_STATE: ['responses'],
+    EVENT_RESOURCE_DEFINITION_READY: ['ready_count', 'error_count'],
+    EVENT_SNAPSHOT_DEPLOYMENT: ['responses']
+}
+
+# fields of an api call response as used by Output.handle_ret
+RESPONSE_FIELDS = ['ret_code', 'message', 'cause', 'correction', 'details']
+
+# event name -> text format of the event data
+EVENT_TEXT = {
+    EVENT_VOLUME_DISK_STATE: "Disk state: {disk_state}",
+    EVENT_RESOURCE_STATE: "Resource ready: {ready}",
+    EVENT_RESOURCE_DEPLOYMENT_STATE: "Deployment state: {summary}",
+    EVENT_RESOURCE_DEFINITION_READY: "Resource definition; ready: {ready_count}, error: {error_count}",
+    EVENT_SNAPSHOT_DEPLOYMENT: "Snapshot deployment state: {summary}"
+}
+
+EVENT_NAMES = sorted(EVENT_FIELDS.keys())
+
+
+def event_values(event_header, event_data):
+    """
+    :return: dict of the data fields of an event, None for events without data or of an unknown type
+    """
+    fields = EVENT_FIELDS.get(event_header.event_name)
+    if not event_data or fields is None:
+        return None
+    values = {field: getattr(event_data, field) for field in fields}
+    if 'responses' in values:
+        values['responses'] = [{x: getattr(response, x) for x in RESPONSE_FIELDS} for response in values['responses']]
+    return values
+
+
+def event_location(event_header):
+    """:return: node/resource[/volume][@snapshot] of an event"""
+    location = event_header.node_name + '/' + event_header.resource_name
+    if event_header.HasField('volume_number'):
+        location += '/' + str(event_header.volume_number)
+    if event_header.HasField('snapshot_name'):
+        location += '@' + str(event_header.snapshot_name)
+    return location
+
+
+def format_text(event_header, event_data):
+    line = "{n} [{a}] ({l})".format(n=event_header.event_name, a=event_header.event_action,
+                                    l=event_location(event_header))
+    values = event_values(event_header, event_data)
+    if values is not None:
+        if 'responses' in values:
+            values['summary'] = "; ".join([x['message'] for x in values['responses']])
+        line += " " + EVENT_TEXT[event_header.event_name].format(**values)
+    return line
+
+
+def format_ndjson(event_header, event_data):
+    record = {
+        'event': event_header.event_name,
+        'action': event_header.event_action,
+        'node': event_header.node_name,
+        'resource': event_header.resource_name,
+        'volume': event_header.volume_number if event_header.HasField('volume_number') else None,
+        'snapshot': event_header.snapshot_name if event_header.HasField('snapshot_name') else None,
+        'time': time.time()
+    }
+    values = event_values(event_header, event_data)
+    if values is not None:
+        record['data'] = values
+    return json.dumps(record, sort_keys=True)
+
+
+FORMATTERS = {
+    'text': format_text,
+    'ndjson': format_ndjson
+}
+
+# name of the synthetic event marking a lost event stream, events may be missing after it
+GAP_EVENT = 'Gap'
+
+GAP_FORMATTERS = {
+    'text': lambda reason: "{n} ({r})".format(n=GAP_EVENT, r=reason),
+    'ndjson': lambda reason: json.dumps({'event': GAP_EVENT, 'reason': reason, 'time': time.time()}, sort_keys=True)
+}
+
+
+class BufferedLineWriter(object):
+    """
+    Writes lines to a stream in batches, once max_lines are pending or the oldest pending line waits
+    for flush_interval seconds. A background thread flushes lines that would otherwise wait for the
+    next event.
+
+    If the stream breaks (e.g. the reading end of a pipe is closed) the remaining lines are dropped.
+    """
+    def __init__(self, stream, max_lines=WATCH_FLUSH_LINES, flush_interval=DFLT_WATCH_FLUSH_INTERVAL):
+        self._stream = stream
+        self._max_lines = max_lines
+        self._flush_interval = flush_interval
+        self._pending = []
+        self._pending_since = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self.broken = False
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.max_pending = 0
+        self.slowest_flush = 0.0
+
+        self._flusher = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically)
+            self._flusher.daemon = True
+            self._flusher.start()
+
+    def write_line(self, line):
+        with self._lock:
+            if self.broken:
+                self.dropped += 1
+                return
+            if not self._pending:
+                self._pending_since = time.time()
+            self._pending.append(line)
+            self.max_pending = max(self.max_pending, len(self._pending))
+            if len(self._pending) >= self._max_lines or time.time() - self._pending_since >= self._flush_interval:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        lines = self._pending
+        self._pending = []
+        start = time.time()
+        try:
+            self._stream.write('\n'.join(lines) + '\n')
+            self._stream.flush()
+            self.written += len(lines)
+        except IOError as err:
+            if err.errno != errno.EPIPE:
+                raise
+            self.broken = True
+            self.dropped += len(lines)
+        self.flushes += 1
+        self.slowest_flush = max(self.slowest_flush, time.time() - start)
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self._flush_interval):
+            with self._lock:
+                if self._pending and time.time() - self._pending_since >= self._flush_interval:
+                    self._flush_locked()
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+
+
+class EventPrinter(object):
+    """
+    Event handler for watch_events that filters, formats and writes events through a BufferedLineWriter.
+    """
+    def __init__(self, stream, output_format='text', event_names=None, flush_interval=DFLT_WATCH_FLUSH_INTERVAL):
+        """
+        :param str output_format: one of FORMATTERS
+        :param list[str] event_names: only these events are printed, all if None
+        """
+        self._format = FORMATTERS[output_format]
+        self._format_gap = GAP_FORMATTERS[output_format]
+        self._event_names = set(event_names) if event_names else None
+        self._writer = BufferedLineWriter(stream, flush_interval=flush_interval)
+        self._start = time.time()
+        self.received = 0
+        self.filtered = 0
+        self.gaps = 0
+
+    def handle(self, event_header, event_data):
+        """Event handler, always returns None so the watch goes on."""
+        self.received += 1
+        if self._event_names is not None and event_header.event_name not in self._event_names:
+            self.filtered += 1
+            return None
+        self._writer.write_line(self._format(event_header, event_data))
+        return None
+
+    def gap(self, reason):
+        """Writes a gap marker, the event stream was lost for the given reason."""
+        self.gaps += 1
+        self._writer.write_line(self._format_gap(reason))
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
+
+    def summary(self):
+        elapsed = max(time.time() - self._start, 0.001)
+        writer = self._writer
+        return (
+            "{r} events received ({rate:.1f}/s), {f} filtered, {w} written, {d} dropped, {g} gaps; "
+            "{fl} flushes, slowest {s:.3f}s, at most {p} lines pending"
+        ).format(r=self.received, rate=self.received / elapsed, f=self.filtered, w=writer.written, d=writer.dropped,
+                 g=self.gaps, fl=writer.flushes, s=writer.slowest_flush, p=writer.max_pending)
+
+
+class EventStats(object):
+    """
+    Event handler for watch_events that counts events per type, action, node and resource and prints
+    the top talkers every interval instead of the events themselves.
+
+    The counts of the last `window` intervals are kept in a ring of per-interval counters, so memory only
+    depends on the window and the number of distinct keys, not on how long the watch runs.
+    """
+    DIMENSIONS = [
+        ('type', lambda event_header: event_header.event_name),
+        ('action', lambda event_header: event_header.event_action),
+        ('node', lambda event_header: event_header.node_name or '-'),
+        ('resource', lambda event_header: event_header.resource_name or '-')
+    ]
+
+    def __init__(self, stream, interval, window=DFLT_WATCH_STATS_WINDOW, top=DFLT_WATCH_STATS_TOP,
+                 event_names=None):
+        """
+        :param float interval: seconds between two reports
+        :param int window: number of intervals summed up in the window columns
+        :param int top: number of keys reported per dimension
+        :param list[str] event_names: only these events are counted, all if None
+        """
+        self._interval = interval
+        self._top = top
+        self._event_names = set(event_names) if event_names else None
+        self._writer = BufferedLineWriter(stream, flush_interval=0)
+        self._ring = [self._new_bucket() for _ in range(window)]
+        self._pos = 0
+        self._filled = 1
+        self._bucket_start = time.time()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._start = time.time()
+        self.received = 0
+        self.filtered = 0
+        self.reports = 0
+        self.gaps = 0
+
+        self._reporter = threading.Thread(target=self._report_periodically)
+        self._reporter.daemon = True
+        self._reporter.start()
+
+    @classmethod
+    def _new_bucket(cls):
+        bucket = {name: Counter() for name, _ in cls.DIMENSIONS}
+        bucket[None] = 0  # total
+        return bucket
+
+    def handle(self, event_header, event_data):
+        """Event handler, always returns None so the watch goes on."""
+        with self._lock:
+            self.received += 1
+            if self._event_names is not None and event_header.event_name not in self._event_names:
+                self.filtered += 1
+                return None
+            bucket = self._ring[self._pos]
+            bucket[None] += 1
+            for name, key in self.DIMENSIONS:
+                bucket[name][key(event_header)] += 1
+        return None
+
+    def _rotate(self):
+        """:return: the finished bucket, its length in seconds, the sum of all buckets of the window and its length"""
+        with self._lock:
+            now = time.time()
+            current_secs = max(now - self._bucket_start, 0.001)
+            self._bucket_start = now
+            current = self._ring[self._pos]
+            window = self._new_bucket()
+            for bucket in self._ring:
+                window[None] += bucket[None]
+                for name, _ in self.DIMENSIONS:
+                    window[name].update(bucket[name])
+            window_secs = (self._filled - 1) * self._interval + current_secs
+            self._pos = (self._pos + 1) % len(self._ring)
+            self._ring[self._pos] = self._new_bucket()
+            self._filled = min(self._filled + 1, len(self._ring))
+        return current, current_secs, window, window_secs
+
+    def report(self):
+        current, current_secs, window, window_secs = self._rotate()
+        lines = ["{t}: {c} events ({cr:.1f}/s), last {w:.0f}s: {wc} events ({wr:.1f}/s)".format(
+            t=time.strftime('%Y-%m-%d %H:%M:%S'),
+            c=current[None],
+            cr=current[None] / current_secs,
+            w=window_secs,
+            wc=window[None],
+            wr=window[None] / window_secs
+        )]
+        for name, _ in self.DIMENSIONS:
+            talkers = sorted(window[name].items(), key=lambda x: (-current[name][x[0]], -x[1], x[0]))[:self._top]
+            if talkers:
+                lines.append("  {n:<9} ".format(n=name) + ", ".join(
+                    ["{k} {c}/{w}".format(k=key, c=current[name][key], w=count) for key, count in talkers]
+                ))
+        for line in lines:
+            self._writer.write_line(line)
+        self.reports += 1
+
+    def gap(self, reason):
+        """Reports that the event stream was lost for the given reason, counts may be incomplete."""
+        self.gaps += 1
+        self._writer.write_line("{t}: {n} ({r})".format(t=time.strftime('%Y-%m-%d %H:%M:%S'), n=GAP_EVENT, r=reason))
+
+    def _report_periodically(self):
+        while not self._closed.wait(self._interval):
+            self.report()
+
+    def close(self):
+        if not self._closed.is_set():
+            self._closed.set()
+            self._reporter.join()
+            self.report()
+        self._writer.close()
+
+    def summary(self):
+        elapsed = max(time.time() - self._start, 0.001)
+        return "{r} events received ({rate:.1f}/s), {f} filtered, {g} gaps, {n} reports, {d} lines dropped".format(
+            r=self.received, rate=self.received / elapsed, f=self.filtered, g=self.gaps, n=self.reports,
+            d=self._writer.dropped)
+
+
+class RecordedMessage(object):
+    """Stands in for the event header and data protobuf messages of a recorded event."""
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def HasField(self, name):
+        return getattr(self, name, None) is not None
+
+
+class EventRecorder(object):
+    """
+    Writes events to a recording file.
+
+    The file starts with MAGIC, followed by one record per event: the receive time as a big-endian double,
+    the payload length as a big-endian unsigned int and the payload, a compact JSON array of the header
+    fields and the event data.
+    """
+    MAGIC = b'LINSTOR-EVENTS-1\n'
+    RECORD_HEADER = struct.Struct('>dI')
+
+    def __init__(self, path):
+        try:
+            self._file = open(path, 'wb')
+        except IOError as err:
+            raise LinstorClientError("Unable to write recording '{p}': {e}".format(p=path, e=err),
+                                     ExitCode.ARGPARSE_ERROR)
+        self._file.write(self.MAGIC)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def record(self, event_header, event_data):
+        payload = json.dumps([
+            event_header.event_name,
+            event_header.event_action,
+            event_header.node_name,
+            event_header.resource_name,
+            event_header.volume_number if event_header.HasField('volume_number') else None,
+            event_header.snapshot_name if event_header.HasField('snapshot_name') else None,
+            event_values(event_header, event_data)
+        ], separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            self._file.write(self.RECORD_HEADER.pack(time.time(), len(payload)) + payload)
+            self.recorded += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class EventReplay(object):
+    """
+    Plays back a file written by EventRecorder.
+
+    Iterating yields (event_header, event_data) tuples, paced like the original stream divided by speed.
+    watch_events feeds the events to handlers like linstor.Linstor.watch_events does.
+    """
+    def __init__(self, path, speed=1.0):
+        """
+        :param str path: recording file
+        :param float speed: replay speed factor, 0 replays without delays
+        """
+        self._path = path
+        self._speed = speed
+        try:
+            with open(path, 'rb') as recording:
+                magic = recording.read(len(EventRecorder.MAGIC))
+        except IOError as err:
+            raise LinstorClientError("Unable to read recording '{p}': {e}".format(p=path, e=err),
+                                     ExitCode.ARGPARSE_ERROR)
+        if magic != EventRecorder.MAGIC:
+            raise LinstorClientError("'{p}' is not an event recording".format(p=path), ExitCode.ARGPARSE_ERROR)
+
+    def _records(self):
+        header_size = EventRecorder.RECORD_HEADER.size
+        with open(self._path, 'rb') as recording:
+            recording.seek(len(EventRecorder.MAGIC))
+            while True:
+                record_header = recording.read(header_size)
+                if len(record_header) < header_size:
+                    return
+                timestamp, length = EventRecorder.RECORD_HEADER.unpack(record_header)
+                payload = recording.read(length)
+                if len(payload) < length:
+                    return  # last record of an interrupted recording
+                yield timestamp, json.loads(payload.decode('utf-8'))
+
+    @staticmethod
+    def _event(fields):
+        name, action, node_name, rsc_name, volume_number, snapshot_name, values = fields
+        event_header = RecordedMessage(
+            event_name=name,
+            event_action=action,
+            node_name=node_name,
+            resource_name=rsc_name,
+            volume_number=volume_number,
+            snapshot_name=snapshot_name
+        )
+        if values is None:
+            return event_header, None
+        if 'responses' in values:
+            values['responses'] = [RecordedMessage(**x) for x in values['responses']]
+        return event_header, RecordedMessage(**values)
+
+    def __iter__(self):
+        first = None
+        start = time.time()
+        for timestamp, fields in self._records():
+            if first is None:
+                first = timestamp
+            if self._speed > 0:
+                delay = (timestamp - first) / self._speed - (time.time() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            yield self._event(fields)
+
+    def watch_events(self, reply_handler, event_handler, object_identifier):
+        """
+        Replays the events matching object_identifier. The stream ends after the last recorded event,
+        None is returned then.
+        """
+        result = reply_handler([])
+        if result is not None:
+            return result
+
+        match = [
+            (x, getattr(object_identifier, x, None)) for x in ['node_name', 'resource_name', 'volume_number']
+        ]
+        for event_header, event_data in self:
+            if all(value is None or getattr(event_header, attr) == value for attr, value in match):
+                result = event_handler(event_header, event_data)
+                if result is not None:
+                    return result
+        return None
+
+
+class ReplayingLinstor(object):
+    """
+    Proxy around a linstor.Linstor object that serves watch_events from an EventReplay.
+    All other calls go to the controller, which is only connected once the first of them is made,
+    so replaying a recording with create-watch works without a controller.
+    """
+    # methods of linstor.Linstor that do not talk to the controller
+    LOCAL_METHODS = TracingLinstor.LOCAL_METHODS
+
+    def __init__(self, linstorapi, replay):
+        self._linstorapi = linstorapi
+        self._replay = replay
+        self._connect_pending = False
+
+    def __getattr__(self, name):
+        if self._connect_pending and not name.startswith('_') and name not in self.LOCAL_METHODS:
+            self._connect_pending = False
+            self._linstorapi.connect()
+        return getattr(self._linstorapi, name)
+
+    def connect(self):
+        """Defers the connection to the first call that needs the controller."""
+        self._connect_pending = True
+        return True
+
+    def disconnect(self):
+        if self._connect_pending:
+            self._connect_pending = False
+        else:
+            self._linstorapi.disconnect()
+
+    def watch_events(self, reply_handler, event_handler, object_identifier):
+        return self._replay.watch_events(reply_handler, event_handler, object_identifier)
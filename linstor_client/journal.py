@@ -0,0 +1,143 @@
+"""
+    LINSTOR - management of distributed storage/DRBD9 resources
+    Copyright (C) 2018  LINBIT HA-Solutions GmbH
+
+    You can use this file under the terms of the GNU Lesser General
+    Public License as as published by the Free Software Foundation,
+    either version 3 of the License, or (at your option) any later
+    version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    See <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+from linstor_client.consts import JOURNAL_RETRY_ATTEMPTS, JOURNAL_RETRY_DELAY, ExitCode
+from linstor_client.utils import LinstorClientError
+
+
+class Journal(object):
+    """
+    Append-only NDJSON journal of the steps of a bulk operation.
+
+    Every state change of a step is appended as one record, so an interrupted run leaves a consistent
+    journal behind. A run resumed from the journal skips steps that are done and retries steps that
+    failed with exponential backoff.
+    """
+    PLANNED = 'planned'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, path=None, resume=False):
+        """
+        :param str path: journal file, if None the states are only kept in memory
+        :param bool resume: continue the journal instead of starting a new one
+        """
+        self._path = path
+        self._states = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if path is None:
+            return
+
+        if resume:
+            if not os.path.exists(path):
+                raise LinstorClientError("Journal '{p}' does not exist".format(p=path), ExitCode.ARGPARSE_ERROR)
+            with open(path) as journal_file:
+                for line in journal_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # last record of an interrupted write
+                    self._states[record['step']] = record['state']
+        try:
+            self._file = open(path, 'a' if resume else 'w')
+        except IOError as err:
+            raise LinstorClientError("Unable to open journal '{p}': {e}".format(p=path, e=err), ExitCode.ARGPARSE_ERROR)
+
+    @classmethod
+    def from_args(cls, args):
+        """
+        :return: the journal selected by --journal or --resume, or an in-memory journal
+        """
+        if args.resume:
+            return cls(args.resume, resume=True)
+        return cls(args.journal)
+
+    @property
+    def path(self):
+        return self._path
+
+    def state(self, step):
+        return self._states.get(step)
+
+    def is_done(self, step):
+        return self.state(step) == self.DONE
+
+    def _append(self, records):
+        lines = ''.join([json.dumps(x, sort_keys=True) + '\n' for x in records])
+        with self._lock:
+            for record in records:
+                self._states[record['step']] = record['state']
+            if self._file is not None:
+                self._file.write(lines)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def record(self, step, state, message=None):
+        record = {'step': step, 'state': state, 'time': time.time()}
+        if message:
+            record['message'] = message
+        self._append([record])
+
+    def plan(self, steps):
+        """Records all steps that are not yet part of the journal as planned."""
+        now = time.time()
+        self._append([{'step': x, 'state': self.PLANNED, 'time': now} for x in steps if self.state(x) is None])
+
+    def run(self, step, func, succeeded):
+        """
+        Runs func for the given step and records the outcome.
+        Steps that failed in an earlier run are retried with exponential backoff.
+
+        :param str step: unique name of the step
+        :param func: callable doing the work of the step
+        :param succeeded: callable that tells from the result of func whether the step succeeded
+        :return: the result of func
+        """
+        attempts = JOURNAL_RETRY_ATTEMPTS if self.state(step) == self.FAILED else 1
+        delay = JOURNAL_RETRY_DELAY
+        for attempt in range(attempts):
+            result = func()
+            if succeeded(result):
+                self.record(step, self.DONE)
+                return result
+            if attempt + 1 < attempts:
+                time.sleep(delay)
+                delay *= 2
+        self.record(step, self.FAILED)
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        if exc_type is KeyboardInterrupt and self._path is not None:
+            sys.stderr.write("\nInterrupted, continue with --resume {p}\n".format(p=self._path))
+        return False
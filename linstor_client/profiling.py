@@ -0,0 +1,101 @@
+"""
+    LINSTOR - management of distributed storage/DRBD9 resources
+    Copyright (C) 2018  LINBIT HA-Solutions GmbH
+
+    You can use this file under the terms of the GNU Lesser General
+    Public License as as published by the Free Software Foundation,
+    either version 3 of the License, or (at your option) any later
+    version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    See <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import sys
+import tempfile
+
+from linstor_client.consts import KEY_LS_PROFILE_OUTPUT, PROFILE_MEM_TOP_N, ExitCode
+from linstor_client.utils import LinstorClientError
+
+
+class Profiler(object):
+    """
+    Runs a single client command under cProfile or tracemalloc and writes the result to the file
+    named by the LS_PROFILE_OUTPUT environment variable (or a file in the temp directory).
+    """
+    CPU = 'cpu'
+    MEM = 'mem'
+    MODES = [CPU, MEM]
+
+    _active = False
+
+    def __init__(self, mode):
+        self._mode = mode
+
+    @classmethod
+    def output_path(cls, mode):
+        path = os.environ.get(KEY_LS_PROFILE_OUTPUT)
+        if not path:
+            ext = 'pstats' if mode == cls.CPU else 'memtop'
+            path = os.path.join(tempfile.gettempdir(), 'linstor-client-{pid}.{ext}'.format(pid=os.getpid(), ext=ext))
+        return path
+
+    def run(self, func, *args):
+        """
+        Calls func(*args) with the profiler enabled.
+        Nested calls (e.g. commands executed from interactive mode) are not profiled again.
+
+        :return: the return value of func
+        """
+        if Profiler._active:
+            return func(*args)
+
+        Profiler._active = True
+        try:
+            if self._mode == self.MEM:
+                return self._run_mem(func, *args)
+            return self._run_cpu(func, *args)
+        finally:
+            Profiler._active = False
+
+    def _run_cpu(self, func, *args):
+        import cProfile
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+            path = self.output_path(self.CPU)
+            profile.dump_stats(path)
+            sys.stderr.write("Profile (pstats) written to: {p}\n".format(p=path))
+
+    def _run_mem(self, func, *args):
+        try:
+            import tracemalloc
+        except ImportError:
+            raise LinstorClientError(
+                "Memory profiling needs the tracemalloc module (python >= 3.4).",
+                ExitCode.OPTION_NOT_SUPPORTED
+            )
+
+        tracemalloc.start()
+        try:
+            return func(*args)
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            path = self.output_path(self.MEM)
+            with open(path, 'w') as report:
+                report.write("current: {c} bytes; peak: {p} bytes\n".format(c=current, p=peak))
+                report.write("top {n} allocations by line:\n".format(n=PROFILE_MEM_TOP_N))
+                for stat in snapshot.statistics('lineno')[:PROFILE_MEM_TOP_N]:
+                    report.write(str(stat) + '\n')
+            sys.stderr.write("Memory profile written to: {p}\n".format(p=path))
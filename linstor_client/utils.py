@@ -22,8 +22,14 @@ import locale
 import os
 import subprocess
 import sys
+import threading
 from collections import OrderedDict
 
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
 from linstor_client.consts import (
     NODE_NAME,
     NODE_NAME_LABEL_MAXLEN,
@@ -34,6 +40,7 @@ from linstor_client.consts import (
     RES_NAME_MINLEN,
     RES_NAME_VALID_CHARS,
     RES_NAME_VALID_INNER_CHARS,
+    RET_OBJECT_TYPE_MASK,
     SNAPSHOT_NAME,
     SNAPSHOT_NAME_MAXLEN,
     SNAPSHOT_NAME_MINLEN,
@@ -95,19 +102,77 @@ class Output(object):
     @staticmethod
     def print_with_indent(stream, indent, text):
         spacer = indent * ' '
-        offset = 0
-        index = 0
-        while index < len(text):
-            if text[index] == '\n':
-                stream.write(spacer)
-                stream.write(text[offset:index])
-                stream.write('\n')
-                offset = index + 1
-            index += 1
-        if offset < len(text):
-            stream.write(spacer)
-            stream.write(text[offset:])
-            stream.write('\n')
+        lines = text.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        for line in lines:
+            stream.write(spacer + line + '\n')
+
+    @staticmethod
+    def handle_ret_summary(answers, no_color, warn_as_error, outstream=sys.stdout):
+        """
+        Prints only the errors (and warnings if they are treated as errors) of the given answers,
+        followed by the number of answers per return code class and object type.
+
+        :param answers: list of MsgApiCallResponse
+        :return: exit code as handle_ret would return it for the whole list
+        """
+        ret = 0
+        counts = {}
+        for answer in answers:
+            rc = answer.ret_code
+            category = Output.ret_class(rc)
+            if category == 'ERROR' or (category == 'WARNING' and warn_as_error):
+                ret = Output.handle_ret(answer, no_color, warn_as_error, outstream)
+
+            obj_counts = counts.setdefault(category, {})
+            obj_type = Output.ret_object_type(rc)
+            obj_counts[obj_type] = obj_counts.get(obj_type, 0) + 1
+
+        colors = {'ERROR': Color.RED, 'WARNING': Color.YELLOW, 'INFO': Color.NONE, 'SUCCESS': Color.GREEN}
+        for category in ['SUCCESS', 'INFO', 'WARNING', 'ERROR']:
+            if category in counts:
+                obj_counts = counts[category]
+                outstream.write("{cat}: {total} ({objs})\n".format(
+                    cat=Output.color_str(category, colors[category], no_color),
+                    total=sum(obj_counts.values()),
+                    objs=", ".join(["{o}: {c}".format(o=o, c=obj_counts[o]) for o in sorted(obj_counts)])
+                ))
+        return ret
+
+    @staticmethod
+    def ret_class(ret_code):
+        """Returns 'ERROR', 'WARNING', 'INFO' or 'SUCCESS' for the given return code."""
+        from linstor.sharedconsts import (MASK_ERROR, MASK_WARN, MASK_INFO)
+
+        if ret_code & MASK_ERROR == MASK_ERROR:
+            return 'ERROR'
+        elif ret_code & MASK_WARN == MASK_WARN:
+            return 'WARNING'
+        elif ret_code & MASK_INFO == MASK_INFO:
+            return 'INFO'
+        return 'SUCCESS'
+
+    @staticmethod
+    def ret_object_type(ret_code):
+        """
+        Returns a readable name of the object type encoded in the given return code.
+        The object type is an enumerated field, not a set of flags, so it is compared as a whole.
+        """
+        import linstor.sharedconsts as apiconsts
+        obj_names = {
+            apiconsts.MASK_NODE: 'Node',
+            apiconsts.MASK_RSC_DFN: 'Resource definition',
+            apiconsts.MASK_RSC: 'Resource',
+            apiconsts.MASK_VLM_DFN: 'Volume definition',
+            apiconsts.MASK_VLM: 'Volume',
+            apiconsts.MASK_NET_IF: 'Network interface',
+            apiconsts.MASK_STOR_POOL_DFN: 'Storage pool definition',
+            apiconsts.MASK_STOR_POOL: 'Storage pool',
+            apiconsts.MASK_SNAPSHOT: 'Snapshot',
+            apiconsts.MASK_CTRL_CONF: 'Controller'
+        }
+        return obj_names.get(ret_code & RET_OBJECT_TYPE_MASK, 'Other')
 
     @staticmethod
     def color_str(string, color, no_color):
@@ -347,6 +412,15 @@ def ip_completer(where):
     return completer
 
 
+# dests of the global and bulk options, see reserve_args
+_reserved_args = set()
+
+
+def reserve_args(dests):
+    """Excludes the given argument dests, e.g. those of the global or bulk options, from filter_new_args."""
+    _reserved_args.update(dests)
+
+
 # mainly used for DrbdSetupOpts()
 # but also usefull for 'handlers' subcommand
 def filter_new_args(unsetprefix, args):
@@ -357,7 +431,7 @@ def filter_new_args(unsetprefix, args):
         "machine_readable", "disable_config", "timeout"
     ]
     for k, v in args.__dict__.items():
-        if v is not None and k not in reserved_keys:
+        if v is not None and k not in reserved_keys and k not in _reserved_args:
             key = k.replace('_', '-')
 
             # handle --unset
@@ -531,6 +605,51 @@ class SizeCalc(object):
         return size_str
 
 
+def parallel_map(func, items, limit):
+    """
+    Calls func for every item, with at most limit calls running at the same time.
+    The first exception raised by func is re-raised after all running calls returned.
+
+    :param func: callable taking one item
+    :param items: iterable of items
+    :param int limit: maximum number of concurrent calls
+    :return: list of the results in the order of items
+    """
+    items = list(items)
+    if limit <= 1 or len(items) <= 1:
+        return [func(x) for x in items]
+
+    results = [None] * len(items)
+    errors = []
+    work = queue.Queue()
+    for idx, item in enumerate(items):
+        work.put((idx, item))
+
+    def worker():
+        while not errors:
+            try:
+                idx, item = work.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[idx] = func(item)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(min(limit, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        # join with timeout, otherwise python 2 does not deliver KeyboardInterrupt
+        while thread.is_alive():
+            thread.join(0.1)
+
+    if errors:
+        raise errors[0]
+    return results
+
+
 class LinstorClientError(Exception):
     """
     Linstor exception with a message and exit code information
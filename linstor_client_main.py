@@ -33,6 +33,9 @@ import linstor_client.argparse.argparse as argparse
 import linstor_client.argcomplete as argcomplete
 import linstor_client.utils as utils
 from linstor_client.commands import (
+    ApplyCommands,
+    PropertyCommands,
+    ExporterCommands,
     ControllerCommands,
     VolumeDefinitionCommands,
     StoragePoolDefinitionCommands,
@@ -48,9 +51,14 @@ from linstor_client.commands import (
     ArgumentError
 )
 
+from linstor_client.profiling import Profiler
+from linstor_client.api_trace import TracingLinstor
+from linstor_client.event_stream import EventReplay, ReplayingLinstor
 from linstor_client.consts import (
     GITHASH,
+    KEY_LS_API_TRACE,
     KEY_LS_CONTROLLERS,
+    KEY_LS_PROFILE_OUTPUT,
     VERSION,
     ExitCode
 )
@@ -75,6 +83,9 @@ class LinStorCLI(object):
         self._resource_commands = ResourceCommands()
         self._snapshot_commands = SnapshotCommands()
         self._misc_commands = MiscCommands()
+        self._apply_commands = ApplyCommands()
+        self._property_commands = PropertyCommands()
+        self._exporter_commands = ExporterCommands()
         self._zsh_generator = None
         self._parser = self.setup_parser()
         self._all_commands = self.parser_cmds(self._parser)
@@ -95,10 +106,30 @@ class LinStorCLI(object):
                             'If the environment variable %s is set, '
                             'the ones set via this argument get appended.' % KEY_LS_CONTROLLERS)
         parser.add_argument('-m', '--machine-readable', action="store_true")
+        parser.add_argument('--summary', action="store_true",
+                            help='Only print errors and the number of replies per return code class and object '
+                            'type. Useful for bulk operations.')
         parser.add_argument('-t', '--timeout', default=300, type=int,
                             help="Connection timeout value.")
         parser.add_argument('--disable-config', action="store_true",
                             help="Disable config loading and only use commandline arguments.")
+        parser.add_argument('--profile', action="store_true",
+                            help='Run the command under a profiler, see --profile-mode. '
+                            'The report is written to the file given by the environment variable %s.'
+                            % KEY_LS_PROFILE_OUTPUT)
+        parser.add_argument('--profile-mode', choices=Profiler.MODES, default=Profiler.CPU,
+                            help='Profile with cProfile (cpu) or tracemalloc (mem). Default: %(default)s')
+        parser.add_argument('--api-trace', metavar='FILE', default=os.environ.get(KEY_LS_API_TRACE),
+                            help='Append an NDJSON record (method, arguments, timestamps, reply count and size) '
+                            'for every controller call to FILE. Defaults to the environment variable %s.'
+                            % KEY_LS_API_TRACE)
+        parser.add_argument('--replay-events', metavar='FILE',
+                            help='Serve event subscriptions, e.g. the waits of resource create and delete, from a '
+                            'recording written by "create-watch --record" instead of the controller.')
+        parser.add_argument('--replay-speed', type=float, default=1.0,
+                            help='Speed factor for --replay-events, 0 replays without delays. Default: %(default)s')
+        # options added here must not end up as DRBD options
+        utils.reserve_args([x.dest for x in parser._actions])
 
         subp = parser.add_subparsers(title='subcommands',
                                      description='valid subcommands',
@@ -154,6 +185,15 @@ class LinStorCLI(object):
         # misc commands
         self._misc_commands.setup_commands(subp)
 
+        # apply a cluster layout
+        self._apply_commands.setup_commands(subp)
+
+        # property search across all objects
+        self._property_commands.setup_commands(subp)
+
+        # metrics exporter
+        self._exporter_commands.setup_commands(subp)
+
         # dm-migrate
         c_dmmigrate = subp.add_parser(
             Commands.DMMIGRATE,
@@ -213,6 +253,29 @@ class LinStorCLI(object):
             pargs = LinStorCLI.merge_config_arguments(pargs)
         return self._parser.parse_args(pargs)
 
+    def set_linstorapi(self, linstorapi):
+        """
+        Sets the api object used by all command objects.
+
+        :param linstor.Linstor linstorapi: connected or not yet connected api object
+        """
+        self._linstorapi = linstorapi
+        for cmd_obj in [
+            self._controller_commands,
+            self._node_commands,
+            self._storage_pool_dfn_commands,
+            self._storage_pool_commands,
+            self._resource_dfn_commands,
+            self._volume_dfn_commands,
+            self._resource_commands,
+            self._snapshot_commands,
+            self._misc_commands,
+            self._apply_commands,
+            self._property_commands,
+            self._exporter_commands
+        ]:
+            cmd_obj._linstor = linstorapi
+
     @classmethod
     def _report_linstor_error(cls, le):
         sys.stderr.write("Error: " + le.message + '\n')
@@ -221,6 +284,7 @@ class LinStorCLI(object):
 
     def parse_and_execute(self, pargs):
         rc = ExitCode.OK
+        api_trace = None
         try:
             args = self.parse(pargs)
 
@@ -233,18 +297,18 @@ class LinStorCLI(object):
 
             # only connect if not already connected or a local only command was executed
             if self._linstorapi is None and args.func not in local_only_cmds:
-                self._linstorapi = linstor.Linstor(Commands.controller_list(args.controllers)[0], timeout=args.timeout)
-                self._controller_commands._linstor = self._linstorapi
-                self._node_commands._linstor = self._linstorapi
-                self._storage_pool_dfn_commands._linstor = self._linstorapi
-                self._storage_pool_commands._linstor = self._linstorapi
-                self._resource_dfn_commands._linstor = self._linstorapi
-                self._volume_dfn_commands._linstor = self._linstorapi
-                self._resource_commands._linstor = self._linstorapi
-                self._snapshot_commands._linstor = self._linstorapi
-                self._misc_commands._linstor = self._linstorapi
+                linstorapi = linstor.Linstor(Commands.controller_list(args.controllers)[0], timeout=args.timeout)
+                if args.api_trace:
+                    api_trace = linstorapi = TracingLinstor(linstorapi, args.api_trace)
+                if args.replay_events:
+                    # connects on the first call that is not an event subscription
+                    linstorapi = ReplayingLinstor(linstorapi, EventReplay(args.replay_events, args.replay_speed))
+                self.set_linstorapi(linstorapi)
                 self._linstorapi.connect()
-            rc = args.func(args)
+            if args.profile:
+                rc = Profiler(args.profile_mode).run(args.func, args)
+            else:
+                rc = args.func(args)
         except ArgumentError as ae:
             sys.stderr.write(ae.message + '\n')
             try:
@@ -264,6 +328,9 @@ class LinStorCLI(object):
         except linstor.LinstorError as le:
             self._report_linstor_error(le)
             rc = ExitCode.UNKNOWN_ERROR
+        finally:
+            if api_trace is not None:
+                api_trace.close()
 
         return rc
 
@@ -11,7 +11,8 @@ _controller_tests = [
 ]
 
 _std_tests = [
-    "tests.test_client_commands"
+    "tests.test_client_commands",
+    "tests.test_fake_controller"
 ]
 
 
@@ -0,0 +1,690 @@
+"""
+In-process stand-in for a LINSTOR controller.
+
+FakeLinstor implements the parts of linstor.Linstor the client uses (list, create, modify, delete and
+watch_events) on top of an in-memory data set, so tests and benchmarks can run without a linstor-server
+distribution. Data sets of arbitrary size can be generated with FakeDataset and every controller call
+can be delayed by a configurable latency.
+
+Usage from a test::
+
+    cli = linstor_client_main.LinStorCLI()
+    cli.set_linstorapi(FakeLinstor(dataset=FakeDataset(nodes=10, resource_definitions=100)))
+    cli.parse_and_execute(['node', 'list'])
+
+or to replace the real api class for a whole process (e.g. when running linstor_client_main.main())::
+
+    linstor.Linstor = FakeLinstor.factory(FakeDataset(nodes=10000, resource_definitions=100000), latency=0.01)
+"""
+
+import importlib
+import threading
+import time
+from datetime import datetime, timedelta
+
+import linstor.sharedconsts as apiconsts
+from linstor.linstorapi import ApiCallResponse, ProtoMessageResponse
+
+
+def _proto(module_name, class_name=None):
+    """Returns the protobuf message class `class_name` from linstor.proto.<module_name>_pb2."""
+    module = importlib.import_module('linstor.proto.' + module_name + '_pb2')
+    return getattr(module, class_name if class_name else module_name)
+
+
+class FakeEventHeader(object):
+    """Mimics the event header protobuf message passed to watch_events handlers."""
+    def __init__(self, event_name, event_action, node_name='', resource_name='', volume_number=None,
+                 snapshot_name=None):
+        self.event_name = event_name
+        self.event_action = event_action
+        self.node_name = node_name
+        self.resource_name = resource_name
+        self.volume_number = volume_number
+        self.snapshot_name = snapshot_name
+
+    def HasField(self, name):
+        return getattr(self, name, None) is not None
+
+
+class FakeEventData(object):
+    """Mimics the event data protobuf messages, every keyword argument becomes a field."""
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def HasField(self, name):
+        return getattr(self, name, None) is not None
+
+
+class FakeErrorReport(object):
+    """Mimics linstor.linstorapi.ErrorReport."""
+    def __init__(self, report_id, node_name, dt, text):
+        self.id = report_id
+        self.node_names = node_name
+        self.datetime = dt
+        self.text = text
+        self.proto_msg = _proto('MsgErrorReport')(
+            node_names=node_name,
+            error_time=int(time.mktime(dt.timetuple()) * 1000),
+            filename='ErrorReport-' + report_id + '.log',
+            text=text
+        )
+
+
+class FakeDataset(object):
+    """
+    Describes the synthetic cluster a FakeLinstor starts with.
+
+    Resource definitions are deployed round robin on `replicas` nodes, so the number of resources
+    is resource_definitions * replicas.
+    """
+    def __init__(self, nodes=3, resource_definitions=0, volumes_per_resource=1, replicas=2, snapshots=0,
+                 error_reports=0, volume_size_kib=1024 * 1024, storage_pool='DfltStorPool'):
+        self.nodes = nodes
+        self.resource_definitions = resource_definitions
+        self.volumes_per_resource = volumes_per_resource
+        self.replicas = min(replicas, nodes)
+        self.snapshots = snapshots
+        self.error_reports = error_reports
+        self.volume_size_kib = volume_size_kib
+        self.storage_pool = storage_pool
+
+    @staticmethod
+    def node_name(idx):
+        return 'node{i:05d}'.format(i=idx)
+
+    @staticmethod
+    def rsc_name(idx):
+        return 'rsc{i:06d}'.format(i=idx)
+
+
+class FakeLinstor(object):
+    FIRST_PORT = 7000
+    FIRST_MINOR = 1000
+
+    def __init__(self, ctrl_host='linstor://fake', timeout=300, dataset=None, latency=0.0):
+        """
+        :param str ctrl_host: ignored, same signature as linstor.Linstor
+        :param int timeout: ignored, same signature as linstor.Linstor
+        :param FakeDataset dataset: initial cluster content
+        :param float latency: seconds every controller call is delayed
+        """
+        self._ctrl_host = ctrl_host
+        self._timeout = timeout
+        self._latency = latency
+        self._connected = False
+        self._lock = threading.RLock()
+        self.event_source = None  # optional iterable of (event_header, event_data) for watch_events
+        self.calls = []  # names of all controller calls, for assertions in tests
+
+        self._ctrl_props = _proto('MsgLstCtrlCfgProps')()
+        self._nodes = _proto('MsgLstNode')()
+        self._stor_pool_dfns = _proto('MsgLstStorPoolDfn')()
+        self._stor_pools = _proto('MsgLstStorPool')()
+        self._rsc_dfns = _proto('MsgLstRscDfn')()
+        self._rscs = _proto('MsgLstRsc')()
+        self._snapshot_dfns = _proto('MsgLstSnapshotDfn')()
+        self._error_reports = []
+        self._removed_rscs = []  # (node_name, rsc_name) deleted since the last watch_events
+        self._next_minor = self.FIRST_MINOR
+
+        self._populate(dataset if dataset else FakeDataset())
+
+    @classmethod
+    def factory(cls, dataset=None, latency=0.0):
+        """Returns a callable with the constructor signature of linstor.Linstor."""
+        def create(ctrl_host, timeout=300):
+            return cls(ctrl_host, timeout, dataset=dataset, latency=latency)
+        return create
+
+    # --- data set generation ---
+
+    def _populate(self, dataset):
+        for i in range(dataset.nodes):
+            node_name = dataset.node_name(i)
+            self._add_node(node_name, apiconsts.VAL_NODE_TYPE_STLT,
+                           '10.{a}.{b}.{c}'.format(a=i >> 16 & 0xff, b=i >> 8 & 0xff, c=i & 0xff))
+            self._add_stor_pool(node_name, dataset.storage_pool, 'LvmDriver', 'drbdpool')
+
+        sp_dfn = self._stor_pool_dfns.stor_pool_dfns.add()
+        sp_dfn.stor_pool_name = dataset.storage_pool
+
+        for i in range(dataset.resource_definitions):
+            rsc_dfn = self._add_rsc_dfn(dataset.rsc_name(i))
+            for vlm_nr in range(dataset.volumes_per_resource):
+                self._add_vlm_dfn(rsc_dfn, dataset.volume_size_kib, vlm_nr)
+            for r in range(dataset.replicas):
+                self._add_rsc(dataset.node_name((i + r) % dataset.nodes), rsc_dfn, False, dataset.storage_pool)
+            if i < dataset.snapshots:
+                self._add_snapshot(
+                    [dataset.node_name((i + r) % dataset.nodes) for r in range(dataset.replicas)],
+                    rsc_dfn,
+                    'snap{i:06d}'.format(i=i)
+                )
+
+        now = datetime.now()
+        for i in range(dataset.error_reports):
+            node_name = dataset.node_name(i % dataset.nodes) if dataset.nodes else 'controller'
+            report_id = '5B0D{i:04X}-00000-{i:06d}'.format(i=i)
+            self._error_reports.append(FakeErrorReport(
+                report_id,
+                node_name,
+                now - timedelta(minutes=dataset.error_reports - i),
+                'ERROR REPORT {id}\n\nReported error:\n===============\n\n'
+                'Category:                           RuntimeException\n'
+                'Class name:                         FakeException{n}\n'
+                'Error message:                      synthetic error {i}\n'.format(id=report_id, n=i % 3, i=i)
+            ))
+
+    @staticmethod
+    def _add_props(container, props):
+        for key, value in props.items():
+            entry = container.add()
+            entry.key = key
+            entry.value = value
+
+    def _add_node(self, node_name, node_type, ip, netif_name='default'):
+        node = self._nodes.nodes.add()
+        node.name = node_name
+        node.type = node_type
+        node.connection_status = apiconsts.CONN_STATUS_ONLINE
+        netif = node.net_interfaces.add()
+        netif.name = netif_name
+        netif.address = ip
+        return node
+
+    def _add_stor_pool(self, node_name, stor_pool_name, driver, driver_pool_name):
+        stor_pool = self._stor_pools.stor_pools.add()
+        stor_pool.stor_pool_name = stor_pool_name
+        stor_pool.node_name = node_name
+        stor_pool.driver = driver
+        if driver_pool_name:
+            self._add_props(stor_pool.props, {apiconsts.NAMESPC_STORAGE_DRIVER + '/LvmVg': driver_pool_name})
+        self._add_props(stor_pool.static_traits, {
+            apiconsts.KEY_STOR_POOL_SUPPORTS_SNAPSHOTS: 'false',
+            apiconsts.KEY_STOR_POOL_PROVISIONING: 'Fat'
+        })
+        stor_pool.free_space.stor_pool_name = stor_pool_name
+        stor_pool.free_space.free_space = 100 * 1024 * 1024
+        return stor_pool
+
+    def _add_rsc_dfn(self, rsc_name, port=None):
+        rsc_dfn = self._rsc_dfns.rsc_dfns.add()
+        rsc_dfn.rsc_name = rsc_name
+        rsc_dfn.rsc_dfn_port = port if port else self.FIRST_PORT + len(self._rsc_dfns.rsc_dfns) - 1
+        return rsc_dfn
+
+    def _add_vlm_dfn(self, rsc_dfn, size, vlm_nr=None, minor=None):
+        vlm_dfn = rsc_dfn.vlm_dfns.add()
+        vlm_dfn.vlm_nr = vlm_nr if vlm_nr is not None else len(rsc_dfn.vlm_dfns) - 1
+        if minor is None:
+            minor = self._next_minor
+            self._next_minor += 1
+        vlm_dfn.vlm_minor = minor
+        vlm_dfn.vlm_size = size
+        return vlm_dfn
+
+    def _add_rsc(self, node_name, rsc_dfn, diskless, stor_pool_name):
+        rsc_name = rsc_dfn.rsc_name
+        rsc = self._rscs.resources.add()
+        rsc.name = rsc_name
+        rsc.node_name = node_name
+        if diskless:
+            rsc.rsc_flags.append(apiconsts.FLAG_DISKLESS)
+        rsc_state = self._rscs.resource_states.add()
+        rsc_state.rsc_name = rsc_name
+        rsc_state.node_name = node_name
+        rsc_state.in_use = False
+        for vlm_dfn in rsc_dfn.vlm_dfns:
+            vlm = rsc.vlms.add()
+            vlm.vlm_nr = vlm_dfn.vlm_nr
+            vlm.vlm_minor_nr = vlm_dfn.vlm_minor
+            vlm.stor_pool_name = 'DfltDisklessStorPool' if diskless else stor_pool_name
+            vlm.device_path = '/dev/drbd{m}'.format(m=vlm_dfn.vlm_minor)
+            vlm_state = rsc_state.vlm_states.add()
+            vlm_state.vlm_nr = vlm_dfn.vlm_nr
+            vlm_state.disk_state = 'Diskless' if diskless else 'UpToDate'
+        return rsc
+
+    def _add_snapshot(self, node_names, rsc_dfn, snapshot_name):
+        snapshot_dfn = self._snapshot_dfns.snapshot_dfns.add()
+        snapshot_dfn.rsc_name = rsc_dfn.rsc_name
+        snapshot_dfn.snapshot_name = snapshot_name
+        snapshot_dfn.snapshot_dfn_flags.append(apiconsts.FLAG_SUCCESSFUL)
+        for node_name in node_names:
+            snapshot_dfn.snapshots.add().node_name = node_name
+        for vlm_dfn in rsc_dfn.vlm_dfns:
+            snapshot_vlm_dfn = snapshot_dfn.snapshot_vlm_dfns.add()
+            snapshot_vlm_dfn.vlm_nr = vlm_dfn.vlm_nr
+            snapshot_vlm_dfn.vlm_size = vlm_dfn.vlm_size
+        return snapshot_dfn
+
+    # --- helpers ---
+
+    @staticmethod
+    def _find(container, **fields):
+        for item in container:
+            if all([getattr(item, k) == v for k, v in fields.items()]):
+                return item
+        return None
+
+    @staticmethod
+    def _remove(container, **fields):
+        for idx in reversed(range(len(container))):
+            if all([getattr(container[idx], k) == v for k, v in fields.items()]):
+                del container[idx]
+
+    def _call(self, name):
+        self.calls.append(name)
+        if self._latency:
+            time.sleep(self._latency)
+
+    @staticmethod
+    def _reply(ret_code, message):
+        return [ApiCallResponse(_proto('MsgApiCallResponse')(ret_code=ret_code, message=message))]
+
+    @classmethod
+    def _success(cls, op_mask, obj_mask, message):
+        op_code = {
+            apiconsts.MASK_CRT: apiconsts.CREATED,
+            apiconsts.MASK_MOD: apiconsts.MODIFIED,
+            apiconsts.MASK_DEL: apiconsts.DELETED
+        }[op_mask]
+        return cls._reply(op_mask | obj_mask | op_code, message)
+
+    @classmethod
+    def _error(cls, op_mask, obj_mask, message):
+        return cls._reply(apiconsts.MASK_ERROR | op_mask | obj_mask, message)
+
+    @classmethod
+    def _modify_props(cls, container, property_dict, delete_props):
+        for key in delete_props if delete_props else []:
+            cls._remove(container, key=key)
+        for key, value in (property_dict if property_dict else {}).items():
+            cls._remove(container, key=key)
+            cls._add_props(container, {key: value})
+
+    # --- linstor.Linstor interface ---
+
+    def connect(self):
+        self._connected = True
+        return True
+
+    def disconnect(self):
+        self._connected = False
+
+    @property
+    def connected(self):
+        return self._connected
+
+    @classmethod
+    def all_api_responses_success(cls, replies):
+        return all([r.is_success() for r in replies])
+
+    @classmethod
+    def return_if_failure(cls, replies):
+        return None if cls.all_api_responses_success(replies) else replies
+
+    @classmethod
+    def filter_api_call_response(cls, replies):
+        return [r for r in replies if isinstance(r, ApiCallResponse)]
+
+    @classmethod
+    def storage_props_to_driver_pool(cls, driver, props):
+        values = [p.value for p in props if p.key.startswith(apiconsts.NAMESPC_STORAGE_DRIVER + '/')]
+        return values[0] if values else ''
+
+    def controller_props(self):
+        self._call('controller_props')
+        return [ProtoMessageResponse(self._ctrl_props)]
+
+    def controller_set_prop(self, key, value):
+        self._call('controller_set_prop')
+        with self._lock:
+            self._modify_props(self._ctrl_props.props, {key: value}, [])
+        return self._success(apiconsts.MASK_MOD, apiconsts.MASK_CTRL_CONF, "Controller property set")
+
+    def controller_del_prop(self, key):
+        self._call('controller_del_prop')
+        with self._lock:
+            self._modify_props(self._ctrl_props.props, {}, [key])
+        return self._success(apiconsts.MASK_MOD, apiconsts.MASK_CTRL_CONF, "Controller property deleted")
+
+    def node_list(self):
+        self._call('node_list')
+        return [ProtoMessageResponse(self._nodes)]
+
+    def node_create(self, node_name, node_type, ip, com_type=None, port=None, netif_name='default'):
+        self._call('node_create')
+        with self._lock:
+            if self._find(self._nodes.nodes, name=node_name):
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_NODE, "Node already exists")
+            self._add_node(node_name, node_type, ip, netif_name)
+        return self._success(apiconsts.MASK_CRT, apiconsts.MASK_NODE, "Node created")
+
+    def node_modify(self, node_name, property_dict, delete_props=None):
+        self._call('node_modify')
+        with self._lock:
+            node = self._find(self._nodes.nodes, name=node_name)
+            if node is None:
+                return self._error(apiconsts.MASK_MOD, apiconsts.MASK_NODE, "Node not found")
+            self._modify_props(node.props, property_dict, delete_props)
+        return self._success(apiconsts.MASK_MOD, apiconsts.MASK_NODE, "Node modified")
+
+    def node_delete(self, node_name):
+        self._call('node_delete')
+        with self._lock:
+            if self._find(self._rscs.resources, node_name=node_name):
+                return self._error(apiconsts.MASK_DEL, apiconsts.MASK_NODE, "Node has resources")
+            self._remove(self._stor_pools.stor_pools, node_name=node_name)
+            self._remove(self._nodes.nodes, name=node_name)
+        return self._success(apiconsts.MASK_DEL, apiconsts.MASK_NODE, "Node deleted")
+
+    def netinterface_create(self, node_name, interface_name, ip, port=None, com_type=None):
+        self._call('netinterface_create')
+        with self._lock:
+            node = self._find(self._nodes.nodes, name=node_name)
+            if node is None:
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_NODE, "Node not found")
+            netif = node.net_interfaces.add()
+            netif.name = interface_name
+            netif.address = ip
+        return self._success(apiconsts.MASK_CRT, apiconsts.MASK_NODE, "Netinterface created")
+
+    def storage_pool_dfn_list(self):
+        self._call('storage_pool_dfn_list')
+        return [ProtoMessageResponse(self._stor_pool_dfns)]
+
+    def storage_pool_dfn_create(self, name):
+        self._call('storage_pool_dfn_create')
+        with self._lock:
+            if self._find(self._stor_pool_dfns.stor_pool_dfns, stor_pool_name=name) is None:
+                self._stor_pool_dfns.stor_pool_dfns.add().stor_pool_name = name
+        return self._success(apiconsts.MASK_CRT, apiconsts.MASK_STOR_POOL_DFN, "Storage pool definition created")
+
+    def storage_pool_dfn_modify(self, name, property_dict, delete_props=None):
+        self._call('storage_pool_dfn_modify')
+        with self._lock:
+            sp_dfn = self._find(self._stor_pool_dfns.stor_pool_dfns, stor_pool_name=name)
+            if sp_dfn is None:
+                return self._error(apiconsts.MASK_MOD, apiconsts.MASK_STOR_POOL_DFN, "Storage pool dfn not found")
+            self._modify_props(sp_dfn.props, property_dict, delete_props)
+        return self._success(apiconsts.MASK_MOD, apiconsts.MASK_STOR_POOL_DFN, "Storage pool definition modified")
+
+    def storage_pool_list(self, filter_by_nodes=None, filter_by_stor_pools=None):
+        self._call('storage_pool_list')
+        if not filter_by_nodes and not filter_by_stor_pools:
+            return [ProtoMessageResponse(self._stor_pools)]
+        lstmsg = _proto('MsgLstStorPool')()
+        for stor_pool in self._stor_pools.stor_pools:
+            if (not filter_by_nodes or stor_pool.node_name in filter_by_nodes) and \
+                    (not filter_by_stor_pools or stor_pool.stor_pool_name in filter_by_stor_pools):
+                lstmsg.stor_pools.add().CopyFrom(stor_pool)
+        return [ProtoMessageResponse(lstmsg)]
+
+    def storage_pool_create(self, node_name, storage_pool_name, storage_driver, driver_pool_name):
+        self._call('storage_pool_create')
+        with self._lock:
+            if self._find(self._nodes.nodes, name=node_name) is None:
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_STOR_POOL, "Node not found")
+            if self._find(self._stor_pool_dfns.stor_pool_dfns, stor_pool_name=storage_pool_name) is None:
+                self._stor_pool_dfns.stor_pool_dfns.add().stor_pool_name = storage_pool_name
+            self._add_stor_pool(node_name, storage_pool_name, storage_driver + 'Driver', driver_pool_name)
+        return self._success(apiconsts.MASK_CRT, apiconsts.MASK_STOR_POOL, "Storage pool created")
+
+    def storage_pool_modify(self, node_name, storage_pool_name, property_dict, delete_props=None):
+        self._call('storage_pool_modify')
+        with self._lock:
+            stor_pool = self._find(self._stor_pools.stor_pools, node_name=node_name, stor_pool_name=storage_pool_name)
+            if stor_pool is None:
+                return self._error(apiconsts.MASK_MOD, apiconsts.MASK_STOR_POOL, "Storage pool not found")
+            self._modify_props(stor_pool.props, property_dict, delete_props)
+        return self._success(apiconsts.MASK_MOD, apiconsts.MASK_STOR_POOL, "Storage pool modified")
+
+    def storage_pool_delete(self, node_name, storage_pool_name):
+        self._call('storage_pool_delete')
+        with self._lock:
+            self._remove(self._stor_pools.stor_pools, node_name=node_name, stor_pool_name=storage_pool_name)
+        return self._success(apiconsts.MASK_DEL, apiconsts.MASK_STOR_POOL, "Storage pool deleted")
+
+    def resource_dfn_list(self):
+        self._call('resource_dfn_list')
+        return [ProtoMessageResponse(self._rsc_dfns)]
+
+    def resource_dfn_create(self, name, port=None):
+        self._call('resource_dfn_create')
+        with self._lock:
+            if self._find(self._rsc_dfns.rsc_dfns, rsc_name=name):
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_RSC_DFN, "Resource definition already exists")
+            self._add_rsc_dfn(name, port)
+        return self._success(apiconsts.MASK_CRT, apiconsts.MASK_RSC_DFN, "Resource definition created")
+
+    def resource_dfn_modify(self, name, property_dict, delete_props=None):
+        self._call('resource_dfn_modify')
+        with self._lock:
+            rsc_dfn = self._find(self._rsc_dfns.rsc_dfns, rsc_name=name)
+            if rsc_dfn is None:
+                return self._error(apiconsts.MASK_MOD, apiconsts.MASK_RSC_DFN, "Resource definition not found")
+            self._modify_props(rsc_dfn.rsc_dfn_props, property_dict, delete_props)
+        return self._success(apiconsts.MASK_MOD, apiconsts.MASK_RSC_DFN, "Resource definition modified")
+
+    def resource_dfn_delete(self, name):
+        self._call('resource_dfn_delete')
+        with self._lock:
+            for rsc in [x for x in self._rscs.resources if x.name == name]:
+                self._removed_rscs.append((rsc.node_name, name))
+            self._remove(self._rscs.resources, name=name)
+            self._remove(self._rscs.resource_states, rsc_name=name)
+            self._remove(self._rsc_dfns.rsc_dfns, rsc_name=name)
+        return self._success(apiconsts.MASK_DEL, apiconsts.MASK_RSC_DFN, "Resource definition deleted")
+
+    def volume_dfn_create(self, rsc_name, size, volume_nr=None, minor_nr=None, encrypt=False, storage_pool=None):
+        self._call('volume_dfn_create')
+        with self._lock:
+            rsc_dfn = self._find(self._rsc_dfns.rsc_dfns, rsc_name=rsc_name)
+            if rsc_dfn is None:
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_VLM_DFN, "Resource definition not found")
+            self._add_vlm_dfn(rsc_dfn, size, volume_nr, minor_nr)
+        return self._success(apiconsts.MASK_CRT, apiconsts.MASK_VLM_DFN, "Volume definition created")
+
+    def volume_dfn_modify(self, rsc_name, volume_nr, set_properties=None, delete_properties=None, size=None):
+        self._call('volume_dfn_modify')
+        with self._lock:
+            rsc_dfn = self._find(self._rsc_dfns.rsc_dfns, rsc_name=rsc_name)
+            vlm_dfn = self._find(rsc_dfn.vlm_dfns, vlm_nr=volume_nr) if rsc_dfn else None
+            if vlm_dfn is None:
+                return self._error(apiconsts.MASK_MOD, apiconsts.MASK_VLM_DFN, "Volume definition not found")
+            self._modify_props(vlm_dfn.vlm_props, set_properties, delete_properties)
+            if size is not None:
+                vlm_dfn.vlm_size = size
+        return self._success(apiconsts.MASK_MOD, apiconsts.MASK_VLM_DFN, "Volume definition modified")
+
+    def resource_list(self, filter_by_nodes=None, filter_by_resources=None):
+        self._call('resource_list')
+        if not filter_by_nodes and not filter_by_resources:
+            return [ProtoMessageResponse(self._rscs)]
+        lstmsg = _proto('MsgLstRsc')()
+        for rsc in self._rscs.resources:
+            if (not filter_by_nodes or rsc.node_name in filter_by_nodes) and \
+                    (not filter_by_resources or rsc.name in filter_by_resources):
+                lstmsg.resources.add().CopyFrom(rsc)
+        for rsc_state in self._rscs.resource_states:
+            if (not filter_by_nodes or rsc_state.node_name in filter_by_nodes) and \
+                    (not filter_by_resources or rsc_state.rsc_name in filter_by_resources):
+                lstmsg.resource_states.add().CopyFrom(rsc_state)
+        return [ProtoMessageResponse(lstmsg)]
+
+    def volume_list(self, filter_by_nodes=None, filter_by_stor_pools=None, filter_by_resources=None):
+        replies = self.resource_list(filter_by_nodes, filter_by_resources)
+        if filter_by_stor_pools:
+            lstmsg = _proto('MsgLstRsc')()
+            lstmsg.CopyFrom(replies[0].proto_msg)
+            for rsc in lstmsg.resources:
+                for idx in reversed(range(len(rsc.vlms))):
+                    if rsc.vlms[idx].stor_pool_name not in filter_by_stor_pools:
+                        del rsc.vlms[idx]
+            replies = [ProtoMessageResponse(lstmsg)]
+        return replies
+
+    def resource_create(self, node_name, rsc_name, diskless=False, storage_pool=None):
+        self._call('resource_create')
+        with self._lock:
+            rsc_dfn = self._find(self._rsc_dfns.rsc_dfns, rsc_name=rsc_name)
+            if rsc_dfn is None:
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_RSC, "Resource definition not found")
+            if self._find(self._nodes.nodes, name=node_name) is None:
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_RSC, "Node not found")
+            if self._find(self._rscs.resources, name=rsc_name, node_name=node_name):
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_RSC, "Resource already exists")
+            self._add_rsc(node_name, rsc_dfn, diskless, storage_pool if storage_pool else 'DfltStorPool')
+        return self._success(apiconsts.MASK_CRT, apiconsts.MASK_RSC, "Resource created")
+
+    def resource_auto_place(self, rsc_name, place_count, storage_pool=None, do_not_place_with=None,
+                            do_not_place_with_regex=None, replicas_on_same=None, replicas_on_different=None,
+                            diskless_on_remaining=None):
+        self._call('resource_auto_place')
+        with self._lock:
+            rsc_dfn = self._find(self._rsc_dfns.rsc_dfns, rsc_name=rsc_name)
+            if rsc_dfn is None:
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_RSC, "Resource definition not found")
+            used = set([x.node_name for x in self._rscs.resources if x.name == rsc_name])
+            # least loaded nodes first
+            load = {}
+            for rsc in self._rscs.resources:
+                load[rsc.node_name] = load.get(rsc.node_name, 0) + 1
+            candidates = sorted([n.name for n in self._nodes.nodes if n.name not in used],
+                                key=lambda n: load.get(n, 0))
+            if len(candidates) < place_count - len(used):
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_RSC, "Not enough nodes")
+            for node_name in candidates[:max(place_count - len(used), 0)]:
+                self._add_rsc(node_name, rsc_dfn, False, storage_pool if storage_pool else 'DfltStorPool')
+        return self._success(apiconsts.MASK_CRT, apiconsts.MASK_RSC, "Resource auto-placed")
+
+    def resource_modify(self, node_name, rsc_name, property_dict, delete_props=None):
+        self._call('resource_modify')
+        with self._lock:
+            rsc = self._find(self._rscs.resources, name=rsc_name, node_name=node_name)
+            if rsc is None:
+                return self._error(apiconsts.MASK_MOD, apiconsts.MASK_RSC, "Resource not found")
+            self._modify_props(rsc.props, property_dict, delete_props)
+        return self._success(apiconsts.MASK_MOD, apiconsts.MASK_RSC, "Resource modified")
+
+    def resource_conn_modify(self, rsc_name, node_a, node_b, property_dict, delete_props):
+        self._call('resource_conn_modify')
+        with self._lock:
+            if self._find(self._rscs.resources, name=rsc_name, node_name=node_a) is None or \
+                    self._find(self._rscs.resources, name=rsc_name, node_name=node_b) is None:
+                return self._error(apiconsts.MASK_MOD, apiconsts.MASK_RSC, "Resource not found")
+        return self._success(apiconsts.MASK_MOD, apiconsts.MASK_RSC, "Resource connection modified")
+
+    def resource_delete(self, node_name, rsc_name):
+        self._call('resource_delete')
+        with self._lock:
+            if self._find(self._rscs.resources, name=rsc_name, node_name=node_name) is None:
+                return self._error(apiconsts.MASK_DEL, apiconsts.MASK_RSC, "Resource not found")
+            self._remove(self._rscs.resources, name=rsc_name, node_name=node_name)
+            self._remove(self._rscs.resource_states, rsc_name=rsc_name, node_name=node_name)
+            self._removed_rscs.append((node_name, rsc_name))
+        return self._success(apiconsts.MASK_DEL, apiconsts.MASK_RSC, "Resource deleted")
+
+    def snapshot_dfn_list(self):
+        self._call('snapshot_dfn_list')
+        return [ProtoMessageResponse(self._snapshot_dfns)]
+
+    def snapshot_create(self, node_names, rsc_name, snapshot_name, *args):
+        self._call('snapshot_create')
+        with self._lock:
+            rsc_dfn = self._find(self._rsc_dfns.rsc_dfns, rsc_name=rsc_name)
+            if rsc_dfn is None:
+                return self._error(apiconsts.MASK_CRT, apiconsts.MASK_SNAPSHOT, "Resource definition not found")
+            if not node_names:
+                node_names = [x.node_name for x in self._rscs.resources if x.name == rsc_name]
+            self._add_snapshot(node_names, rsc_dfn, snapshot_name)
+        return self._success(apiconsts.MASK_CRT, apiconsts.MASK_SNAPSHOT, "Snapshot created")
+
+    def snapshot_delete(self, rsc_name, snapshot_name):
+        self._call('snapshot_delete')
+        with self._lock:
+            self._remove(self._snapshot_dfns.snapshot_dfns, rsc_name=rsc_name, snapshot_name=snapshot_name)
+        return self._success(apiconsts.MASK_DEL, apiconsts.MASK_SNAPSHOT, "Snapshot deleted")
+
+    def error_report_list(self, nodes=None, with_content=False, since=None, to=None, ids=None):
+        self._call('error_report_list')
+        result = []
+        for report in self._error_reports:
+            if nodes and report.node_names not in nodes:
+                continue
+            if since and report.datetime < since:
+                continue
+            if to and report.datetime > to:
+                continue
+            if ids and not [x for x in ids if report.id.startswith(x)]:
+                continue
+            result.append(report)
+        return result
+
+    def _synthesized_events(self, object_identifier):
+        node_name = getattr(object_identifier, 'node_name', None)
+        rsc_name = getattr(object_identifier, 'resource_name', None)
+
+        with self._lock:
+            rscs = [
+                rsc for rsc in self._rscs.resources
+                if (not node_name or rsc.node_name == node_name) and (not rsc_name or rsc.name == rsc_name)
+            ]
+            removed = [
+                x for x in self._removed_rscs
+                if (not node_name or x[0] == node_name) and (not rsc_name or x[1] == rsc_name)
+            ]
+            self._removed_rscs = [x for x in self._removed_rscs if x not in removed]
+            rsc_dfns = [] if node_name else [
+                rsc_dfn.rsc_name for rsc_dfn in self._rsc_dfns.rsc_dfns if not rsc_name or rsc_dfn.rsc_name == rsc_name
+            ]
+            ready_counts = {}
+            for rsc in self._rscs.resources:
+                ready_counts[rsc.name] = ready_counts.get(rsc.name, 0) + 1
+
+        for rsc in rscs:
+            for vlm in rsc.vlms:
+                yield (
+                    FakeEventHeader(apiconsts.EVENT_VOLUME_DISK_STATE, apiconsts.EVENT_STREAM_VALUE,
+                                    rsc.node_name, rsc.name, volume_number=vlm.vlm_nr),
+                    FakeEventData(disk_state='Diskless' if apiconsts.FLAG_DISKLESS in rsc.rsc_flags else 'UpToDate')
+                )
+            yield (
+                FakeEventHeader(apiconsts.EVENT_RESOURCE_STATE, apiconsts.EVENT_STREAM_VALUE, rsc.node_name, rsc.name),
+                FakeEventData(ready=True)
+            )
+        for rsc_dfn_name in rsc_dfns:
+            yield (
+                FakeEventHeader(apiconsts.EVENT_RESOURCE_DEFINITION_READY, apiconsts.EVENT_STREAM_VALUE,
+                                '', rsc_dfn_name),
+                FakeEventData(ready_count=ready_counts.get(rsc_dfn_name, 0), error_count=0)
+            )
+        for removed_node_name, removed_rsc_name in removed:
+            yield (
+                FakeEventHeader(apiconsts.EVENT_RESOURCE_DEPLOYMENT_STATE, apiconsts.EVENT_STREAM_CLOSE_REMOVED,
+                                removed_node_name, removed_rsc_name),
+                FakeEventData(responses=[])
+            )
+
+    def watch_events(self, reply_handler, event_handler, object_identifier):
+        """
+        Feeds the handlers like linstor.Linstor.watch_events.
+
+        Events are taken from self.event_source if set, otherwise they are synthesized from the current
+        data set: every matching resource is reported ready, every matching resource definition reports
+        its resource count as ready count and resources deleted since the last call are reported removed.
+        Unlike a real controller the stream ends after the last event and None is returned.
+        """
+        self._call('watch_events')
+        result = reply_handler(self._success(apiconsts.MASK_CRT, 0, "Events watched"))
+        if result is not None:
+            return result
+
+        events = self.event_source if self.event_source is not None else self._synthesized_events(object_identifier)
+        for event_header, event_data in events:
+            result = event_handler(event_header, event_data)
+            if result is not None:
+                return result
+        return None
@@ -0,0 +1,652 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import linstor
+import linstor.sharedconsts as apiconsts
+import linstor_client_main
+from linstor_client.commands import DrbdOptions, ExporterCommands
+from linstor_client.commands.exporter_cmds import MetricsCache
+from linstor_client.consts import KEY_LS_CACHE_DIR, KEY_LS_PROFILE_OUTPUT, ExitCode
+from linstor_client.error_report_cache import ErrorReportCache, ErrorReportIndex
+from linstor_client.event_stream import EventReplay, ReplayingLinstor
+from linstor_client.utils import LinstorClientError, Output
+from .fake_controller import FakeLinstor, FakeDataset, FakeEventHeader, FakeEventData
+
+
+class FakeControllerTestCase(unittest.TestCase):
+    dataset = FakeDataset(nodes=4, resource_definitions=6, replicas=2, snapshots=2)
+
+    def setUp(self):
+        self.linstorapi = FakeLinstor(dataset=self.dataset)
+        self.linstorapi.connect()
+
+    def execute(self, cmd_args):
+        linstor_cli = linstor_client_main.LinStorCLI()
+        linstor_cli.set_linstorapi(self.linstorapi)
+        backupstd = sys.stdout
+        try:
+            sys.stdout = StringIO()
+            retcode = linstor_cli.parse_and_execute(["--no-utf8", "--no-color", "--disable-config"] + cmd_args)
+        finally:
+            stdval = sys.stdout.getvalue()
+            sys.stdout.close()
+            sys.stdout = backupstd
+        return retcode, stdval
+
+    def execute_with_machine_output(self, cmd_args):
+        retcode, stdval = self.execute(["-m"] + cmd_args)
+        self.assertEqual(0, retcode)
+        jout = json.loads(stdval)
+        self.assertIsInstance(jout, list)
+        return jout
+
+
+class TestFakeControllerLists(FakeControllerTestCase):
+    def test_nodes(self):
+        jout = self.execute_with_machine_output(['node', 'list'])
+        self.assertEqual(4, len(jout[0]['nodes']))
+
+    def test_resources(self):
+        jout = self.execute_with_machine_output(['resource', 'list'])
+        self.assertEqual(12, len(jout[0]['resources']))
+
+        retcode, text = self.execute(['resource', 'list'])
+        self.assertEqual(0, retcode)
+        self.assertIn('rsc000005', text)
+
+    def test_filtered_volumes(self):
+        jout = self.execute_with_machine_output(['resource', 'list-volumes', '-n', 'node00000'])
+        self.assertEqual(set(['node00000']), set([x['node_name'] for x in jout[0]['resources']]))
+
+    def test_snapshots(self):
+        retcode, text = self.execute(['snapshot', 'list'])
+        self.assertEqual(0, retcode)
+        self.assertIn('snap000001', text)
+
+    def test_describe(self):
+        retcode, text = self.execute(['node', 'describe', 'node00001'])
+        self.assertEqual(0, retcode)
+        self.assertIn('DfltStorPool', text)
+
+    def test_profile(self):
+        tmpdir = tempfile.mkdtemp()
+        os.environ[KEY_LS_PROFILE_OUTPUT] = os.path.join(tmpdir, 'node-list.pstats')
+        try:
+            retcode, text = self.execute(['--profile', 'node', 'list'])
+            self.assertEqual(0, retcode)
+            self.assertIn('node00001', text)
+            self.assertTrue(os.path.getsize(os.environ[KEY_LS_PROFILE_OUTPUT]) > 0)
+        finally:
+            del os.environ[KEY_LS_PROFILE_OUTPUT]
+            shutil.rmtree(tmpdir)
+
+
+class TestFakeControllerCreateDelete(FakeControllerTestCase):
+    def test_resource_create_delete(self):
+        retcode, _ = self.execute(['resource-definition', 'create', 'newrsc'])
+        self.assertEqual(0, retcode)
+        retcode, _ = self.execute(['volume-definition', 'create', 'newrsc', '1G'])
+        self.assertEqual(0, retcode)
+        retcode, _ = self.execute(['resource', 'create', 'node00002', 'node00003', 'newrsc'])
+        self.assertEqual(0, retcode)
+
+        jout = self.execute_with_machine_output(['resource', 'list', '-r', 'newrsc'])
+        self.assertEqual(2, len(jout[0]['resources']))
+
+        retcode, _ = self.execute(['resource', 'delete', 'node00002', 'newrsc'])
+        self.assertEqual(0, retcode)
+        jout = self.execute_with_machine_output(['resource', 'list', '-r', 'newrsc'])
+        self.assertEqual(1, len(jout[0]['resources']))
+
+    def test_auto_place(self):
+        self.execute(['resource-definition', 'create', 'autorsc'])
+        self.execute(['volume-definition', 'create', 'autorsc', '1G'])
+        retcode, _ = self.execute(['resource', 'create', '--auto-place', '3', 'autorsc'])
+        self.assertEqual(0, retcode)
+
+        jout = self.execute_with_machine_output(['resource', 'list', '-r', 'autorsc'])
+        self.assertEqual(3, len(jout[0]['resources']))
+
+    def test_auto_place_many(self):
+        for rsc_name in ['bulk1', 'bulk2', 'bulk3']:
+            self.execute(['resource-definition', 'create', rsc_name])
+            self.execute(['volume-definition', 'create', rsc_name, '1G'])
+
+        retcode, text = self.execute(['resource', 'create', '--auto-place', '2', '--regex', 'bulk[12]', 'bul.3'])
+        self.assertEqual(0, retcode)
+        self.assertIn('3 objects, 3 succeeded, 0 failed', text)
+        jout = self.execute_with_machine_output(['resource', 'list', '-r', 'bulk1', 'bulk2', 'bulk3'])
+        self.assertEqual(6, len(jout[0]['resources']))
+        self.assertEqual(1, self.linstorapi.calls.count('watch_events'))
+
+        retcode, _ = self.execute(['resource', 'create', '--regex', 'bulk.*'])
+        self.assertEqual(ExitCode.ARGPARSE_ERROR, retcode)
+        retcode, _ = self.execute(['resource', 'create', '--auto-place', '2', '--regex', 'nomatch.*'])
+        self.assertEqual(ExitCode.OBJECT_NOT_FOUND, retcode)
+
+    def test_create_from_manifest(self):
+        for rsc_name in ['manifest1', 'manifest2']:
+            self.execute(['resource-definition', 'create', rsc_name])
+            self.execute(['volume-definition', 'create', rsc_name, '1G'])
+
+        fd, manifest = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as manifest_file:
+            manifest_file.write("# rsc  nodes/count  [storage pool]\n"
+                                "manifest1 node00000,node00001\n"
+                                "manifest2 3 DfltStorPool\n"
+                                "missing 2\n")
+        try:
+            retcode, text = self.execute(['resource', 'create', '--from-file', manifest])
+        finally:
+            os.remove(manifest)
+
+        self.assertEqual(ExitCode.API_ERROR, retcode)
+        self.assertIn('3 objects, 2 succeeded, 1 failed', text)
+        self.assertIn('Resource definition not found', text)
+        jout = self.execute_with_machine_output(['resource', 'list', '-r', 'manifest1', 'manifest2'])
+        self.assertEqual(5, len(jout[0]['resources']))
+        self.assertEqual(1, self.linstorapi.calls.count('watch_events'))
+
+    def test_resume_from_journal(self):
+        self.execute(['resource-definition', 'create', 'journal1'])
+        self.execute(['volume-definition', 'create', 'journal1', '1G'])
+
+        journal = tempfile.mktemp()
+        try:
+            retcode, text = self.execute(
+                ['resource', 'create', '--auto-place', '2', '--journal', journal, 'journal1', 'journal2'])
+            self.assertEqual(ExitCode.API_ERROR, retcode)
+            self.assertIn('2 objects, 1 succeeded, 1 failed', text)
+
+            self.execute(['resource-definition', 'create', 'journal2'])
+            self.execute(['volume-definition', 'create', 'journal2', '1G'])
+            auto_place_calls = self.linstorapi.calls.count('resource_auto_place')
+            retcode, text = self.execute(
+                ['resource', 'create', '--auto-place', '2', '--resume', journal, 'journal1', 'journal2'])
+            self.assertEqual(0, retcode)
+            self.assertIn('Completed by an earlier run', text)
+            self.assertEqual(auto_place_calls + 1, self.linstorapi.calls.count('resource_auto_place'))
+        finally:
+            os.remove(journal)
+
+    def test_resume_nodes_from_journal(self):
+        self.execute(['resource-definition', 'create', 'journal3'])
+        self.execute(['volume-definition', 'create', 'journal3', '1G'])
+
+        fd, manifest = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as manifest_file:
+            manifest_file.write("journal3 node00000,newnode\n")
+        journal = tempfile.mktemp()
+        try:
+            retcode, text = self.execute(['resource', 'create', '--journal', journal, '--from-file', manifest])
+            self.assertEqual(ExitCode.API_ERROR, retcode)
+            self.assertIn('Node not found', text)
+
+            self.execute(['node', 'create', 'newnode', '10.0.0.99'])
+            retcode, text = self.execute(['resource', 'create', '--resume', journal, '--from-file', manifest])
+            self.assertEqual(0, retcode)
+            self.assertNotIn('already exists', text)
+        finally:
+            os.remove(manifest)
+            os.remove(journal)
+
+        jout = self.execute_with_machine_output(['resource', 'list', '-r', 'journal3'])
+        self.assertEqual(set(['node00000', 'newnode']), set([x['node_name'] for x in jout[0]['resources']]))
+
+    def test_resume_single_from_journal(self):
+        self.execute(['resource-definition', 'create', 'journal4'])
+        self.execute(['volume-definition', 'create', 'journal4', '1G'])
+
+        journal = tempfile.mktemp()
+        try:
+            retcode, _ = self.execute(['resource', 'create', '--journal', journal, 'node00000', 'newnode', 'journal4'])
+            self.assertEqual(ExitCode.API_ERROR, retcode)
+
+            self.execute(['node', 'create', 'newnode', '10.0.0.99'])
+            retcode, text = self.execute(
+                ['resource', 'create', '--resume', journal, 'node00000', 'newnode', 'journal4'])
+            self.assertEqual(0, retcode)
+            self.assertNotIn('already exists', text)
+        finally:
+            os.remove(journal)
+
+    def test_journal_not_writable(self):
+        retcode, _ = self.execute(['resource', 'create', '--auto-place', '2', '--journal',
+                                   os.path.join(tempfile.gettempdir(), 'missing', 'journal'), 'rsc000000', 'rsc000001'])
+        self.assertEqual(ExitCode.ARGPARSE_ERROR, retcode)
+
+    def test_summary(self):
+        retcode, text = self.execute(
+            ['--summary', 'resource', 'delete', '--async', 'node00000', 'node00001', 'node00002', 'rsc000000'])
+        self.assertEqual(ExitCode.API_ERROR, retcode)
+        self.assertIn('SUCCESS: 2 (Resource: 2)', text)
+        self.assertIn('ERROR: 1 (Resource: 1)', text)
+        self.assertEqual(1, text.count('Resource not found'))
+        self.assertNotIn('Resource deleted', text)
+
+    def test_summary_object_types(self):
+        self.assertEqual('Network interface', Output.ret_object_type(apiconsts.MASK_NET_IF | apiconsts.MASK_CRT))
+        self.assertEqual('Storage pool definition', Output.ret_object_type(apiconsts.MASK_STOR_POOL_DFN))
+        self.assertEqual('Other', Output.ret_object_type(apiconsts.MASK_ERROR))
+
+
+class TestFakeControllerProperties(FakeControllerTestCase):
+    def node_props(self, node_name):
+        jout = self.execute_with_machine_output(['node', 'list-properties', node_name])
+        return {x['key']: x['value'] for x in jout[0]}
+
+    def test_set_many(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as prop_file:
+            prop_file.write("# rack layout\nrow=3\n\nrack=r7\n")
+        try:
+            retcode, _ = self.execute(['node', 'set-property', 'node00000', '--aux', 'rack=r1', 'slot=4',
+                                       '--from-file', path])
+        finally:
+            os.remove(path)
+        self.assertEqual(0, retcode)
+        self.assertEqual(1, self.linstorapi.calls.count('node_modify'))
+        props = self.node_props('node00000')
+        self.assertEqual('r7', props['Aux/rack'])
+        self.assertEqual('4', props['Aux/slot'])
+        self.assertEqual('3', props['Aux/row'])
+
+        retcode, _ = self.execute(['node', 'set-property', 'node00000', '--aux', 'slot=', 'row=5'])
+        self.assertEqual(0, retcode)
+        props = self.node_props('node00000')
+        self.assertNotIn('Aux/slot', props)
+        self.assertEqual('5', props['Aux/row'])
+
+    def test_set_single(self):
+        retcode, _ = self.execute(['node', 'set-property', 'node00000', '--aux', 'note', 'a=b'])
+        self.assertEqual(0, retcode)
+        self.assertEqual('a=b', self.node_props('node00000')['Aux/note'])
+
+    def test_set_selected(self):
+        retcode, text = self.execute(['node', 'set-property', '--regex', 'node0000[01]', '--aux', 'rack=r1'])
+        self.assertEqual(0, retcode)
+        self.assertIn('2 objects, 2 succeeded, 0 failed', text)
+
+        retcode, _ = self.execute(['node', 'set-property', '--aux-match', 'rack=r1', '--parallel', '2',
+                                   '--aux', 'zone=z1'])
+        self.assertEqual(0, retcode)
+        self.assertEqual('z1', self.node_props('node00001').get('Aux/zone'))
+        self.assertNotIn('Aux/zone', self.node_props('node00002'))
+
+        retcode, text = self.execute(['storage-pool', 'set-property', '--all', '--aux', 'tier=ssd'])
+        self.assertEqual(0, retcode)
+        self.assertIn('0 failed', text)
+
+        retcode, _ = self.execute(['resource-definition', 'set-property', '--regex', 'nomatch.*', '--aux', 'a=b'])
+        self.assertEqual(ExitCode.OBJECT_NOT_FOUND, retcode)
+
+        retcode, _ = self.execute(['node', 'set-property', '--all', 'nod00001', '--aux', 'rack=r9'])
+        self.assertEqual(ExitCode.ARGPARSE_ERROR, retcode)
+        self.assertNotIn('Aux/nod00001', self.node_props('node00001'))
+
+    def test_find(self):
+        self.execute(['node', 'set-property', 'node00001', '--aux', 'rack=r1'])
+        self.execute(['resource-definition', 'set-property', '--all', '--aux', 'rack=r2'])
+
+        jout = self.execute_with_machine_output(['property', 'find', '--aux', 'rack'])
+        self.assertEqual(1 + self.dataset.resource_definitions, len(jout))
+        self.assertIn({'type': 'node', 'object': 'node00001', 'key': 'Aux/rack', 'value': 'r1'}, jout)
+
+        jout = self.execute_with_machine_output(['property', 'find', 'Aux/*~^r1$', '-t', 'node', 'resource'])
+        self.assertEqual([('node', 'node00001')], [(x['type'], x['object']) for x in jout])
+
+        retcode, text = self.execute(['property', 'find', '--ndjson', '--aux', 'rack=r1'])
+        self.assertEqual(0, retcode)
+        self.assertEqual(['node00001'], [json.loads(x)['object'] for x in text.splitlines()])
+
+    def test_list_many(self):
+        self.execute(['node', 'set-property', '--all', '--aux', 'rack=r1'])
+        calls = self.linstorapi.calls.count('node_list')
+
+        jout = self.execute_with_machine_output(['node', 'list-properties', 'node00000', 'node00002'])
+        self.assertEqual(['node00000', 'node00002'], sorted(set(x['object'] for x in jout)))
+        jout = self.execute_with_machine_output(['node', 'list-properties', '--all'])
+        self.assertEqual(self.dataset.nodes, len([x for x in jout if x['key'] == 'Aux/rack']))
+        self.assertEqual(calls + 2, self.linstorapi.calls.count('node_list'))
+
+        retcode, _ = self.execute(['node', 'list-properties', 'node00000', 'nonode'])
+        self.assertEqual(ExitCode.OBJECT_NOT_FOUND, retcode)
+
+        self.execute(['resource', 'set-property', 'node00000', 'rsc000000', '--aux', 'a=b'])
+        retcode, text = self.execute(['resource', 'list-properties', '--all', '--ndjson'])
+        self.assertEqual(0, retcode)
+        self.assertIn({'object': 'node00000/rsc000000', 'key': 'Aux/a', 'value': 'b'},
+                      [json.loads(x) for x in text.splitlines()])
+
+        self.execute(['resource', 'set-property', '--all', '--aux', 'c=d'])
+        jout = self.execute_with_machine_output(['resource', 'list-volumes', '-n', 'node00000'])
+        rsc_names = sorted(set([x['name'] for x in jout[0]['resources']]))[:2]
+        jout = self.execute_with_machine_output(['resource', 'list-properties', 'node00000'] + rsc_names)
+        self.assertEqual(['node00000/' + x for x in rsc_names], sorted(set(x['object'] for x in jout)))
+        retcode, _ = self.execute(['resource', 'list-properties', 'node00000', rsc_names[0], 'norsc'])
+        self.assertEqual(ExitCode.OBJECT_NOT_FOUND, retcode)
+
+
+class TestFakeControllerDrbdOptions(FakeControllerTestCase):
+    def test_lazy_arguments(self):
+        def subparser(parser, name):
+            return [x for x in parser._actions if x.choices and name in x.choices][0].choices[name]
+
+        linstor_cli = linstor_client_main.LinStorCLI()
+        drbd_opts = subparser(subparser(linstor_cli._parser, 'resource-definition'), 'drbd-options')
+        self.assertNotIn('--protocol', drbd_opts._option_string_actions)
+
+        retcode, _ = self.execute(['resource-definition', 'drbd-options', '--protocol', 'A', 'rsc000000'])
+        self.assertEqual(0, retcode)
+        jout = self.execute_with_machine_output(['resource-definition', 'list-properties', 'rsc000000'])
+        self.assertIn({'key': apiconsts.NAMESPC_DRBD_NET_OPTIONS + '/protocol', 'value': 'A'}, jout[0])
+
+    def test_bulk(self):
+        retcode, text = self.execute(['resource-definition', 'drbd-options', '--all', '--protocol', 'A'])
+        self.assertEqual(0, retcode)
+        self.assertIn('{n} objects, {n} succeeded'.format(n=self.dataset.resource_definitions), text)
+
+        retcode, text = self.execute(
+            ['resource-definition', 'drbd-options', '--protocol', 'B', 'rsc000001', 'rsc000003'])
+        self.assertEqual(0, retcode)
+        jout = self.execute_with_machine_output(
+            ['property', 'find', apiconsts.NAMESPC_DRBD_NET_OPTIONS + '/protocol=B'])
+        self.assertEqual(['rsc000001', 'rsc000003'], sorted(x['object'] for x in jout))
+
+        retcode, text = self.execute(
+            ['resource-definition', 'drbd-options', '--regex', '--protocol', 'C', 'rsc00000[12]', 'rsc000004'])
+        self.assertEqual(0, retcode)
+        self.assertIn('3 objects, 3 succeeded', text)
+
+    def test_all_pairs(self):
+        retcode, text = self.execute(
+            ['resource', 'drbd-peer-options', '--all-pairs', '--parallel', '2', '--c-max-rate', '250', 'rsc000000'])
+        self.assertEqual(0, retcode)
+        self.assertIn('node00000 - node00001', text)
+        self.assertEqual(1, self.linstorapi.calls.count('resource_conn_modify'))
+
+    def test_global_options(self):
+        args = linstor_client_main.LinStorCLI().parse(
+            ['--disable-config', '--replay-speed', '2', 'controller', 'drbd-options', '--protocol', 'A'])
+        self.assertEqual({'protocol': 'A'}, DrbdOptions.filter_new(args))
+
+    def test_controller(self):
+        retcode, text = self.execute(['controller', 'drbd-options', '--protocol', 'C', '--c-max-rate', '250'])
+        self.assertEqual(0, retcode)
+        self.assertIn('2 objects, 2 succeeded', text)
+        self.assertEqual(2, self.linstorapi.calls.count('controller_set_prop'))
+
+        retcode, _ = self.execute(['controller', 'drbd-options', '--unset-protocol'])
+        self.assertEqual(0, retcode)
+        jout = self.execute_with_machine_output(['controller', 'list-properties'])
+        keys = [x['key'] for x in jout[0]]
+        self.assertNotIn(apiconsts.NAMESPC_DRBD_NET_OPTIONS + '/protocol', keys)
+        self.assertEqual(1, len([x for x in keys if x.endswith('/c-max-rate')]))
+
+
+class TestFakeControllerWatch(FakeControllerTestCase):
+    def test_ndjson(self):
+        retcode, text = self.execute(
+            ['create-watch', '--format', 'ndjson', '--events', apiconsts.EVENT_RESOURCE_STATE,
+             '--resource-name', 'rsc000000'])
+        self.assertEqual(0, retcode)
+        events = [json.loads(x) for x in text.splitlines()]
+        self.assertEqual(2, len(events))
+        self.assertEqual(set([apiconsts.EVENT_RESOURCE_STATE]), set(x['event'] for x in events))
+        self.assertEqual({'ready': True}, events[0]['data'])
+
+    def test_text(self):
+        retcode, text = self.execute(['create-watch', '--flush-interval', '0', '--node-name', 'node00000'])
+        self.assertEqual(0, retcode)
+        self.assertIn('Resource ready: True', text)
+        self.assertIn('Disk state: ', text)
+
+    def test_stats(self):
+        retcode, text = self.execute(['create-watch', '--stats', '60', '--top', '2'])
+        self.assertEqual(0, retcode)
+        lines = text.splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertIn('{n} events'.format(n=self.dataset.resource_definitions * 5), lines[0])
+        self.assertTrue(lines[1].split()[0] == 'type' and len(lines[1].split(', ')) == 2)
+
+    def test_follow(self):
+        def events():
+            yield (
+                FakeEventHeader(apiconsts.EVENT_RESOURCE_STATE, apiconsts.EVENT_STREAM_VALUE, 'node00000', 'rsc000000'),
+                FakeEventData(ready=True)
+            )
+            raise linstor.LinstorNetworkError("Connection lost")
+
+        self.linstorapi.event_source = events()
+        retcode, text = self.execute(['create-watch', '--follow', '--max-retries', '1', '--format', 'ndjson'])
+        self.assertEqual(ExitCode.CONNECTION_ERROR, retcode)
+        events = [json.loads(x) for x in text.splitlines()]
+        self.assertEqual([apiconsts.EVENT_RESOURCE_STATE, 'Gap'], [x['event'] for x in events])
+        self.assertEqual('Connection lost', events[1]['reason'])
+        self.assertEqual(2, self.linstorapi.calls.count('watch_events'))
+
+    def test_record_replay(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        retcode, recorded = self.execute(['create-watch', '--record', path, '--resource-name', 'rsc000001'])
+        self.assertEqual(0, retcode)
+
+        self.linstorapi.event_source = EventReplay(path, speed=0)
+        retcode, replayed = self.execute(['create-watch', '--node-name', 'node00001'])
+        self.assertEqual(0, retcode)
+        self.assertIn('Resource ready: True', replayed)
+        self.assertEqual([x for x in recorded.splitlines() if 'node00001/' in x], replayed.splitlines())
+
+    def test_replay_offline(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        self.execute(['create-watch', '--record', path])
+
+        offline = FakeLinstor(dataset=self.dataset)
+        self.linstorapi = ReplayingLinstor(offline, EventReplay(path, speed=0))
+        self.linstorapi.connect()
+        retcode, replayed = self.execute(['create-watch', '--node-name', 'node00001'])
+        self.assertEqual(0, retcode)
+        self.assertIn('Resource ready: True', replayed)
+        self.assertFalse(offline.connected)
+
+        self.assertRaises(LinstorClientError, EventReplay, os.path.join(os.path.dirname(path), 'missing', 'rec'))
+
+
+class TestFakeControllerExporter(FakeControllerTestCase):
+    def test_once(self):
+        retcode, text = self.execute(['exporter', '--once'])
+        self.assertEqual(0, retcode)
+        self.assertIn('linstor_node_connection_status{node="node00000",status="Online"} 1\n', text)
+        self.assertIn('linstor_storage_pool_free_bytes{driver="LvmDriver",node="node00001",'
+                      'storage_pool="DfltStorPool"} 107374182400\n', text)
+        lines = text.splitlines()
+        self.assertEqual(12, len([x for x in lines if x.startswith('linstor_volume_state{')]))
+        self.assertEqual(2, len([x for x in lines if x.startswith('linstor_snapshot_state{')]))
+        self.assertEqual(1, self.linstorapi.calls.count('resource_list'))
+
+    def test_events(self):
+        exporter = ExporterCommands()
+        exporter._linstor = self.linstorapi
+        cache = MetricsCache()
+        exporter.refresh(None, cache)
+        labels = '{node="node00000",resource="rsc000000",volume="0"}'
+        self.assertIn('linstor_volume_healthy' + labels + ' 1\n', cache.render())
+
+        cache.update_event(
+            FakeEventHeader(apiconsts.EVENT_VOLUME_DISK_STATE, apiconsts.EVENT_STREAM_VALUE, 'node00000', 'rsc000000',
+                            volume_number=0),
+            FakeEventData(disk_state='Inconsistent')
+        )
+        text = cache.render()
+        self.assertIn('linstor_volume_healthy' + labels + ' 0\n', text)
+        self.assertIn('state="Inconsistent"', text)
+        self.assertIn('linstor_exporter_events_total 1\n', text)
+
+
+class TestFakeControllerErrorReports(FakeControllerTestCase):
+    dataset = FakeDataset(nodes=2, error_reports=6)
+
+    def setUp(self):
+        super(TestFakeControllerErrorReports, self).setUp()
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        os.environ[KEY_LS_CACHE_DIR] = cache_dir
+        self.addCleanup(os.environ.pop, KEY_LS_CACHE_DIR)
+
+    def test_cache(self):
+        jout = self.execute_with_machine_output(['error-reports', 'list'])
+        self.assertEqual(6, len(jout))
+        jout = self.execute_with_machine_output(['error-reports', 'list', '--nodes', 'node00001'])
+        self.assertEqual(3, len(jout))
+
+        report_id = jout[0]['filename'][len('ErrorReport-'):-len('.log')]
+        calls = self.linstorapi.calls.count('error_report_list')
+        for _ in range(2):
+            retcode, text = self.execute(['error-reports', 'show', report_id])
+            self.assertEqual(0, retcode)
+            self.assertIn('ERROR REPORT ' + report_id, text)
+        self.assertEqual(calls + 1, self.linstorapi.calls.count('error_report_list'))
+
+        # a prefix is only resolved after refreshing the list, the content is not fetched again
+        retcode, text = self.execute(['error-reports', 'show', report_id[:8]])
+        self.assertEqual(0, retcode)
+        self.assertIn('ERROR REPORT ' + report_id, text)
+        self.assertEqual(calls + 2, self.linstorapi.calls.count('error_report_list'))
+
+    def test_cache_prune(self):
+        cache = ErrorReportCache(tempfile.mkdtemp(), max_entries=4)
+        self.addCleanup(shutil.rmtree, cache.directory)
+        reports = self.linstorapi.error_report_list(with_content=True)
+        cache.add_content(reports)
+        self.assertEqual([x.id for x in reports[2:]], [x.id for x in cache.entries()])
+        self.assertIsNone(cache.content(reports[0].id))
+        self.assertIsNotNone(cache.content(reports[2].id))
+        self.assertFalse(cache.covers(None))
+        self.assertTrue(cache.covers(reports[2].datetime))
+        self.assertIsNone(cache.resolve(reports[2].id[:8]))  # a pruned report could match as well
+
+        reloaded = ErrorReportCache(cache.directory, max_entries=4)
+        self.assertFalse(reloaded.covers(None))
+        self.assertEqual(4, len(reloaded.entries()))
+
+    def test_cache_not_usable(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        os.environ[KEY_LS_CACHE_DIR] = path  # a file, the cache directory cannot be created
+
+        jout = self.execute_with_machine_output(['error-reports', 'list'])
+        self.assertEqual(6, len(jout))
+        report_id = jout[0]['filename'][len('ErrorReport-'):-len('.log')]
+        retcode, text = self.execute(['error-reports', 'show', report_id])
+        self.assertEqual(0, retcode)
+        self.assertIn('ERROR REPORT ' + report_id, text)
+
+    def test_search(self):
+        jout = self.execute_with_machine_output(['error-reports', 'search', 'synthetic'])
+        self.assertEqual(6, sum([x['hits'] for x in jout]))
+        self.assertIn('FakeException0', [x['exception'] for x in jout])
+
+        calls = self.linstorapi.calls.count('error_report_list')
+        jout = self.execute_with_machine_output(['error-reports', 'search', 'FakeException1', '--nodes', 'node00001'])
+        self.assertEqual([('FakeException1', 'node00001', 1)], [(x['exception'], x['node'], x['hits']) for x in jout])
+        self.assertEqual(calls + 1, self.linstorapi.calls.count('error_report_list'))
+
+        retcode, _ = self.execute(['error-reports', 'search', 'AND'])
+        self.assertEqual(ExitCode.ARGPARSE_ERROR, retcode)
+
+    def test_search_evicted(self):
+        cache = ErrorReportCache(tempfile.mkdtemp(), max_bytes=1)
+        self.addCleanup(shutil.rmtree, cache.directory)
+        index = ErrorReportIndex(cache.directory)
+        self.addCleanup(index.close)
+        reports = self.linstorapi.error_report_list(with_content=True)
+        cache.add_content(reports)
+        index.add(reports)
+        self.assertEqual(6, len(index.indexed_ids()))
+        index.remove(index.indexed_ids() - cache.content_ids())
+        self.assertEqual(cache.content_ids(), index.indexed_ids())
+        self.assertEqual([], index.search('synthetic'))
+
+
+class TestFakeControllerApply(FakeControllerTestCase):
+    layout = {
+        'controller': {'properties': {'DrbdOptions/Net/max-buffers': 8000}},
+        'nodes': [
+            {'name': 'node00000', 'properties': {'Aux/rack': 'r1'}},
+            {'name': 'newnode', 'ip': '10.1.0.1'}
+        ],
+        'storage-pools': [
+            {'node': 'newnode', 'name': 'DfltStorPool', 'driver': 'lvm', 'driver-pool': 'vg0'}
+        ],
+        'resource-definitions': [
+            {'name': 'applied', 'volume-definitions': [{'size': '1G'}]}
+        ],
+        'resources': [
+            {'node': 'newnode', 'resource-definition': 'applied', 'storage-pool': 'DfltStorPool'},
+            {'node': 'node00000', 'resource-definition': 'applied', 'storage-pool': 'DfltStorPool'}
+        ]
+    }
+
+    def apply(self, extra_args, global_args=None):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as layout_file:
+            json.dump(self.layout, layout_file)
+        try:
+            return self.execute((global_args or []) + ['apply', '-f', path] + extra_args)
+        finally:
+            os.remove(path)
+
+    def test_dry_run(self):
+        retcode, text = self.apply(['--dry-run'])
+        self.assertEqual(0, retcode)
+        self.assertIn('resource newnode/applied', text)
+        self.assertIn('Aux/rack=r1', text)
+        self.assertNotIn('node_create', self.linstorapi.calls)
+
+    def test_apply(self):
+        retcode, text = self.apply([])
+        self.assertEqual(0, retcode)
+        self.assertIn('8 objects, 8 succeeded, 0 failed', text)
+
+        jout = self.execute_with_machine_output(['resource', 'list', '-r', 'applied'])
+        self.assertEqual(2, len(jout[0]['resources']))
+
+        retcode, text = self.apply([])
+        self.assertEqual(0, retcode)
+        self.assertIn('Nothing to do', text)
+
+    def test_node_type_conflict(self):
+        self.layout = {'nodes': [{'name': 'node00000', 'type': 'Controller', 'properties': {'Aux/rack': 'r1'}}]}
+        retcode, text = self.apply(['--dry-run'], ['-m'])
+        self.assertEqual(0, retcode)
+        plan = json.loads(text)
+        self.assertEqual(['node node00000'], [x['object'] for x in plan])
+        self.assertEqual('conflict', plan[0]['action'])
+
+    def test_conflict_skips_dependent(self):
+        self.layout = {
+            'nodes': [{'name': 'node00000', 'type': 'Controller'}],
+            'resource-definitions': [{'name': 'blocked', 'volume-definitions': [{'size': '1G'}]}],
+            'resources': [{'node': 'node00000', 'resource-definition': 'blocked'}]
+        }
+        retcode, text = self.apply([])
+        self.assertEqual(ExitCode.API_ERROR, retcode)
+        self.assertIn('Skipped, node node00000 failed', text)
+        self.assertNotIn('resource_create', self.linstorapi.calls)
+
+
+if __name__ == '__main__':
+    unittest.main()